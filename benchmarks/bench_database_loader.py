@@ -0,0 +1,48 @@
+"""Benchmark DatabaseLoader insert methods against SQLite.
+
+Usage:
+    python -m benchmarks.bench_database_loader --rows 200000 --batch-size 5000
+
+Pass ``--url postgresql://...`` to run against PostgreSQL instead, which also
+times the COPY path.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.load.database_loader import DatabaseLoader
+
+from .datasets import narrow
+
+METHODS = ['to_sql', 'executemany', 'multi_values']
+
+
+def run(rows: int, batch_size: int, url: Optional[str] = None) -> None:
+    """Time each insert method, on fresh SQLite databases unless ``url`` is given."""
+    data = narrow(rows)
+    methods = METHODS + ['copy'] if url and url.startswith('postgresql') else METHODS
+    print(f"{'method':<14}{'seconds':>10}{'rows/sec':>14}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for method in methods:
+            target = url or f"sqlite:///{Path(tmpdir) / f'{method}.db'}"
+            loader = DatabaseLoader(target, 'bench', batch_size=batch_size, insert_method=method)
+            with loader:
+                start = time.perf_counter()
+                loader.load(data, if_exists='replace')
+                elapsed = time.perf_counter() - start
+            print(f"{method:<14}{elapsed:>10.3f}{rows / elapsed:>14,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=5_000)
+    parser.add_argument('--url', help="Database URL (default: temporary SQLite files)")
+    args = parser.parse_args()
+    run(args.rows, args.batch_size, args.url)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Seeded synthetic datasets for benchmarks.
+
+Every generator is deterministic for a given ``rows`` and ``seed``, so
+results of different runs and machines are measured on identical data.
+"""
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ['north', 'south', 'east', 'west', 'central']
+
+
+def narrow(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Four mixed-type columns: id, amount, category and flag."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'amount': rng.normal(100, 25, rows).round(2),
+        'category': rng.choice(CATEGORIES, rows),
+        'flag': rng.integers(0, 2, rows).astype(bool),
+    })
+
+
+def wide(rows: int, seed: int = 0, columns: int = 50) -> pd.DataFrame:
+    """An id plus ``columns`` float columns, of which queries usually need few."""
+    rng = np.random.default_rng(seed)
+    data = {'id': np.arange(rows)}
+    for index in range(columns):
+        data[f'c{index}'] = rng.random(rows).round(4)
+    return pd.DataFrame(data)
+
+
+def numeric(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Integer and float columns only."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'quantity': rng.integers(0, 1_000, rows),
+        'price': rng.uniform(0, 500, rows).round(2),
+        'discount': rng.uniform(0, 0.3, rows).round(3),
+        'score': rng.normal(0, 1, rows),
+    })
+
+
+def strings(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Free-text, email and low-cardinality string columns."""
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    words = [''.join(rng.choice(alphabet, 8)) for _ in range(1_000)]
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'name': rng.choice(words, rows),
+        'email': [f"{word}{n}@example.com" for word, n in zip(rng.choice(words, rows), range(rows))],
+        'comment': [' '.join(parts) for parts in rng.choice(words, (rows, 6))],
+        'category': rng.choice(CATEGORIES, rows),
+    })
+
+
+def dirty(
+    rows: int,
+    seed: int = 0,
+    duplicate_fraction: float = 0.2,
+    na_fraction: float = 0.1
+) -> pd.DataFrame:
+    """Mixed columns with repeated rows and missing values.
+    
+    ``duplicate_fraction`` of the rows are copies of other rows and
+    ``na_fraction`` of the values in ``amount`` and ``category`` are NA.
+    """
+    rng = np.random.default_rng(seed)
+    unique = max(1, int(rows * (1 - duplicate_fraction)))
+    base = narrow(unique, seed)
+    repeats = base.iloc[rng.integers(0, unique, rows - unique)]
+    data = pd.concat([base, repeats], ignore_index=True)
+    data = data.iloc[rng.permutation(rows)].reset_index(drop=True)
+    for column in ('amount', 'category'):
+        data.loc[rng.random(rows) < na_fraction, column] = None
+    return data
+
+
+GENERATORS: Dict[str, Callable[..., pd.DataFrame]] = {
+    'narrow': narrow,
+    'wide': wide,
+    'numeric': numeric,
+    'strings': strings,
+    'dirty': dirty,
+}
+
+
+def make_dataset(kind: str, rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build the dataset named ``kind`` (see ``GENERATORS``)."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown dataset: {kind}")
+    return GENERATORS[kind](rows, seed)
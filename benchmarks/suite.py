@@ -0,0 +1,460 @@
+"""Benchmark suite for extractors, transformations and loaders.
+
+Usage:
+    # Time every scenario and save the results
+    python -m benchmarks.suite run --rows 100000 --output results.json
+    
+    # Compare two result files; exits with status 1 on a regression
+    python -m benchmarks.suite compare benchmarks/baseline.json results.json
+    
+    # Run with the baseline's parameters and compare in one step
+    python -m benchmarks.suite run --compare benchmarks/baseline.json
+
+Every scenario runs on a seeded dataset from ``benchmarks.datasets``; the
+time reported is the median of ``--repeat`` runs after one warm-up run.
+"""
+import argparse
+import fnmatch
+import http.server
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.extract.api_extractor import APIExtractor
+from src.extract.base import BaseExtractor
+from src.extract.csv_extractor import CSVExtractor
+from src.extract.database_extractor import DatabaseExtractor
+from src.load.csv_loader import CSVLoader
+from src.load.database_loader import DatabaseLoader
+from src.pipeline import ETLPipeline
+from src.transform.base import DataFrameTransformer
+
+from .datasets import make_dataset
+
+DEFAULT_THRESHOLD = 0.15
+
+# Requests made by the per-key async API scenario, whatever the row count
+ASYNC_REQUESTS = 5_000
+
+
+@dataclass
+class Scenario:
+    """One timed operation.
+    
+    ``prepare(data, workdir)`` runs untimed and returns the input passed to
+    ``run(prepared, workdir)``, which is timed. ``cleanup(prepared)`` runs
+    after the last repetition. ``requires`` names an optional module the
+    scenario needs; the scenario is skipped when it is missing.
+    """
+    name: str
+    dataset: str
+    run: Callable[[Any, Path], Any]
+    prepare: Callable[[pd.DataFrame, Path], Any] = lambda data, workdir: data
+    cleanup: Optional[Callable[[Any], None]] = None
+    requires: Optional[str] = None
+
+
+def _write_csv(data: pd.DataFrame, workdir: Path) -> Path:
+    path = workdir / 'input.csv'
+    data.to_csv(path, index=False)
+    return path
+
+
+def _write_csv_shards(data: pd.DataFrame, workdir: Path, shards: int = 8) -> Path:
+    directory = workdir / 'shards'
+    directory.mkdir()
+    size = -(-len(data) // shards)
+    for index in range(shards):
+        data.iloc[index * size:(index + 1) * size].to_csv(directory / f"part-{index:03d}.csv.gz", index=False)
+    return directory
+
+
+def _write_parquet(data: pd.DataFrame, workdir: Path) -> Path:
+    path = workdir / 'input.parquet'
+    data.to_parquet(path, index=False, row_group_size=50_000)
+    return path
+
+
+def _extract_csv(path: Path, workdir: Path) -> pd.DataFrame:
+    with CSVExtractor(path) as extractor:
+        return extractor.extract()
+
+
+def _extract_csv_batches(path: Path, workdir: Path) -> int:
+    with CSVExtractor(path) as extractor:
+        return sum(len(batch) for batch in extractor.extract_batches(batch_size=10_000))
+
+
+def _extract_csv_files(directory: Path, workdir: Path) -> pd.DataFrame:
+    with CSVExtractor(directory) as extractor:
+        return extractor.extract()
+
+
+def _extract_parquet(path: Path, workdir: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    from src.extract.parquet_extractor import ParquetExtractor
+    
+    with ParquetExtractor(path) as extractor:
+        return extractor.extract(columns=columns)
+
+
+def _write_sqlite(data: pd.DataFrame, workdir: Path) -> str:
+    url = f"sqlite:///{workdir / 'input.db'}"
+    with DatabaseLoader(url, 'bench', batch_size=5_000) as loader:
+        loader.load(data, if_exists='replace')
+    return url
+
+
+def _extract_sqlite(url: str, workdir: Path, partitions: int = 1) -> pd.DataFrame:
+    with DatabaseExtractor(url, 'bench', partition_column='id', partitions=partitions) as extractor:
+        return extractor.extract()
+
+
+def _serve_json(data: pd.DataFrame, workdir: Path) -> Tuple[http.server.HTTPServer, str]:
+    """Serve ``data`` as a JSON array of records from a local HTTP server."""
+    body = data.to_json(orient='records').encode('utf-8')
+    
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _extract_api(served: Tuple[http.server.HTTPServer, str], workdir: Path) -> Any:
+    with APIExtractor(served[1]) as extractor:
+        return extractor.extract('records')
+
+
+def _serve_records(data: pd.DataFrame, workdir: Path) -> Tuple[http.server.HTTPServer, str, int]:
+    """Serve the first ``ASYNC_REQUESTS`` rows one per URL (``/records/<n>``), with keep-alive."""
+    bodies = [row.encode('utf-8') for row in data.head(ASYNC_REQUESTS).to_json(orient='records', lines=True).splitlines()]
+    
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            body = bodies[int(self.path.rsplit('/', 1)[-1])]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", len(bodies)
+
+
+def _extract_api_async(served: Tuple[http.server.HTTPServer, str, int], workdir: Path) -> Any:
+    from src.extract.async_api_extractor import AsyncAPIExtractor
+    
+    with AsyncAPIExtractor(served[1], concurrency=64) as extractor:
+        return extractor.extract('records/{key}', keys=range(served[2]))
+
+
+def _stop_server(served: Tuple[http.server.HTTPServer, str]) -> None:
+    served[0].shutdown()
+    served[0].server_close()
+
+
+def _transform(build: Callable[[DataFrameTransformer], DataFrameTransformer]) -> Callable:
+    """Return a scenario body applying the transformer configured by ``build``."""
+    def run(data: pd.DataFrame, workdir: Path) -> pd.DataFrame:
+        return build(DataFrameTransformer()).transform(data)
+    return run
+
+
+def _load_csv(data: pd.DataFrame, workdir: Path) -> None:
+    with CSVLoader(workdir / 'output.csv') as loader:
+        loader.load(data)
+
+
+def _load_csv_gzip(shards: int) -> Callable[[pd.DataFrame, Path], None]:
+    """Return a scenario body writing gzip CSV, as one file or a directory of shards."""
+    def run(data: pd.DataFrame, workdir: Path) -> None:
+        path = workdir / ('output.csv.gz' if shards == 1 else 'shards')
+        with CSVLoader(path, shards=shards, compression='gzip') as loader:
+            loader.load(data)
+    return run
+
+
+def _load_parquet(data: pd.DataFrame, workdir: Path) -> None:
+    from src.load.parquet_loader import ParquetLoader
+    
+    with ParquetLoader(workdir / 'output.parquet') as loader:
+        loader.load(data)
+
+
+def _load_sqlite(data: pd.DataFrame, workdir: Path) -> None:
+    with DatabaseLoader(f"sqlite:///{workdir / 'output.db'}", 'bench', batch_size=5_000) as loader:
+        loader.load(data, if_exists='replace')
+
+
+class _FrameExtractor(BaseExtractor):
+    """Hand a prepared frame to a pipeline."""
+    
+    def __init__(self, data: pd.DataFrame):
+        super().__init__()
+        self.data = data
+    
+    def connect(self) -> None:
+        pass
+    
+    def extract(self, **kwargs) -> pd.DataFrame:
+        return self.data
+    
+    def disconnect(self) -> None:
+        pass
+
+
+def _load_fanout(max_workers: int) -> Callable[[pd.DataFrame, Path], None]:
+    """Return a scenario body loading into two CSV files and SQLite through a pipeline."""
+    def run(data: pd.DataFrame, workdir: Path) -> None:
+        pipeline = ETLPipeline('bench', config={'load': {'max_workers': max_workers}})
+        pipeline.add_extractor(_FrameExtractor(data))
+        pipeline.add_loader(CSVLoader(workdir / 'output.csv'))
+        pipeline.add_loader(CSVLoader(workdir / 'archive' / 'output.csv'))
+        pipeline.add_loader(DatabaseLoader(
+            f"sqlite:///{workdir / 'output.db'}", 'bench', config={'if_exists': 'replace'}, batch_size=5_000
+        ))
+        pipeline.run()
+    return run
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario('extract.csv.narrow', 'narrow', _extract_csv, _write_csv),
+    Scenario('extract.csv.wide', 'wide', _extract_csv, _write_csv),
+    Scenario('extract.csv.strings', 'strings', _extract_csv, _write_csv),
+    Scenario('extract.csv.batches', 'narrow', _extract_csv_batches, _write_csv),
+    Scenario('extract.csv.gz_shards', 'narrow', _extract_csv_files, _write_csv_shards),
+    Scenario('extract.parquet.wide', 'wide', _extract_parquet, _write_parquet, requires='pyarrow'),
+    Scenario(
+        'extract.parquet.wide_projection', 'wide',
+        lambda path, workdir: _extract_parquet(path, workdir, ['id', 'c0', 'c1']),
+        _write_parquet, requires='pyarrow'
+    ),
+    Scenario('extract.database.sqlite', 'narrow', _extract_sqlite, _write_sqlite),
+    Scenario(
+        'extract.database.partitioned', 'narrow',
+        lambda url, workdir: _extract_sqlite(url, workdir, partitions=4), _write_sqlite
+    ),
+    Scenario('extract.api.narrow', 'narrow', _extract_api, _serve_json, _stop_server),
+    Scenario(
+        'extract.api.async_keys', 'narrow', _extract_api_async, _serve_records, _stop_server,
+        requires='aiohttp'
+    ),
+    Scenario('transform.drop_duplicates', 'dirty', _transform(lambda t: t.drop_duplicates())),
+    Scenario('transform.drop_na', 'dirty', _transform(lambda t: t.drop_na())),
+    Scenario(
+        'transform.rename_columns', 'dirty',
+        _transform(lambda t: t.rename_columns({'amount': 'total', 'category': 'region'}))
+    ),
+    Scenario('transform.select_columns', 'wide', _transform(lambda t: t.select_columns(['id', 'c0', 'c1']))),
+    Scenario('transform.filter_rows', 'dirty', _transform(lambda t: t.filter_rows(lambda df: df['amount'] > 100))),
+    Scenario(
+        'transform.chain', 'dirty',
+        _transform(lambda t: t.drop_na().drop_duplicates(['id']).filter_rows(lambda df: df['flag']))
+    ),
+    Scenario(
+        'transform.derive.apply', 'numeric',
+        _transform(lambda t: t.add_transformation(lambda df: df.assign(
+            net=df.apply(lambda row: row['price'] * row['quantity'] * (1 - row['discount']), axis=1)
+        )).filter_rows(lambda df: (df['net'] > 1000) & (df['score'] > 0)))
+    ),
+    Scenario(
+        'transform.derive.expression', 'numeric',
+        _transform(lambda t: t.with_column('net', 'price * quantity * (1 - discount)')
+                   .filter_rows('net > 1000 and score > 0'))
+    ),
+    Scenario('load.csv.narrow', 'narrow', _load_csv),
+    Scenario('load.csv.strings', 'strings', _load_csv),
+    Scenario('load.csv.gzip', 'narrow', _load_csv_gzip(1)),
+    Scenario('load.csv.gz_shards', 'narrow', _load_csv_gzip(4)),
+    Scenario('load.parquet.narrow', 'narrow', _load_parquet, requires='pyarrow'),
+    Scenario('load.database.sqlite', 'narrow', _load_sqlite),
+    Scenario('load.fanout.sequential', 'narrow', _load_fanout(1)),
+    Scenario('load.fanout.threads', 'narrow', _load_fanout(3)),
+]
+
+
+def _available(scenario: Scenario) -> bool:
+    """Return whether the optional module a scenario needs is installed."""
+    if scenario.requires is None:
+        return True
+    try:
+        __import__(scenario.requires)
+    except ImportError:
+        return False
+    return True
+
+
+def run_suite(
+    rows: int = 100_000,
+    seed: int = 0,
+    repeat: int = 5,
+    pattern: str = '*'
+) -> Dict[str, Any]:
+    """Time every scenario whose name matches ``pattern``.
+    
+    Returns:
+        Results with a ``meta`` section describing the run and one entry
+        per scenario under ``results``
+    """
+    datasets: Dict[str, pd.DataFrame] = {}
+    results: Dict[str, Dict[str, float]] = {}
+    for scenario in SCENARIOS:
+        if not fnmatch.fnmatch(scenario.name, pattern):
+            continue
+        if not _available(scenario):
+            print(f"{scenario.name:<36} skipped ({scenario.requires} not installed)")
+            continue
+        if scenario.dataset not in datasets:
+            datasets[scenario.dataset] = make_dataset(scenario.dataset, rows, seed)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            workdir = Path(tmpdir)
+            prepared = scenario.prepare(datasets[scenario.dataset], workdir)
+            try:
+                timings = []
+                for index in range(repeat + 1):
+                    start = time.perf_counter()
+                    scenario.run(prepared, workdir)
+                    if index > 0:  # the first run warms caches up
+                        timings.append(time.perf_counter() - start)
+            finally:
+                if scenario.cleanup is not None:
+                    scenario.cleanup(prepared)
+        
+        median = statistics.median(timings)
+        results[scenario.name] = {
+            'median_seconds': median,
+            'min_seconds': min(timings),
+            'rows': rows,
+            'rows_per_second': rows / median,
+        }
+        print(f"{scenario.name:<36}{median:>10.4f}s{rows / median:>14,.0f} rows/s")
+    
+    return {
+        'meta': {
+            'rows': rows,
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """Compare median times of two result sets and print a table.
+    
+    Returns:
+        Names of scenarios more than ``threshold`` (a fraction) slower than
+        in the baseline
+    """
+    for key in ('rows', 'seed'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            raise ValueError(
+                f"Results are not comparable: {key} is {baseline['meta'].get(key)} "
+                f"in the baseline and {current['meta'].get(key)} now"
+            )
+    
+    regressions = []
+    print(f"{'scenario':<36}{'baseline':>11}{'current':>11}{'change':>9}")
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            print(f"{name:<36}{'-':>11}{result['median_seconds']:>10.4f}s{'new':>9}")
+            continue
+        before = baseline['results'][name]['median_seconds']
+        after = result['median_seconds']
+        change = after / before - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<36}{before:>10.4f}s{after:>10.4f}s{change:>+9.1%}{flag}")
+    for name in sorted(baseline['results'].keys() - current['results'].keys()):
+        print(f"{name:<36} missing from current results")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _report(regressions: List[str], threshold: float) -> int:
+    """Print the verdict and return the process exit status."""
+    if regressions:
+        print(f"{len(regressions)} scenario(s) regressed by more than {threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1
+    print(f"No regressions beyond {threshold:.0%}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = commands.add_parser('run', help="Time the scenarios")
+    run_parser.add_argument('--rows', type=int, default=100_000)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--filter', default='*', help="Glob on scenario names, e.g. 'load.*'")
+    run_parser.add_argument('--output', help="Write results as JSON to this file")
+    run_parser.add_argument('--compare', metavar='BASELINE',
+                            help="Use the baseline's rows and seed and compare against it")
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    
+    compare_parser = commands.add_parser('compare', help="Compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        return _report(compare(_load(args.baseline), _load(args.current), args.threshold), args.threshold)
+    
+    baseline = _load(args.compare) if args.compare else None
+    rows = baseline['meta']['rows'] if baseline else args.rows
+    seed = baseline['meta']['seed'] if baseline else args.seed
+    results = run_suite(rows, seed, args.repeat, args.filter)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+    if baseline is None:
+        return 0
+    print()
+    return _report(compare(baseline, results, args.threshold), args.threshold)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
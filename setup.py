@@ -32,6 +32,12 @@ setup(
     python_requires=">=3.9",
     install_requires=requirements,
     extras_require={
+        "parquet": [
+            "pyarrow>=12.0.0",
+        ],
+        "async": [
+            "aiohttp>=3.8.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
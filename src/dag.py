@@ -0,0 +1,209 @@
+"""DAG scheduling of named pipeline steps."""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .utils.metrics import MetricsCollector, count_rows
+
+logger = logging.getLogger(__name__)
+
+ON_ERROR = ('fail', 'skip', 'retry')
+
+
+@dataclass
+class PipelineStep:
+    """Represents a step in the ETL pipeline.
+    
+    ``func`` is called with the results of the ``depends_on`` steps as
+    positional arguments, in that order. ``on_error`` decides what happens
+    when it raises: ``"fail"`` aborts the run, ``"skip"`` drops the step and
+    everything downstream of it, and ``"retry"`` calls it up to ``retries``
+    more times, waiting ``retry_delay`` seconds doubled after each attempt.
+    ``commit`` is called once the run has succeeded, unless a step
+    downstream of this one was skipped.
+    """
+    name: str
+    func: Callable
+    on_error: str = "fail"  # "fail", "skip", "retry"
+    retries: int = 3
+    depends_on: List[str] = field(default_factory=list)
+    retry_delay: float = 0.0
+    commit: Optional[Callable[[], None]] = None
+    
+    @classmethod
+    def extract(cls, name: str, extractor, extract_kwargs: Optional[Dict[str, Any]] = None,
+                **options) -> 'PipelineStep':
+        """Build a root step running ``extractor.extract(**extract_kwargs)``."""
+        def run() -> Any:
+            with extractor:
+                return extractor.extract(**(extract_kwargs or {}))
+        return cls(name, run, commit=extractor.commit, **options)
+    
+    @classmethod
+    def transform(cls, name: str, transformer, depends_on: str, **options) -> 'PipelineStep':
+        """Build a step applying ``transformer`` to the result of ``depends_on``."""
+        return cls(name, transformer.transform, depends_on=[depends_on], **options)
+    
+    @classmethod
+    def load(cls, name: str, loader, depends_on: str, **options) -> 'PipelineStep':
+        """Build a step loading the result of ``depends_on`` with ``loader``."""
+        def run(data: Any) -> None:
+            with loader:
+                loader.load(data)
+        return cls(name, run, depends_on=[depends_on], **options)
+
+
+class DAGScheduler:
+    """Run PipelineSteps in dependency order on a thread pool.
+    
+    A step is submitted as soon as all of its dependencies have finished, so
+    independent branches run concurrently on up to ``max_workers`` threads.
+    A step's result is released once every step depending on it has
+    finished; only the results of sink steps (those nothing depends on) are
+    returned.
+    """
+    
+    def __init__(self, max_workers: int = 4, metrics: Optional[MetricsCollector] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.completed: List[PipelineStep] = []
+        self.skipped: Set[str] = set()
+    
+    def run(self, steps: List[PipelineStep]) -> Dict[str, Any]:
+        """Execute ``steps`` and return the results of the sink steps.
+        
+        Raises:
+            ValueError: If step names repeat, a dependency is unknown or the
+                steps contain a cycle
+        """
+        by_name = self._validate(steps)
+        self._dependents: Dict[str, List[str]] = {step.name: [] for step in steps}
+        for step in steps:
+            for dependency in dict.fromkeys(step.depends_on):
+                self._dependents[dependency].append(step.name)
+        waiting = {step.name: len(set(step.depends_on)) for step in steps}
+        self._consumers = {name: len(children) for name, children in self._dependents.items()}
+        self._by_name = by_name
+        self._results: Dict[str, Any] = {}
+        self.completed = []
+        self.skipped = set()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running: Dict[Future, PipelineStep] = {}
+            
+            def submit(step: PipelineStep) -> None:
+                inputs = [self._results[dependency] for dependency in step.depends_on]
+                running[pool.submit(self._run_step, step, inputs)] = step
+            
+            for step in steps:
+                if not step.depends_on:
+                    submit(step)
+            try:
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step = running.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            if step.on_error != 'skip':
+                                raise
+                            logger.warning(f"Step '{step.name}' failed and is skipped: {e}")
+                            self._skip(step.name)
+                            continue
+                        
+                        self.completed.append(step)
+                        if self._consumers[step.name] > 0 or not self._dependents[step.name]:
+                            self._results[step.name] = result
+                        self._release(step)
+                        for child in self._dependents[step.name]:
+                            waiting[child] -= 1
+                            if waiting[child] == 0 and child not in self.skipped:
+                                submit(by_name[child])
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+        
+        return {
+            name: self._results[name] for name in by_name
+            if not self._dependents[name] and name in self._results
+        }
+    
+    def committable(self) -> List[PipelineStep]:
+        """Completed steps with no skipped step downstream, in completion order."""
+        def tainted(name: str) -> bool:
+            return any(child in self.skipped or tainted(child) for child in self._dependents[name])
+        return [step for step in self.completed if not tainted(step.name)]
+    
+    def _run_step(self, step: PipelineStep, inputs: List[Any]) -> Any:
+        """Call a step, retrying it if configured (runs on a pool thread)."""
+        attempts = 1 + step.retries if step.on_error == 'retry' else 1
+        for attempt in range(attempts):
+            try:
+                if self.metrics is None:
+                    return step.func(*inputs)
+                rows_in = count_rows(inputs[0]) if inputs else None
+                with self.metrics.measure('step', step.name, rows_in) as timer:
+                    result = step.func(*inputs)
+                    timer.rows_out = count_rows(result)
+                return result
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = step.retry_delay * 2 ** attempt
+                logger.warning(
+                    f"Step '{step.name}' failed ({e}); retry {attempt + 1}/{step.retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+    
+    def _release(self, step: PipelineStep) -> None:
+        """Drop results of ``step``'s dependencies that nothing else needs."""
+        for dependency in dict.fromkeys(step.depends_on):
+            self._consumers[dependency] -= 1
+            if self._consumers[dependency] == 0 and self._results.pop(dependency, None) is not None:
+                logger.debug(f"Released result of step '{dependency}'")
+    
+    def _skip(self, name: str) -> None:
+        """Mark a step and everything downstream of it as skipped."""
+        if name in self.skipped:
+            return
+        self.skipped.add(name)
+        self._release(self._by_name[name])
+        for child in self._dependents[name]:
+            self._skip(child)
+    
+    def _validate(self, steps: List[PipelineStep]) -> Dict[str, PipelineStep]:
+        """Check names, dependencies and acyclicity; return steps by name."""
+        by_name: Dict[str, PipelineStep] = {}
+        for step in steps:
+            if step.name in by_name:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            if step.on_error not in ON_ERROR:
+                raise ValueError(f"Unknown on_error for step '{step.name}': {step.on_error}")
+            by_name[step.name] = step
+        for step in steps:
+            for dependency in step.depends_on:
+                if dependency not in by_name:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dependency}'")
+        
+        # Kahn's algorithm: every step must become ready eventually
+        waiting = {step.name: len(set(step.depends_on)) for step in steps}
+        ready = [name for name, count in waiting.items() if count == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for step in steps:
+                if name in step.depends_on:
+                    waiting[step.name] -= 1
+                    if waiting[step.name] == 0:
+                        ready.append(step.name)
+        if visited != len(steps):
+            cycle = sorted(name for name, count in waiting.items() if count > 0)
+            raise ValueError(f"Steps contain a cycle: {', '.join(cycle)}")
+        return by_name
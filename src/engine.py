@@ -0,0 +1,189 @@
+"""Pipelined execution engine with bounded queues between stages."""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+_POLL_INTERVAL = 0.05
+
+
+class _Cancelled(Exception):
+    """Raised inside a stage thread when another stage has failed."""
+
+
+@dataclass
+class StageStats:
+    """Timing of one pipelined stage.
+    
+    ``starved_seconds`` is time spent waiting for input from the upstream
+    stage, ``blocked_seconds`` is time spent waiting for room in the
+    downstream queue (backpressure). The stage with the highest busy time
+    and least idle time is the bottleneck.
+    """
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+    starved_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    
+    @property
+    def idle_seconds(self) -> float:
+        """Total time the stage spent waiting on its neighbours."""
+        return self.starved_seconds + self.blocked_seconds
+    
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's lifetime spent doing work."""
+        total = self.busy_seconds + self.idle_seconds
+        return self.busy_seconds / total if total else 0.0
+
+
+class PipelinedExecutor:
+    """Run a source and a chain of stages concurrently.
+    
+    Every stage runs on its own thread and is connected to the next one by a
+    bounded queue of ``queue_size`` items. A full queue blocks the upstream
+    stage, so at most ``queue_size`` items are buffered between two stages
+    no matter how fast the source is. The first exception raised by any
+    stage stops all other stages and is re-raised by run().
+    """
+    
+    def __init__(self, queue_size: int = 2):
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._lock = threading.Lock()
+    
+    def run(
+        self,
+        source: Iterable[Any],
+        stages: List[Tuple[str, Callable[[Any], Any]]],
+        source_name: str = "extract"
+    ) -> Dict[str, StageStats]:
+        """Drain ``source`` through ``stages``.
+        
+        Args:
+            source: Iterable producing items (e.g. DataFrame batches)
+            stages: (name, func) pairs applied in order; the return value
+                of the last stage is discarded
+            source_name: Name reported for the source stage
+        
+        Returns:
+            Stage statistics keyed by stage name
+        """
+        self._stop.clear()
+        self._errors = []
+        
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        stats = {name: StageStats(name) for name in [source_name] + [n for n, _ in stages]}
+        
+        threads = [threading.Thread(
+            target=self._guard,
+            args=(self._produce, source, queues[0], stats[source_name]),
+            name=f"stage-{source_name}",
+        )]
+        for index, (name, func) in enumerate(stages):
+            out_queue = queues[index + 1] if index + 1 < len(queues) else None
+            threads.append(threading.Thread(
+                target=self._guard,
+                args=(self._consume, func, queues[index], out_queue, stats[name]),
+                name=f"stage-{name}",
+            ))
+        
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        if self._errors:
+            raise self._errors[0]
+        return stats
+    
+    def _guard(self, target: Callable, *args) -> None:
+        """Run a stage body, recording the first failure and stopping peers."""
+        try:
+            target(*args)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            with self._lock:
+                self._errors.append(e)
+            self._stop.set()
+    
+    def _produce(self, source: Iterable[Any], out_queue: queue.Queue, stats: StageStats) -> None:
+        """Pull items from the source and push them downstream."""
+        iterator = iter(source)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    stats.busy_seconds += time.perf_counter() - start
+                stats.items += 1
+                self._put(out_queue, item, stats)
+            self._put(out_queue, _DONE, stats)
+        finally:
+            # Close generators on this thread so their context managers exit here
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+    
+    def _consume(
+        self,
+        func: Callable[[Any], Any],
+        in_queue: queue.Queue,
+        out_queue: Optional[queue.Queue],
+        stats: StageStats
+    ) -> None:
+        """Apply ``func`` to every upstream item and push results downstream."""
+        while True:
+            item = self._get(in_queue, stats)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            result = func(item)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += 1
+            if out_queue is not None:
+                self._put(out_queue, result, stats)
+        if out_queue is not None:
+            self._put(out_queue, _DONE, stats)
+    
+    def _put(self, out_queue: queue.Queue, item: Any, stats: StageStats) -> None:
+        """Block until ``item`` fits in the queue, accounting the wait as blocked."""
+        start = time.perf_counter()
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise _Cancelled()
+                try:
+                    out_queue.put(item, timeout=_POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            stats.blocked_seconds += time.perf_counter() - start
+    
+    def _get(self, in_queue: queue.Queue, stats: StageStats) -> Any:
+        """Block until an item arrives, accounting the wait as starved."""
+        start = time.perf_counter()
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise _Cancelled()
+                try:
+                    return in_queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+        finally:
+            stats.starved_seconds += time.perf_counter() - start
@@ -1,27 +1,150 @@
 """API extractor for REST endpoints."""
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 import requests
-from typing import Any, Dict, List, Optional, Union
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib3.util.retry import Retry
 from .base import BaseExtractor
+from .json_stream import RecordSchema, empty_frame, iter_records, normalize_records
+from .pagination import PageRequest, Paginator, lookup, resolve_paginator
+from ..utils.cache import ExtractCache
+from ..utils.http_cache import CachingHTTPAdapter, HTTPCache
+from ..utils.rate_limit import RateLimiter
+from ..utils.state_store import WatermarkStore
+
+# Responses retried with exponential backoff (or after their Retry-After)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Records per DataFrame when extract() normalizes a response
+NORMALIZE_BATCH_SIZE = 10_000
 
 
 class APIExtractor(BaseExtractor):
-    """Extract data from REST APIs."""
+    """Extract data from REST APIs.
+    
+    With a ``state_store`` the extractor is incremental: the committed
+    watermark is sent as the ``watermark_param`` query parameter, and the
+    next watermark is taken from the response, either from ``cursor_field``
+    (a top-level key holding a cursor) or as the maximum ``watermark_field``
+    over the returned records. It is only persisted by commit(), which
+    ETLPipeline calls after all loaders succeed.
+    
+    With ``pagination`` (a strategy name from ``pagination.PAGINATORS`` or
+    a Paginator instance), extract() follows every page and returns the
+    combined records, and extract_batches() streams them. Records are the
+    body itself when it is a list, or the list at ``records_field`` (a
+    dotted path) otherwise. Numbered pages are fetched by up to
+    ``page_workers`` threads and returned in order.
+    
+    Requests time out after ``timeout`` seconds, and connection errors and
+    the statuses in ``RETRY_STATUSES`` are retried up to ``retries`` times
+    with exponential backoff (``backoff_factor``), waiting for the
+    ``Retry-After`` header when the server sends one. The session keeps up
+    to ``pool_maxsize`` connections per host. ``rate_limit`` caps the
+    requests per second.
+    
+    ``http_cache`` stores GET responses on disk and serves them while their
+    ``Cache-Control: max-age`` lasts, then revalidates them with
+    ``If-None-Match`` / ``If-Modified-Since`` so unchanged data costs a 304
+    instead of a download. Unlike ``cache``, which keeps decoded results
+    for a fixed ``ttl`` whatever the server says, it follows the server's
+    caching headers. Its counters are logged on disconnect().
+    
+    With ``normalize``, records come back as DataFrames instead of JSON:
+    nested fields are flattened into dotted column names, limited to and
+    cast as the columns of ``schema`` when one is given (see
+    ``json_stream.normalize_records``). An unpaginated response is parsed
+    incrementally from the socket, so only one batch of records is ever
+    decoded at a time; pages are bounded by the page size and decoded
+    whole. Streamed responses bypass the cache, and with ``cursor_field``
+    only paginated responses can be normalized, since the cursor is read
+    from the complete body. Each option falls back to the same key in
+    ``config``, so the ``extract`` config section can be passed directly.
+    """
     
     def __init__(
         self, 
         base_url: str, 
         headers: Optional[Dict[str, str]] = None,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[ExtractCache] = None,
+        http_cache: Optional[HTTPCache] = None,
+        state_store: Optional[WatermarkStore] = None,
+        watermark_param: str = "since",
+        watermark_field: Optional[str] = None,
+        cursor_field: Optional[str] = None,
+        state_key: Optional[str] = None,
+        pagination: Union[str, Paginator, None] = None,
+        records_field: Optional[str] = None,
+        page_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        rate_limit: Optional[float] = None,
+        pool_maxsize: Optional[int] = None,
+        normalize: Optional[bool] = None,
+        schema: Optional[RecordSchema] = None
     ):
         super().__init__(config)
         self.base_url = base_url.rstrip('/')
         self.headers = headers or {}
+        self.cache = cache
+        self.http_cache = http_cache
+        self.state_store = state_store
+        self.watermark_param = watermark_param
+        self.watermark_field = watermark_field
+        self.cursor_field = cursor_field
+        self.state_key = state_key or f"api:{self.base_url}"
+        self.paginator = resolve_paginator(pagination or self.config.get('pagination'))
+        self.records_field = records_field or self.config.get('records_field')
+        self.page_workers = page_workers or self.config.get('page_workers', 1)
+        self.timeout = timeout if timeout is not None else self.config.get('timeout', 30)
+        self.retries = retries if retries is not None else self.config.get('retries', 3)
+        self.backoff_factor = backoff_factor if backoff_factor is not None else self.config.get('backoff_factor', 0.5)
+        rate_limit = rate_limit or self.config.get('rate_limit')
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.pool_maxsize = pool_maxsize or self.config.get('pool_maxsize', max(10, self.page_workers))
+        self.normalize = normalize if normalize is not None else self.config.get('normalize', False)
+        self.schema = schema or self.config.get('schema')
+        if self.normalize and self.cursor_field and self.paginator is None:
+            raise ValueError("cursor_field requires pagination when normalizing responses")
+        self._pending_watermark: Any = None
+        self._lock = threading.Lock()
         self.session: Optional[requests.Session] = None
     
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; copies sent to worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
     def connect(self) -> None:
-        """Initialize HTTP session."""
+        """Initialize HTTP session with a retrying, pooled adapter."""
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        options = {'pool_maxsize': self.pool_maxsize, 'max_retries': retry, 'pool_block': True}
+        if self.http_cache is not None:
+            adapter = CachingHTTPAdapter(self.http_cache, **options)
+        else:
+            adapter = HTTPAdapter(**options)
         self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update(self.headers)
+        self.bytes_read = 0
         self.logger.info(f"Connected to API: {self.base_url}")
     
     def extract(
@@ -31,9 +154,12 @@ class APIExtractor(BaseExtractor):
         params: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None,
         **kwargs
-    ) -> Union[Dict, List]:
+    ) -> Union[Dict, List, pd.DataFrame]:
         """Extract data from API endpoint.
         
+        When a cache is configured, responses are keyed on method, URL,
+        query parameters, JSON body and extra request arguments.
+        
         Args:
             endpoint: API endpoint path
             method: HTTP method (GET, POST, etc.)
@@ -42,29 +168,300 @@ class APIExtractor(BaseExtractor):
             **kwargs: Additional arguments passed to requests
             
         Returns:
-            Response data as dict or list
+            Response data as dict or list, the records of all pages when
+            paginating, or a DataFrame when normalizing
         """
+        request = self._start(endpoint, params)
+        if self.normalize:
+            frames = list(self._iter_frames(request, method, json_data, kwargs, NORMALIZE_BATCH_SIZE))
+            data = pd.concat(frames, ignore_index=True) if frames else empty_frame(self.schema)
+            self.logger.info(f"Extracted {len(data)} records from {request[0]}")
+            return data
+        
+        if self.paginator is not None:
+            records = [
+                record for page in self._iter_pages(request, method, json_data, kwargs)
+                for record in page
+            ]
+            self.logger.info(f"Extracted {len(records)} records from {request[0]}")
+            return records
+        
+        body, _ = self._fetch(method, request, json_data, kwargs)
+        self._track_watermark(body, self._records(body, strict=False))
+        self.logger.info(f"Extracted data from {request[0]}")
+        return body
+    
+    def extract_batches(
+        self,
+        batch_size: int = 1000,
+        endpoint: str = "",
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Iterator[Union[Dict, List, pd.DataFrame]]:
+        """Stream the records of all pages in lists of ``batch_size``.
+        
+        Without pagination the whole response is yielded as one batch,
+        unless normalizing: DataFrames of ``batch_size`` rows are then
+        yielded as the response is parsed. Arguments are as for extract().
+        """
+        if self.normalize:
+            request = self._start(endpoint, params)
+            yield from self._iter_frames(request, method, json_data, kwargs, batch_size)
+            return
+        
+        if self.paginator is None:
+            yield self.extract(endpoint, method, params, json_data, **kwargs)
+            return
+        
+        request = self._start(endpoint, params)
+        pending: List[Any] = []
+        for page in self._iter_pages(request, method, json_data, kwargs):
+            pending.extend(page)
+            while len(pending) >= batch_size:
+                yield pending[:batch_size]
+                pending = pending[batch_size:]
+        if pending:
+            yield pending
+    
+    def _start(self, endpoint: str, params: Optional[Dict[str, Any]]) -> PageRequest:
+        """Return the first request of an extraction, with the committed watermark."""
         if not self.session:
             raise RuntimeError("Not connected. Call connect() first.")
         
         url = f"{self.base_url}/{endpoint.lstrip('/')}" if endpoint else self.base_url
+        if self.state_store is not None:
+            committed = self.state_store.get(self.state_key)
+            if committed is not None:
+                params = {**(params or {}), self.watermark_param: committed}
+        self._pending_watermark = None
+        return url, params or {}
+    
+    def _fetch(
+        self,
+        method: str,
+        request: PageRequest,
+        json_data: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+        """Send one request and return its decoded body and Link header.
         
+        Safe to call from several threads at once.
+        """
+        url, params = request
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key('api-page', method.upper(), url, params, json_data, kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
         response = self.session.request(
             method=method,
             url=url,
             params=params,
             json=json_data,
-            **kwargs
+            **{'timeout': self.timeout, **kwargs}
         )
         response.raise_for_status()
+        with self._lock:
+            self.bytes_read = (self.bytes_read or 0) + len(response.content)
+        
+        result = (response.json(), response.links)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+    
+    def _stream_records(
+        self,
+        method: str,
+        request: PageRequest,
+        json_data: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> Iterator[Any]:
+        """Send one request and yield its records as the body is parsed."""
+        url, params = request
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = self.session.request(
+            method=method,
+            url=url,
+            params=params,
+            json=json_data,
+            stream=True,
+            **{'timeout': self.timeout, **kwargs}
+        )
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            count = 0
+            for record in iter_records(response.raw, self.records_field):
+                count += 1
+                yield record
+            if not count:
+                self.logger.warning(f"No records at {self.records_field or 'the top level'} of {url}")
+            with self._lock:
+                self.bytes_read = (self.bytes_read or 0) + response.raw.tell()
+        finally:
+            response.close()
+    
+    def _iter_frames(
+        self,
+        request: PageRequest,
+        method: str,
+        json_data: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any],
+        batch_size: int
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the records of a response or all its pages as DataFrames."""
+        streamed = self.paginator is None
+        if streamed:
+            records = self._stream_records(method, request, json_data, kwargs)
+        else:
+            records = (record for page in self._iter_pages(request, method, json_data, kwargs) for record in page)
+        
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                return
+            if streamed:
+                self._track_watermark(None, batch)
+            yield normalize_records(batch, self.schema)
+    
+    def _iter_pages(
+        self,
+        request: PageRequest,
+        method: str,
+        json_data: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> Iterator[List[Any]]:
+        """Yield the records of every page in order."""
+        if self.paginator.numbered:
+            yield from self._iter_numbered_pages(request, method, json_data, kwargs)
+            return
+        
+        request = self.paginator.first(*request)
+        pages = 0
+        while request is not None:
+            body, links = self._fetch(method, request, json_data, kwargs)
+            records = self._records(body)
+            self._track_watermark(body, records)
+            pages += 1
+            yield records
+            # An empty page ends the result even if it links to another one
+            request = self.paginator.next(request, body, links, records) if records else None
+        self.logger.debug(f"Fetched {pages} pages")
+    
+    def _iter_numbered_pages(
+        self,
+        request: PageRequest,
+        method: str,
+        json_data: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> Iterator[List[Any]]:
+        """Yield numbered pages, fetching up to ``page_workers`` ahead.
+        
+        The first page is fetched alone to learn the page count, if the API
+        announces it. Otherwise pages are requested until one comes back
+        short, so up to ``page_workers - 1`` requests past the end are made.
+        """
+        paginator = self.paginator
+        url, params = request
+        body, _ = self._fetch(method, paginator.page(url, params, 0), json_data, kwargs)
+        records = self._records(body)
+        self._track_watermark(body, records)
+        yield records
+        if paginator.is_last(records):
+            return
+        
+        count = paginator.page_count(body)
+        index = 1
+        window: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.page_workers) as pool:
+            try:
+                while True:
+                    while len(window) < self.page_workers and (count is None or index < count):
+                        page = paginator.page(url, params, index)
+                        window.append(pool.submit(self._fetch, method, page, json_data, kwargs))
+                        index += 1
+                    if not window:
+                        break
+                    body, _ = window.popleft().result()
+                    records = self._records(body)
+                    self._track_watermark(body, records)
+                    yield records
+                    if paginator.is_last(records):
+                        break
+            finally:
+                for future in window:
+                    future.cancel()
+        self.logger.debug(f"Requested {index} pages with {self.page_workers} workers")
+    
+    def _records(self, body: Any, strict: bool = True) -> List[Any]:
+        """Return the records of a response body.
+        
+        Raises:
+            ValueError: If ``strict`` and the body holds no list of records
+        """
+        if isinstance(body, list):
+            return body
+        records = lookup(body, self.records_field) if self.records_field else None
+        if isinstance(records, list):
+            return records
+        if strict:
+            raise ValueError(f"No list of records in response (records_field={self.records_field!r})")
+        return []
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the endpoint and committed watermark.
+        
+        Responses themselves are not covered: a resumed run reuses the
+        checkpointed data even if the API would now return different data.
+        """
+        return {
+            'config': self.config,
+            'base_url': self.base_url,
+            'watermark': self.state_store.get(self.state_key) if self.state_store is not None else None,
+        }
+    
+    def commit(self) -> None:
+        """Persist the watermark reached by the last extraction."""
+        if self.state_store is not None and self._pending_watermark is not None:
+            self.state_store.set(self.state_key, self._pending_watermark)
+            self._pending_watermark = None
+    
+    def _track_watermark(self, body: Any, records: List[Any]) -> None:
+        """Remember the watermark the next run should resume from.
+        
+        Called once per page: a cursor is taken from the latest page that
+        has one, a field watermark is the maximum over all pages.
+        """
+        if self.state_store is None:
+            return
+        
+        latest = None
+        if self.cursor_field and isinstance(body, dict):
+            latest = body.get(self.cursor_field)
+        elif self.watermark_field:
+            values = [
+                record[self.watermark_field] for record in records
+                if isinstance(record, dict) and record.get(self.watermark_field) is not None
+            ]
+            if self._pending_watermark is not None:
+                values.append(self._pending_watermark)
+            latest = max(values) if values else None
         
-        data = response.json()
-        self.logger.info(f"Extracted data from {url}")
-        return data
+        if latest is not None:
+            self._pending_watermark = latest
     
     def disconnect(self) -> None:
         """Close HTTP session."""
         if self.session:
             self.session.close()
             self.session = None
+        if self.http_cache is not None:
+            self.logger.info(f"HTTP cache: {self.http_cache.summary()}")
         self.logger.info("Disconnected from API")
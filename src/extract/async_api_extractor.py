@@ -0,0 +1,305 @@
+"""Asyncio-based extractor for many small REST requests."""
+import asyncio
+import email.utils
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .api_extractor import RETRY_STATUSES
+from .base import BaseExtractor
+
+_END = object()
+
+
+class AsyncAPIExtractor(BaseExtractor):
+    """Extract data from REST APIs with one request per key, concurrently.
+    
+    Built for fan-out such as one call per customer ID: ``endpoint`` may
+    contain a ``{key}`` placeholder, filled in for each of ``keys``. At most
+    ``concurrency`` requests are in flight (guarded by a semaphore shared by
+    all calls on the extractor), over a keep-alive connection pool limited
+    to ``limit_per_host`` connections per host. Connection errors and the
+    statuses in ``RETRY_STATUSES`` are retried up to ``retries`` times with
+    exponential backoff, or after the ``Retry-After`` the server sends.
+    
+    The coroutine API (connect_async(), extract_async(), stream_async(),
+    disconnect_async(), or ``async with``) runs on the caller's event loop.
+    The synchronous BaseExtractor methods used by ETLPipeline run the same
+    coroutines on a private event loop, so they cannot be called from
+    inside a running loop. Requires ``aiohttp``.
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        concurrency: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None
+    ):
+        super().__init__(config)
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers or {}
+        self.concurrency = concurrency or self.config.get('concurrency', 100)
+        self.limit_per_host = limit_per_host or self.config.get('limit_per_host', self.concurrency)
+        self.timeout = timeout if timeout is not None else self.config.get('timeout', 30)
+        self.retries = retries if retries is not None else self.config.get('retries', 3)
+        self.backoff_factor = backoff_factor if backoff_factor is not None else self.config.get('backoff_factor', 0.5)
+        self.requests_made = 0
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def connect_async(self) -> None:
+        """Open the HTTP session and its connection pool."""
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("aiohttp required. Install with: pip install aiohttp")
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.bytes_read = 0
+        self.requests_made = 0
+        self.logger.info(f"Connected to API: {self.base_url}")
+    
+    async def disconnect_async(self) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.logger.info("Disconnected from API")
+    
+    async def extract_async(
+        self,
+        endpoint: str = "",
+        keys: Optional[Iterable[Any]] = None,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Any:
+        """Request ``endpoint`` once, or once per key.
+        
+        Args:
+            endpoint: API endpoint path, with ``{key}`` where keys go
+            keys: Values for the ``{key}`` placeholder
+            method: HTTP method
+            params: Query parameters sent with every request
+            **kwargs: Additional arguments passed to aiohttp's request()
+        
+        Returns:
+            The decoded body, or a list of bodies in the order of ``keys``
+        """
+        if keys is None:
+            return await self._request(method, self._url(endpoint), params, kwargs)
+        
+        results: Dict[int, Any] = {}
+        async for index, _, body in self._stream(endpoint, keys, method, params, kwargs):
+            results[index] = body
+        self.logger.info(f"Extracted {len(results)} responses from {self.base_url}")
+        return [results[index] for index in range(len(results))]
+    
+    async def stream_async(
+        self,
+        endpoint: str,
+        keys: Iterable[Any],
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> AsyncIterator[Tuple[Any, Any]]:
+        """Yield ``(key, body)`` for each key as its response arrives.
+        
+        Keys are consumed lazily, so ``keys`` may be a generator over more
+        IDs than fit in memory as tasks. The first failed request cancels
+        the ones in flight and is raised.
+        """
+        async for _, key, body in self._stream(endpoint, keys, method, params, kwargs):
+            yield key, body
+    
+    async def __aenter__(self):
+        await self.connect_async()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect_async()
+    
+    def connect(self) -> None:
+        """Open the session on a private event loop."""
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.connect_async())
+    
+    def extract(
+        self,
+        endpoint: str = "",
+        keys: Optional[Iterable[Any]] = None,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Any:
+        """Synchronous extract_async()."""
+        return self._run(self.extract_async(endpoint, keys, method, params, **kwargs))
+    
+    def extract_batches(
+        self,
+        batch_size: int = 1000,
+        endpoint: str = "",
+        keys: Optional[Iterable[Any]] = None,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Iterator[List[Any]]:
+        """Yield lists of up to ``batch_size`` bodies in completion order.
+        
+        Without ``keys`` the single response is yielded as one batch.
+        """
+        if keys is None:
+            yield self.extract(endpoint, method=method, params=params, **kwargs)
+            return
+        
+        stream = self._stream(endpoint, keys, method, params, kwargs)
+        batch: List[Any] = []
+        try:
+            while True:
+                item = self._run(stream.__anext__(), stop=True)
+                if item is _END:
+                    break
+                batch.append(item[2])
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        finally:
+            self._run(stream.aclose())
+        if batch:
+            yield batch
+    
+    def disconnect(self) -> None:
+        """Close the session and the private event loop."""
+        if self._loop is None:
+            return
+        try:
+            self._loop.run_until_complete(self.disconnect_async())
+        finally:
+            self._loop.close()
+            self._loop = None
+    
+    def _run(self, coroutine, stop: bool = False) -> Any:
+        """Run a coroutine on the private loop (``stop`` maps exhaustion to _END)."""
+        if self._loop is None:
+            coroutine.close()
+            raise RuntimeError("Not connected. Call connect() first.")
+        try:
+            return self._loop.run_until_complete(coroutine)
+        except StopAsyncIteration:
+            if stop:
+                return _END
+            raise
+    
+    def _url(self, endpoint: str, key: Any = None) -> str:
+        if key is not None:
+            endpoint = endpoint.format(key=key)
+        return f"{self.base_url}/{endpoint.lstrip('/')}" if endpoint else self.base_url
+    
+    async def _stream(
+        self,
+        endpoint: str,
+        keys: Iterable[Any],
+        method: str,
+        params: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[int, Any, Any]]:
+        """Yield ``(index, key, body)`` as responses complete.
+        
+        Twice ``concurrency`` tasks are kept queued so the semaphore never
+        waits on task creation, without one task per key up front.
+        """
+        async def fetch(index: int, key: Any) -> Tuple[int, Any, Any]:
+            return index, key, await self._request(method, self._url(endpoint, key), params, kwargs)
+        
+        keys = iter(keys)
+        pending = set()
+        index = 0
+        exhausted = False
+        start = time.perf_counter()
+        try:
+            while True:
+                while not exhausted and len(pending) < 2 * self.concurrency:
+                    key = next(keys, _END)
+                    if key is _END:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(fetch(index, key)))
+                    index += 1
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        self.logger.debug(f"{index} requests in {elapsed:.2f}s ({index / elapsed if elapsed else 0:.0f}/s)")
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> Any:
+        """Send one request with retries and return its decoded JSON body."""
+        import aiohttp
+        
+        if self._session is None:
+            raise RuntimeError("Not connected. Call connect() first.")
+        
+        for attempt in range(self.retries + 1):
+            delay = None
+            async with self._semaphore:
+                try:
+                    async with self._session.request(method, url, params=params, **kwargs) as response:
+                        self.requests_made += 1
+                        if response.status in RETRY_STATUSES and attempt < self.retries:
+                            delay = _retry_after(response.headers.get('Retry-After'))
+                        else:
+                            response.raise_for_status()
+                            payload = await response.read()
+                            self.bytes_read += len(payload)
+                            return json.loads(payload) if payload else None
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt == self.retries:
+                        raise
+                    self.logger.debug(f"Request to {url} failed ({e!r}); retrying")
+            # Back off outside the semaphore so waiting retries do not hold slots
+            if delay is None:
+                delay = self.backoff_factor * 2 ** attempt
+            await asyncio.sleep(delay)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or an HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -1,17 +1,34 @@
 """Base extractor class for ETL pipeline."""
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class BaseExtractor(ABC):
-    """Abstract base class for all extractors."""
+    """Abstract base class for all extractors.
+    
+    Extractors setting ``supports_pushdown`` accept ``usecols`` and a
+    ``chunk_transform`` callable in extract(), and ``usecols`` in
+    extract_batches(), so a lazy transformer plan can be applied while the
+    source is read.
+    
+    Extractors that can tell how much they read set ``bytes_read`` during
+    extraction; it is reported in ETLPipeline's run metrics.
+    
+    Incremental extractors keep the watermark that commit() will persist in
+    ``pending_watermark``, so that ETLPipeline can save it with a
+    checkpoint and commit it after a resumed run.
+    """
+    
+    supports_pushdown: bool = False
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.bytes_read: Optional[int] = None
+        self._pending_watermark: Any = None
     
     @abstractmethod
     def connect(self) -> None:
@@ -28,6 +45,48 @@ class BaseExtractor(ABC):
         """Close connection to data source."""
         pass
     
+    def commit(self) -> None:
+        """Persist extraction progress such as incremental watermarks.
+        
+        Called by ETLPipeline once every loader has succeeded. The default
+        implementation does nothing.
+        """
+        pass
+    
+    @property
+    def pending_watermark(self) -> Any:
+        """Watermark reached by the last extraction and not yet committed."""
+        return self._pending_watermark
+    
+    @pending_watermark.setter
+    def pending_watermark(self, value: Any) -> None:
+        self._pending_watermark = value
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the source so that stale checkpoints can be detected.
+        
+        ETLPipeline discards checkpoints when the signature changes. The
+        default covers ``config``; extractors reading files add the file's
+        size and modification time.
+        """
+        return {'config': self.config}
+    
+    def extract_batches(self, batch_size: int = 1000, **kwargs) -> Iterator[Any]:
+        """Extract data from source as a sequence of batches.
+        
+        The default implementation yields the result of extract() as a
+        single batch. Extractors that can read incrementally override this
+        so that memory use is bounded by the batch size.
+        
+        Args:
+            batch_size: Preferred number of records per batch
+            **kwargs: Arguments passed to the underlying read
+            
+        Yields:
+            Batches of extracted data
+        """
+        yield self.extract(**kwargs)
+    
     def __enter__(self):
         self.connect()
         return self
@@ -1,38 +1,570 @@
 """CSV file extractor."""
+import glob
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from .base import BaseExtractor
+from .dtypes import ColumnSchemas, SchemaCache, apply_schema, infer_column, memory_report
+from ..utils.cache import ExtractCache
+from ..utils.files import stable_hash
+from ..utils.state_store import WatermarkStore
+
+# Rows per chunk when a chunk_transform is applied during extract()
+PUSHDOWN_CHUNKSIZE = 100_000
+
+# read_csv options that do not affect which columns the header names
+_DATA_OPTIONS = ('usecols', 'dtype', 'chunksize', 'iterator', 'nrows')
+
+# Files a directory input is expanded to, optionally with a compression suffix
+CSV_SUFFIXES = ('.csv', '.tsv', '.txt')
+COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.lz4', '.zst')
+
+EXECUTORS = {'process': ProcessPoolExecutor, 'thread': ThreadPoolExecutor}
+
+# Committed watermark not yet read from the state store
+_UNREAD = object()
+
+
+def read_csv_file(path: Union[str, Path], read_config: Dict[str, Any]) -> pd.DataFrame:
+    """Parse one CSV file, decompressing it by its suffix.
+    
+    Runs in CSVExtractor's worker processes. When pyarrow is installed it
+    decompresses the file (gzip, bz2, lz4 and zstd). Parsing uses the same
+    engine as a single-file read (pandas' default unless ``engine`` is
+    given), so a file parses to the same frame whether it is read on its
+    own or as part of a glob, directory or list.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return pd.read_csv(path, **read_config)
+    if 'compression' in read_config:
+        return pd.read_csv(path, **read_config)
+    with pa.input_stream(str(path), compression='detect') as stream:
+        return pd.read_csv(stream, **read_config)
+
+
+def _is_csv_name(name: str) -> bool:
+    """Return whether a file name looks like a (compressed) CSV file."""
+    stem, suffix = os.path.splitext(name.lower())
+    if suffix in COMPRESSION_SUFFIXES:
+        stem, suffix = os.path.splitext(stem)
+    return suffix in CSV_SUFFIXES
 
 
 class CSVExtractor(BaseExtractor):
-    """Extract data from CSV files."""
+    """Extract data from CSV files.
+    
+    With a ``state_store`` the extractor is incremental, for append-only
+    files. By default it remembers the byte offset of the last complete
+    line read and later runs parse only the bytes appended since. With
+    ``watermark_column`` it instead keeps rows whose value in that column
+    is greater than the highest value already processed. The new watermark
+    is only persisted by commit(), which ETLPipeline calls after all
+    loaders succeed.
+    
+    With ``optimize_dtypes`` the first read infers a compact schema (see
+    ``extract.dtypes``): downcast numerics, categoricals for strings with at
+    most ``category_threshold`` distinct values, and Arrow-backed strings.
+    The schema is saved to ``schema_path`` (``<file>.schema.json`` by
+    default) and later reads pass it to pd.read_csv so dtype inference is
+    skipped. The memory saved per column is kept in ``memory_report``.
     
-    def __init__(self, file_path: Union[str, Path], config: Optional[Dict[str, Any]] = None):
+    ``file_path`` may also be a glob (``'landing/2024-05-*/*.csv.gz'``), a
+    directory (its ``.csv``/``.tsv``/``.txt`` files, optionally compressed)
+    or a list of paths. Globs and directories are expanded by connect(), in
+    sorted order. Files are parsed by ``file_workers`` processes (threads
+    with ``executor='thread'``) with read_csv_file(), so decompression and
+    parsing both happen in the workers. extract() concatenates the files in
+    order and extract_batches() yields one DataFrame per file. The byte
+    offset incremental mode needs a single file; ``watermark_column``
+    works with several. Without a ``schema_path``, a multi-file schema is
+    saved as ``_csv_schema.json`` in the input's directory. A list of files
+    is identified by a digest of its sorted paths, which names its schema
+    (``_csv_schema.<digest>.json``), default ``state_key`` and log lines,
+    so lists from the same directory do not share them.
+    """
+    
+    supports_pushdown = True
+    
+    def __init__(
+        self,
+        file_path: Union[str, Path, Sequence[Union[str, Path]]],
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[ExtractCache] = None,
+        state_store: Optional[WatermarkStore] = None,
+        watermark_column: Optional[str] = None,
+        state_key: Optional[str] = None,
+        optimize_dtypes: bool = False,
+        category_threshold: float = 0.5,
+        schema_path: Optional[Union[str, Path]] = None,
+        file_workers: Optional[int] = None,
+        executor: str = 'process'
+    ):
         super().__init__(config)
-        self.file_path = Path(file_path)
+        if isinstance(file_path, (list, tuple)):
+            self._paths: Optional[List[Path]] = [Path(path) for path in file_path]
+            if not self._paths:
+                raise ValueError("No CSV files given")
+            self.file_path = self._paths[0].parent
+            self.multi_file = True
+            self._files_id: Optional[str] = stable_hash(*sorted(str(path.resolve()) for path in self._paths))[:16]
+            self.source = f"{self.file_path} (file list {self._files_id})"
+        else:
+            self._paths = None
+            self._files_id = None
+            self.file_path = Path(file_path)
+            self.source = str(self.file_path)
+            self.multi_file = self.file_path.is_dir() or any(char in str(file_path) for char in '*?[')
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor}")
+        if self.multi_file and state_store is not None and watermark_column is None:
+            raise ValueError("Byte-offset incremental reads need a single file; set watermark_column")
+        self.file_workers = file_workers or os.cpu_count() or 1
+        self.executor = executor
+        self.files: List[Path] = [] if self.multi_file else [self.file_path]
+        self.cache = cache
+        self.state_store = state_store
+        self.watermark_column = watermark_column
+        if state_key is None:
+            state_key = f"csv:{self.file_path.resolve()}"
+            if self._files_id:
+                state_key += f":{self._files_id}"
+        self.state_key = state_key
+        self.optimize_dtypes = optimize_dtypes
+        self.category_threshold = category_threshold
+        if schema_path is None:
+            if self._files_id:
+                schema_path = self._input_dir() / f"_csv_schema.{self._files_id}.json"
+            elif self.multi_file:
+                schema_path = self._input_dir() / '_csv_schema.json'
+            else:
+                schema_path = self.file_path.with_name(f"{self.file_path.name}.schema.json")
+        self.schema_cache = SchemaCache(schema_path)
+        self.memory_report: Optional[pd.DataFrame] = None
+        self._pending_watermark: Any = None
+        self._committed: Any = _UNREAD
         self._data = None
     
     def connect(self) -> None:
-        """Verify file exists."""
+        """Verify the file exists, or expand a multi-file input."""
+        self._committed = _UNREAD
+        if self.multi_file:
+            self.files = self._resolve_files()
+            if not self.files:
+                raise FileNotFoundError(f"No CSV files found: {self.source}")
+            self.logger.info(f"Connected to {len(self.files)} CSV files: {self.source}")
+            return
         if not self.file_path.exists():
             raise FileNotFoundError(f"CSV file not found: {self.file_path}")
         self.logger.info(f"Connected to CSV file: {self.file_path}")
     
-    def extract(self, **kwargs) -> pd.DataFrame:
+    def extract(
+        self,
+        chunk_transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        **kwargs
+    ) -> pd.DataFrame:
         """Extract data from CSV file.
         
+        When a cache is configured, results are keyed on the file path,
+        modification time, size and read arguments; reads with a
+        ``chunk_transform`` are not cached. If a saved schema no longer
+        parses the file, it is discarded and inferred again.
+        
         Args:
+            chunk_transform: Optional function applied to each chunk while
+                reading (e.g. pushed-down filters), so rows it drops are
+                never held in memory together
             **kwargs: Additional arguments passed to pd.read_csv()
             
         Returns:
             pd.DataFrame: Extracted data
         """
         read_config = {**self.config, **kwargs}
-        self._data = pd.read_csv(self.file_path, **read_config)
-        self.logger.info(f"Extracted {len(self._data)} rows from {self.file_path}")
+        self._committed = _UNREAD
+        cache_key = None
+        if self.cache is not None and chunk_transform is None:
+            cache_key = self.cache.make_key(
+                'csv', *self._file_states(), read_config, self._committed_watermark(), self.optimize_dtypes
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._data, self._pending_watermark = cached
+                self.bytes_read = 0
+                self.logger.info(f"Extracted {len(self._data)} rows from cache for {self.source}")
+                return self._data
+        
+        read = self._read_files if self.multi_file else self._read
+        schema, header = self._load_schema(read_config)
+        try:
+            self._data = read(self._with_schema(read_config, schema), chunk_transform)
+        except (ValueError, TypeError) as e:
+            if schema is None:
+                raise
+            self._discard_schema(e)
+            schema = None
+            self._data = read(read_config, chunk_transform)
+        if self.optimize_dtypes:
+            self._data, _ = self._optimize(self._data, schema, header, report=True)
+        if cache_key is not None:
+            self.cache.put(cache_key, (self._data, self._pending_watermark))
+        self.logger.info(f"Extracted {len(self._data)} rows from {self.source}")
         return self._data
     
+    def _read(
+        self,
+        read_config: Dict[str, Any],
+        chunk_transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    ) -> pd.DataFrame:
+        """Parse the source, applying the watermark and ``chunk_transform``."""
+        source = self._open_source()
+        self.bytes_read = self._source_size(source)
+        if chunk_transform is None:
+            return self._apply_watermark(pd.read_csv(source, **read_config))
+        
+        read_config = {'chunksize': PUSHDOWN_CHUNKSIZE, **read_config}
+        with pd.read_csv(source, **read_config) as reader:
+            chunks = [chunk_transform(self._apply_watermark(chunk)) for chunk in reader]
+        if not chunks:
+            read_config.pop('chunksize')
+            empty = pd.read_csv(self._open_source(), **read_config)
+            chunks = [chunk_transform(self._apply_watermark(empty))]
+        return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    
+    def _read_files(
+        self,
+        read_config: Dict[str, Any],
+        chunk_transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    ) -> pd.DataFrame:
+        """Parse every file in the workers and concatenate them in order."""
+        self.bytes_read = sum(path.stat().st_size for path in self.files)
+        frames = []
+        for frame in self._iter_files(read_config):
+            frame = self._apply_watermark(frame)
+            frames.append(chunk_transform(frame) if chunk_transform else frame)
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    
+    def _iter_files(
+        self,
+        read_config: Dict[str, Any],
+        files: Optional[List[Path]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the parsed ``files`` (default: all) in order, parsing up to ``file_workers`` ahead."""
+        files = self.files if files is None else files
+        workers = min(self.file_workers, len(files))
+        if workers <= 1:
+            for path in files:
+                yield read_csv_file(path, read_config)
+            return
+        
+        paths = iter(files)
+        window: deque = deque()
+        with EXECUTORS[self.executor](max_workers=workers) as pool:
+            try:
+                while True:
+                    for path in paths:
+                        window.append(pool.submit(read_csv_file, path, read_config))
+                        if len(window) >= workers:
+                            break
+                    if not window:
+                        break
+                    yield window.popleft().result()
+            finally:
+                for future in window:
+                    future.cancel()
+    
+    def extract_batches(self, batch_size: int = 1000, **kwargs) -> Iterator[pd.DataFrame]:
+        """Extract data from CSV file in chunks of ``batch_size`` rows.
+        
+        Only one chunk is held in memory at a time, so peak memory depends
+        on the batch size rather than on the file size. With
+        ``optimize_dtypes`` a missing schema is inferred from the first
+        chunk and widened if later chunks need it. With several files, one
+        DataFrame per file is yielded instead and ``batch_size`` is
+        ignored; up to ``file_workers`` files are parsed ahead.
+        
+        Args:
+            batch_size: Number of rows per chunk
+            **kwargs: Additional arguments passed to pd.read_csv()
+            
+        Yields:
+            pd.DataFrame: Consecutive chunks of the file, or the files in order
+        """
+        read_config = {**self.config, **kwargs}
+        self._committed = _UNREAD
+        schema, header = self._load_schema(read_config)
+        total_rows = 0
+        discarded = False
+        for frame, reparsed in self._parse_batches(read_config, schema, batch_size):
+            if reparsed and not discarded:
+                # Infer the remaining columns again rather than casting to the stale schema
+                schema, discarded = None, True
+            frame = self._apply_watermark(frame)
+            if self.optimize_dtypes:
+                frame, schema = self._optimize(frame, schema, header)
+            total_rows += len(frame)
+            yield frame
+        if self.multi_file:
+            self.logger.info(f"Extracted {total_rows} rows from {len(self.files)} files in {self.source}")
+        else:
+            self.logger.info(f"Extracted {total_rows} rows from {self.file_path} in batches of {batch_size}")
+    
+    def _parse_batches(
+        self,
+        read_config: Dict[str, Any],
+        schema: Optional[ColumnSchemas],
+        batch_size: int
+    ) -> Iterator[Tuple[pd.DataFrame, bool]]:
+        """Yield the chunks or files parsed with the saved schema's dtypes.
+        
+        If the schema stops fitting part-way through, it is discarded and
+        the rest is parsed again with inferred dtypes: the remaining files,
+        or the file from its start skipping the rows already yielded.
+        
+        Yields:
+            Each frame, and whether it was parsed after the schema was discarded
+        """
+        parsed = 0
+        if self.multi_file:
+            self.bytes_read = sum(path.stat().st_size for path in self.files)
+            try:
+                for frame in self._iter_files(self._with_schema(read_config, schema)):
+                    parsed += 1
+                    yield frame, False
+                return
+            except (ValueError, TypeError) as e:
+                if schema is None:
+                    raise
+                self._discard_schema(e)
+            for frame in self._iter_files(read_config, self.files[parsed:]):
+                yield frame, True
+            return
+        
+        read_config = {**read_config, 'chunksize': batch_size}
+        source = self._open_source()
+        self.bytes_read = self._source_size(source)
+        try:
+            with pd.read_csv(source, **self._with_schema(read_config, schema)) as reader:
+                for chunk in reader:
+                    parsed += len(chunk)
+                    yield chunk, False
+            return
+        except (ValueError, TypeError) as e:
+            if schema is None:
+                raise
+            self._discard_schema(e)
+        if isinstance(source, io.BytesIO):
+            source.seek(0)
+        with pd.read_csv(source, **read_config) as reader:
+            for chunk in reader:
+                if parsed >= len(chunk):
+                    parsed -= len(chunk)
+                    continue
+                yield chunk.iloc[parsed:], True
+                parsed = 0
+    
+    def _discard_schema(self, error: Exception) -> None:
+        """Delete a saved schema the source no longer parses with."""
+        self.logger.warning(f"Saved schema does not fit {self.source} ({error}); inferring again")
+        self.schema_cache.delete()
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the files' current state, read options and committed watermark."""
+        files = [dict(zip(('path', 'mtime_ns', 'size'), state)) for state in self._file_states()]
+        return {
+            'config': self.config,
+            **(files[0] if not self.multi_file else {'files': files}),
+            'watermark_column': self.watermark_column,
+            'watermark': self._committed_watermark(),
+            'optimize_dtypes': self.optimize_dtypes,
+        }
+    
+    def commit(self) -> None:
+        """Persist the watermark reached by the last extraction."""
+        if self.state_store is not None and self._pending_watermark is not None:
+            self.state_store.set(self.state_key, self._pending_watermark)
+            self._committed = self._pending_watermark
+            self._pending_watermark = None
+    
+    def _file_states(self) -> List[List[Any]]:
+        """Return ``[path, mtime_ns, size]`` of every input file.
+        
+        Multi-file inputs are expanded again, since checkpoints are
+        fingerprinted before the pipeline connects the extractor.
+        """
+        states = []
+        for path in self._resolve_files() if self.multi_file else [self.file_path]:
+            stat = path.stat()
+            states.append([str(path.resolve()), stat.st_mtime_ns, stat.st_size])
+        return states
+    
+    def _resolve_files(self) -> List[Path]:
+        """Expand the list, directory or glob input into files."""
+        if self._paths is not None:
+            missing = [str(path) for path in self._paths if not path.is_file()]
+            if missing:
+                raise FileNotFoundError(f"CSV files not found: {missing}")
+            return list(self._paths)
+        if self.file_path.is_dir():
+            return sorted(
+                path for path in self.file_path.iterdir()
+                if path.is_file() and _is_csv_name(path.name)
+            )
+        return sorted(Path(path) for path in glob.glob(str(self.file_path), recursive=True) if os.path.isfile(path))
+    
+    def _input_dir(self) -> Path:
+        """Return the directory of the input: the directory itself or a glob's fixed prefix."""
+        if self._paths is not None or self.file_path.is_dir():
+            return self.file_path
+        directory = self.file_path.parent
+        while any(char in str(directory) for char in '*?['):
+            directory = directory.parent
+        return directory
+    
+    def _committed_watermark(self) -> Any:
+        """Return the last committed watermark, if incremental.
+        
+        The store is read once per connect() or extraction and the value
+        kept until commit(), rather than read again for every chunk.
+        """
+        if self.state_store is None:
+            return None
+        if self._committed is _UNREAD:
+            self._committed = self.state_store.get(self.state_key)
+        return self._committed
+    
+    def _open_source(self) -> Union[Path, IO[bytes]]:
+        """Return what pd.read_csv should read.
+        
+        In byte-offset mode this is the header line followed by the complete
+        lines appended after the committed offset; otherwise the file itself.
+        """
+        if self.state_store is None or self.watermark_column is not None:
+            return self.file_path
+        
+        offset = self._committed_watermark() or 0
+        with open(self.file_path, 'rb') as f:
+            header = f.readline()
+            size = f.seek(0, io.SEEK_END)
+            if offset > size:
+                self.logger.warning(
+                    f"{self.file_path} is shorter than its committed offset; re-reading from start"
+                )
+                offset = 0
+            offset = max(offset, len(header))
+            if offset == len(header) and size > 0:
+                f.seek(size - 1)
+                if f.read(1) == b'\n':
+                    # First run over a complete file: parse it in place
+                    self._pending_watermark = size
+                    return self.file_path
+            f.seek(offset)
+            appended = f.read()
+        
+        # Leave a trailing partial line for the next run
+        complete = appended[:appended.rfind(b'\n') + 1]
+        self._pending_watermark = offset + len(complete)
+        self.logger.info(f"Reading {len(complete)} new bytes of {self.file_path} from offset {offset}")
+        return io.BytesIO(header + complete)
+    
+    def _load_schema(self, read_config: Dict[str, Any]) -> Tuple[Optional[ColumnSchemas], List[str]]:
+        """Return the saved schema if it matches the file's header, and the header."""
+        if not self.optimize_dtypes:
+            return None, []
+        header_config = {key: value for key, value in read_config.items() if key not in _DATA_OPTIONS}
+        if self.multi_file:
+            columns = read_csv_file(self.files[0], {**header_config, 'nrows': 0}).columns
+        else:
+            columns = pd.read_csv(self.file_path, nrows=0, **header_config).columns
+        header = [str(column) for column in columns]
+        return self.schema_cache.load(header), header
+    
+    def _with_schema(self, read_config: Dict[str, Any], schema: Optional[ColumnSchemas]) -> Dict[str, Any]:
+        """Pass the schema's parse dtypes to pd.read_csv; explicit ``dtype`` entries win."""
+        dtype = read_config.get('dtype')
+        if schema is None or (dtype is not None and not isinstance(dtype, dict)):
+            return read_config
+        parse = {column: entry['parse'] for column, entry in schema.items() if entry['parse']}
+        return {**read_config, 'dtype': {**parse, **(dtype or {})}}
+    
+    def _optimize(
+        self,
+        data: pd.DataFrame,
+        schema: Optional[ColumnSchemas],
+        header: List[str],
+        report: bool = False
+    ) -> Tuple[pd.DataFrame, ColumnSchemas]:
+        """Convert ``data`` to the compact schema, inferring columns it lacks.
+        
+        The schema is saved whenever columns were inferred or widened. With
+        ``report``, memory per column before and after is stored in
+        ``memory_report``; for columns read with a saved schema the memory
+        before is estimated from the bytes per row measured at inference.
+        """
+        schema = dict(schema or {})
+        before = data.memory_usage(deep=True, index=False).astype('float64')
+        rows = max(len(data), 1)
+        inferred = [column for column in data.columns if str(column) not in schema]
+        for column in inferred:
+            entry = infer_column(data[column], self.category_threshold)
+            if entry is None or (column == self.watermark_column and entry['dtype'] == 'category'):
+                # Unordered categoricals cannot be compared with the watermark
+                entry = {'parse': None, 'dtype': None}
+            entry['bytes_per_row'] = float(before[column]) / rows
+            schema[str(column)] = entry
+        
+        data, widened = apply_schema(data, schema)
+        if inferred or widened:
+            self.schema_cache.save(header, schema)
+        
+        if report:
+            for column in data.columns:
+                if column not in inferred:
+                    before[column] = schema[str(column)]['bytes_per_row'] * len(data)
+            self.memory_report = memory_report(before, data)
+            saved = self.memory_report['saved_bytes'].sum()
+            total = self.memory_report['before_bytes'].sum()
+            self.logger.info(
+                f"Compact dtypes saved {saved / 1024 ** 2:.1f} MiB "
+                f"({100 * saved / max(total, 1):.0f}%) for {self.source}"
+            )
+            for column, row in self.memory_report.iterrows():
+                self.logger.debug(
+                    f"Column {column} ({row['dtype']}): {row['before_bytes']} -> {row['after_bytes']} bytes"
+                )
+        return data, schema
+    
+    def _source_size(self, source: Union[Path, IO[bytes]]) -> int:
+        """Return the number of bytes pd.read_csv will parse from ``source``."""
+        if isinstance(source, io.BytesIO):
+            return source.getbuffer().nbytes
+        return self.file_path.stat().st_size
+    
+    def _apply_watermark(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Drop rows at or below the committed column watermark and track the new maximum."""
+        if self.state_store is None or self.watermark_column is None or data.empty:
+            return data
+        
+        column = data[self.watermark_column]
+        committed = self._committed_watermark()
+        if committed is not None:
+            if pd.api.types.is_datetime64_any_dtype(column):
+                committed = pd.Timestamp(committed)
+            data = data[column > committed]
+            column = data[self.watermark_column]
+        
+        if not data.empty:
+            latest = column.max()
+            latest = latest.isoformat() if isinstance(latest, pd.Timestamp) else latest
+            latest = latest.item() if hasattr(latest, 'item') else latest
+            if self._pending_watermark is None or latest > self._pending_watermark:
+                self._pending_watermark = latest
+        return data
+    
     def disconnect(self) -> None:
         """Clear data from memory."""
         self._data = None
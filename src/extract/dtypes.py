@@ -0,0 +1,197 @@
+"""Compact dtype inference and persisted schemas for file extractors."""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Column name -> {'parse': dtype passed to the reader,
+#                 'dtype': dtype kept in memory,
+#                 'bytes_per_row': memory per row with inferred dtypes}
+# None dtypes leave the column to the reader's own inference.
+ColumnSchemas = Dict[str, Dict[str, Any]]
+
+_INT_TYPES = ['int8', 'int16', 'int32', 'int64']
+_UINT_TYPES = ['uint8', 'uint16', 'uint32', 'uint64']
+
+
+def arrow_strings_available() -> bool:
+    """Return whether pyarrow-backed strings can be used."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def smallest_int(low: Any, high: Any, nullable: bool = False) -> Optional[str]:
+    """Return the smallest integer dtype holding ``[low, high]``, if any.
+    
+    Nullable dtypes use pandas' extension names (``'UInt8'``, ``'Int16'``).
+    """
+    candidates = _UINT_TYPES if low >= 0 else _INT_TYPES
+    for name in candidates:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return name.capitalize().replace('Uint', 'UInt') if nullable else name
+    return None
+
+
+def infer_column(series: pd.Series, category_threshold: float = 0.5) -> Optional[Dict[str, Any]]:
+    """Choose a compact dtype for one column.
+    
+    Integers are downcast to the smallest type holding their range; floats
+    holding only whole numbers and NAs become nullable integers, and other
+    floats become float32 when that loses no precision. Strings become
+    categoricals when at most ``category_threshold`` of their values are
+    distinct, and Arrow-backed strings otherwise.
+    
+    Returns:
+        The column's schema entry, or None to leave it to the reader
+    """
+    values = series.dropna()
+    dtype = series.dtype
+    
+    if pd.api.types.is_bool_dtype(dtype):
+        return {'parse': 'bool', 'dtype': 'bool'}
+    
+    if pd.api.types.is_integer_dtype(dtype):
+        if values.empty:
+            return None
+        target = smallest_int(values.min(), values.max())
+        return {'parse': 'int64', 'dtype': target} if target else None
+    
+    if pd.api.types.is_float_dtype(dtype):
+        if values.empty:
+            return None
+        if (values % 1 == 0).all():
+            info = np.iinfo('int64')
+            if info.min <= values.min() and values.max() <= info.max:
+                return {'parse': 'Int64', 'dtype': smallest_int(values.min(), values.max(), nullable=True)}
+        target = 'float32' if _fits_float32(series) else 'float64'
+        return {'parse': 'float64', 'dtype': target}
+    
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+            return None
+        if len(values) and values.nunique() <= category_threshold * len(values):
+            return {'parse': 'category', 'dtype': 'category'}
+        if arrow_strings_available():
+            return {'parse': 'string[pyarrow]', 'dtype': 'string[pyarrow]'}
+    return None
+
+
+def apply_schema(data: pd.DataFrame, schema: ColumnSchemas) -> Tuple[pd.DataFrame, List[str]]:
+    """Convert columns of ``data`` to their compact dtypes.
+    
+    A schema inferred from earlier data may be too narrow for new values.
+    Such columns are widened instead (integers to the smallest type that
+    fits, floats back to float64) and their entries in ``schema`` updated.
+    
+    Returns:
+        The converted frame and the names of columns whose entry changed
+    """
+    converted = {}
+    widened = []
+    for column, entry in schema.items():
+        if column not in data.columns or entry['dtype'] is None:
+            continue
+        series = data[column]
+        target = entry['dtype']
+        if target in _INT_TYPES + _UINT_TYPES or target[:1] in ('I', 'U'):
+            values = series.dropna()
+            if not values.empty:
+                info = np.iinfo(target.lower())
+                low, high = values.min(), values.max()
+                if low < info.min or high > info.max:
+                    target = smallest_int(low, high, nullable=target[:1] in ('I', 'U')) or 'int64'
+        elif target == 'float32' and not _fits_float32(series):
+            target = 'float64'
+        
+        if target != entry['dtype']:
+            logger.warning(f"Widening column '{column}' from {entry['dtype']} to {target}")
+            entry['dtype'] = target
+            widened.append(column)
+        if str(series.dtype) != target:
+            converted[column] = series.astype(target)
+    
+    if converted:
+        data = data.copy(deep=False)
+        for column, series in converted.items():
+            data[column] = series
+    return data, widened
+
+
+def memory_report(before: pd.Series, data: pd.DataFrame) -> pd.DataFrame:
+    """Tabulate memory per column before and after dtype optimization.
+    
+    Args:
+        before: Bytes per column with the reader's inferred dtypes
+        data: Optimized frame
+    
+    Returns:
+        One row per column with ``dtype``, ``before_bytes``,
+        ``after_bytes``, ``saved_bytes`` and ``saved_pct``
+    """
+    after = data.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': [str(data[column].dtype) for column in data.columns],
+        'before_bytes': before.reindex(data.columns).fillna(after).astype('int64'),
+        'after_bytes': after.astype('int64'),
+    }, index=pd.Index(data.columns, name='column'))
+    report['saved_bytes'] = report['before_bytes'] - report['after_bytes']
+    report['saved_pct'] = (100 * report['saved_bytes'] / report['before_bytes'].where(report['before_bytes'] > 0)) \
+        .fillna(0).round(1)
+    return report
+
+
+class SchemaCache:
+    """JSON file holding the compact schema of one source file.
+    
+    The schema records the source's header so that it is discarded when the
+    columns change. Writes are atomic.
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+    
+    def load(self, header: List[str]) -> Optional[ColumnSchemas]:
+        """Return the stored column schemas, or None if absent or stale."""
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get('version') != SCHEMA_VERSION or stored.get('header') != header:
+            logger.info(f"Ignoring stale schema {self.path}")
+            return None
+        return stored['columns']
+    
+    def save(self, header: List[str], columns: ColumnSchemas) -> None:
+        """Replace the stored schema."""
+        payload = {'version': SCHEMA_VERSION, 'header': header, 'columns': columns}
+        atomic_write(self.path, json.dumps(payload, indent=2).encode('utf-8'))
+        logger.info(f"Saved schema of {len(columns)} columns to {self.path}")
+    
+    def delete(self) -> None:
+        """Remove the stored schema."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _fits_float32(series: pd.Series) -> bool:
+    """Return whether every value survives a round trip through float32."""
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    with np.errstate(over='ignore'):
+        return bool(np.array_equal(values.astype('float32').astype('float64'), values, equal_nan=True))
+
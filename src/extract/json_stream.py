@@ -0,0 +1,161 @@
+"""Incremental JSON record parsing and flattening into DataFrames."""
+import codecs
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+CHUNK_SIZE = 64 * 1024
+
+# Flattened column name -> dtype, e.g. {'customer.address.city': 'string'}
+RecordSchema = Dict[str, str]
+
+
+def iter_records(
+    stream: IO,
+    records_path: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """Yield the elements of the JSON array at ``records_path`` one at a time.
+    
+    ``stream`` is a binary or text file-like object holding one JSON
+    document; ``records_path`` is a dotted path of object keys (None for a
+    top-level array). Only the current record is decoded at a time, so the
+    body is never held in memory as a whole. Uses ijson when installed and
+    an incremental parser built on the json module otherwise. A missing
+    path yields no records.
+    """
+    try:
+        import ijson
+    except ImportError:
+        yield from _iter_records(stream, records_path.split('.') if records_path else [], chunk_size)
+        return
+    prefix = f"{records_path}.item" if records_path else 'item'
+    yield from ijson.items(stream, prefix, use_float=True, buf_size=chunk_size)
+
+
+def normalize_records(records: List[Any], schema: Optional[RecordSchema] = None, sep: str = '.') -> pd.DataFrame:
+    """Flatten records into a DataFrame.
+    
+    With a ``schema``, each column is read from the record path its name
+    describes (``'customer.name'`` is ``record['customer']['name']``),
+    missing values become NA and columns are cast to the declared dtypes;
+    other fields are ignored. Without one, every nested field becomes a
+    column as in ``pd.json_normalize``.
+    """
+    if schema is None:
+        return pd.json_normalize(records, sep=sep)
+    
+    columns = {name: _column(records, name.split(sep)) for name in schema}
+    return pd.DataFrame(columns, columns=list(schema)).astype(schema)
+
+
+def empty_frame(schema: Optional[RecordSchema] = None) -> pd.DataFrame:
+    """Return a frame with no rows and the schema's columns and dtypes."""
+    if schema is None:
+        return pd.DataFrame()
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in schema.items()})
+
+
+def _column(records: List[Any], path: List[str]) -> List[Any]:
+    """Collect the value at ``path`` of every record (None where absent)."""
+    if len(path) == 1:
+        key = path[0]
+        return [record.get(key) if isinstance(record, dict) else None for record in records]
+    values = []
+    for record in records:
+        for key in path:
+            record = record.get(key) if isinstance(record, dict) else None
+        values.append(record)
+    return values
+
+
+class _Scanner:
+    """Read JSON values one by one from a stream with a growing buffer."""
+    
+    def __init__(self, stream: IO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+    
+    def fill(self, size: int) -> bool:
+        """Append up to ``size`` more characters; return False at end of stream."""
+        if self.eof:
+            return False
+        chunk: Union[str, bytes] = self.stream.read(size)
+        if isinstance(chunk, bytes):
+            chunk = self._text.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return not self.eof
+    
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill(self.chunk_size):
+                return ''
+    
+    def expect(self, chars: str) -> str:
+        """Consume one of ``chars`` as the next token."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {chars!r}, found {char!r}")
+        self.pos += 1
+        return char
+    
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                value, end = None, None
+            # A number ending at the buffer's end may continue in the next read
+            if end is not None and (end < len(self.buffer) or self.eof):
+                self.pos = end
+                return value
+            self.fill(size)
+            size *= 2
+
+
+def _iter_records(stream: IO, path: List[str], chunk_size: int) -> Iterator[Any]:
+    """Walk down ``path`` and yield the elements of the array found there."""
+    scanner = _Scanner(stream, chunk_size)
+    for key in path:
+        if scanner.peek() != '{':
+            return
+        scanner.expect('{')
+        while True:
+            if scanner.peek() == '}':
+                return
+            name = scanner.value()
+            scanner.expect(':')
+            if name == key:
+                break
+            scanner.value()
+            if scanner.expect(',}') == '}':
+                return
+    
+    if scanner.peek() != '[':
+        return
+    scanner.expect('[')
+    if scanner.peek() == ']':
+        return
+    while True:
+        yield scanner.value()
+        if scanner.expect(',]') == ']':
+            return
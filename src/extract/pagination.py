@@ -0,0 +1,193 @@
+"""Pagination strategies for APIExtractor.
+
+Numbered strategies (``page`` and ``offset``) address every page
+directly, so APIExtractor can fetch several pages concurrently. Cursor
+and Link header strategies only learn the next page from the current
+one and are always fetched one page at a time.
+"""
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+# (url, query parameters) of a page request
+PageRequest = Tuple[str, Dict[str, Any]]
+
+
+def lookup(body: Any, path: Optional[str]) -> Any:
+    """Return the value at a dotted ``path`` such as ``'meta.next'``, or None."""
+    if path is None:
+        return body
+    for key in path.split('.'):
+        if not isinstance(body, dict):
+            return None
+        body = body.get(key)
+    return body
+
+
+class Paginator(ABC):
+    """Decide which request fetches the next page of a response."""
+    
+    numbered: bool = False
+    
+    def first(self, url: str, params: Dict[str, Any]) -> PageRequest:
+        """Return the request for the first page."""
+        return url, params
+    
+    @abstractmethod
+    def next(
+        self,
+        request: PageRequest,
+        body: Any,
+        links: Dict[str, Dict[str, str]],
+        records: List[Any]
+    ) -> Optional[PageRequest]:
+        """Return the request for the page after ``request``, or None after the last.
+        
+        Args:
+            request: Request that returned the current page
+            body: Decoded JSON body of the current page
+            links: Parsed ``Link`` header (``requests.Response.links``)
+            records: Records of the current page
+        """
+
+
+class NumberedPaginator(Paginator):
+    """Pages addressed by position, which allows fetching them concurrently.
+    
+    A page with fewer than ``page_size`` records is the last one. When
+    ``total_field`` names the total record count in the first page's body,
+    the page count is known up front and no page beyond the end is
+    requested.
+    """
+    
+    numbered = True
+    
+    def __init__(self, page_size: int = 100, size_param: str = 'per_page', total_field: Optional[str] = None):
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.page_size = page_size
+        self.size_param = size_param
+        self.total_field = total_field
+    
+    @abstractmethod
+    def position(self, index: int) -> Dict[str, Any]:
+        """Return the query parameters selecting the page at ``index`` (from 0)."""
+    
+    def page(self, url: str, params: Dict[str, Any], index: int) -> PageRequest:
+        """Return the request for the page at ``index``."""
+        return url, {**params, self.size_param: self.page_size, **self.position(index)}
+    
+    def first(self, url: str, params: Dict[str, Any]) -> PageRequest:
+        return self.page(url, params, 0)
+    
+    def next(self, request, body, links, records) -> Optional[PageRequest]:
+        raise NotImplementedError("Numbered pages are requested by index")
+    
+    def is_last(self, records: List[Any]) -> bool:
+        """Return whether a page with ``records`` ends the result."""
+        return len(records) < self.page_size
+    
+    def page_count(self, body: Any) -> Optional[int]:
+        """Return the number of pages announced by the first page, if any."""
+        total = lookup(body, self.total_field) if self.total_field else None
+        if total is None:
+            return None
+        return math.ceil(int(total) / self.page_size)
+
+
+class PageNumberPagination(NumberedPaginator):
+    """``?page=N&per_page=size`` pagination, numbering pages from ``first_page``."""
+    
+    def __init__(
+        self,
+        page_size: int = 100,
+        page_param: str = 'page',
+        size_param: str = 'per_page',
+        first_page: int = 1,
+        total_field: Optional[str] = None
+    ):
+        super().__init__(page_size, size_param, total_field)
+        self.page_param = page_param
+        self.first_page = first_page
+    
+    def position(self, index: int) -> Dict[str, Any]:
+        return {self.page_param: self.first_page + index}
+
+
+class OffsetPagination(NumberedPaginator):
+    """``?offset=N&limit=size`` pagination."""
+    
+    def __init__(
+        self,
+        page_size: int = 100,
+        offset_param: str = 'offset',
+        size_param: str = 'limit',
+        total_field: Optional[str] = None
+    ):
+        super().__init__(page_size, size_param, total_field)
+        self.offset_param = offset_param
+    
+    def position(self, index: int) -> Dict[str, Any]:
+        return {self.offset_param: index * self.page_size}
+
+
+class CursorPagination(Paginator):
+    """Pages chained by an opaque cursor returned in each body.
+    
+    The cursor at ``next_field`` (a dotted path) is sent as
+    ``cursor_param`` for the next page; an empty or missing cursor ends
+    the result.
+    """
+    
+    def __init__(
+        self,
+        cursor_param: str = 'cursor',
+        next_field: str = 'next_cursor',
+        page_size: Optional[int] = None,
+        size_param: str = 'limit'
+    ):
+        self.cursor_param = cursor_param
+        self.next_field = next_field
+        self.page_size = page_size
+        self.size_param = size_param
+    
+    def first(self, url: str, params: Dict[str, Any]) -> PageRequest:
+        if self.page_size is not None:
+            params = {**params, self.size_param: self.page_size}
+        return url, params
+    
+    def next(self, request, body, links, records) -> Optional[PageRequest]:
+        cursor = lookup(body, self.next_field)
+        if not cursor:
+            return None
+        url, params = request
+        return url, {**params, self.cursor_param: cursor}
+
+
+class LinkHeaderPagination(Paginator):
+    """Follow the ``rel="next"`` URL of the RFC 8288 ``Link`` header.
+    
+    The next URL already carries its query string, so the original
+    parameters are only sent with the first request.
+    """
+    
+    def next(self, request, body, links, records) -> Optional[PageRequest]:
+        url = links.get('next', {}).get('url')
+        return (url, {}) if url else None
+
+
+PAGINATORS: Dict[str, Type[Paginator]] = {
+    'page': PageNumberPagination,
+    'offset': OffsetPagination,
+    'cursor': CursorPagination,
+    'link': LinkHeaderPagination,
+}
+
+
+def resolve_paginator(pagination: Union[str, Paginator, None]) -> Optional[Paginator]:
+    """Return a Paginator for a strategy name (with default options) or instance."""
+    if pagination is None or isinstance(pagination, Paginator):
+        return pagination
+    if pagination not in PAGINATORS:
+        raise ValueError(f"Unknown pagination: {pagination}")
+    return PAGINATORS[pagination]()
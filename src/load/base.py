@@ -1,17 +1,24 @@
 """Base loader class for ETL pipeline."""
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import logging
+from .encoding import SharedEncodings
 
 logger = logging.getLogger(__name__)
 
 
 class BaseLoader(ABC):
-    """Abstract base class for all loaders."""
+    """Abstract base class for all loaders.
+    
+    While ETLPipeline loads a frame into several loaders, ``encodings``
+    holds a SharedEncodings through which loaders obtain the encoded forms
+    they listed in encoded_forms(), so a form is encoded only once.
+    """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.encodings: Optional[SharedEncodings] = None
     
     @abstractmethod
     def connect(self) -> None:
@@ -28,6 +35,55 @@ class BaseLoader(ABC):
         """Close connection to destination."""
         pass
     
+    @property
+    def bytes_written(self) -> Optional[int]:
+        """Size of the written output in bytes, or None if unknown."""
+        return None
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the destination so that stale checkpoints can be detected."""
+        return {'config': self.config}
+    
+    def encoded_forms(self) -> Tuple[str, ...]:
+        """Name the encoded forms of a frame (see load.encoding) load() writes.
+        
+        Forms that several of a pipeline's loaders name are encoded once
+        and shared through ``encodings``. The default is none.
+        """
+        return ()
+    
+    def stream_position(self) -> Any:
+        """Return how much of a streamed dataset has been written.
+        
+        ETLPipeline checkpoints the position after each batch. Loaders that
+        return None (the default) cannot continue an interrupted stream and
+        are sent every batch again when a run is resumed.
+        """
+        return None
+    
+    def restore_stream_position(self, position: Any) -> bool:
+        """Discard output written after ``position`` so the stream can continue.
+        
+        Returns:
+            Whether the destination was restored; if not, the stream is
+            written again from its first batch
+        """
+        return False
+    
+    def load_batch(self, data: Any, first: bool = False, **kwargs) -> None:
+        """Load one batch of a streamed dataset.
+        
+        The default implementation delegates to load(). Loaders whose load()
+        overwrites the destination override this to append every batch
+        after the first one.
+        
+        Args:
+            data: Batch to load
+            first: Whether this is the first batch of the stream
+            **kwargs: Additional arguments passed to load()
+        """
+        self.load(data, **kwargs)
+    
     def __enter__(self):
         self.connect()
         return self
@@ -0,0 +1,193 @@
+"""Bulk insert strategies for DatabaseLoader.
+
+Every strategy writes a DataFrame into an existing table in batches of
+``batch_size`` rows, committing one transaction per batch, and returns the
+number of rows written. When an open ``connection`` is passed, all batches
+run on it instead and committing is left to the caller.
+"""
+import csv
+import io
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from .encoding import CSV, SharedEncodings, encode_csv, split_rows
+
+logger = logging.getLogger(__name__)
+
+_POSITIONAL = ('qmark', 'format', 'numeric')  # DB-API paramstyles taking tuples
+
+# Upper bound on bound parameters in a single statement, per dialect
+_MAX_PARAMS = {
+    'sqlite': 32766,  # SQLITE_MAX_VARIABLE_NUMBER since SQLite 3.32
+    'postgresql': 65535,
+    'mysql': 65535,
+    'mssql': 2100,
+}
+
+
+def iter_frames(data: pd.DataFrame, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive slices of ``batch_size`` rows."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    for start in range(0, len(data), batch_size):
+        yield data.iloc[start:start + batch_size]
+
+
+def to_rows(data: pd.DataFrame) -> List[tuple]:
+    """Convert a frame to DB-API parameter tuples (NaN/NaT become None)."""
+    values = data.astype(object).where(data.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def _placeholders(dialect, width: int, row: int = 0) -> str:
+    """Render one ``(...)`` group of bind placeholders in the driver's paramstyle.
+    
+    ``row`` numbers the group within a multi-row statement so that named
+    and numeric placeholders stay unique.
+    """
+    style = dialect.paramstyle
+    if style == 'qmark':
+        marks = ['?'] * width
+    elif style == 'format':
+        marks = ['%s'] * width
+    elif style == 'numeric':
+        marks = [f':{row * width + i + 1}' for i in range(width)]
+    elif style == 'named':
+        marks = [f':p{row}_{i}' for i in range(width)]
+    else:  # pyformat
+        marks = [f'%(p{row}_{i})s' for i in range(width)]
+    return f"({', '.join(marks)})"
+
+
+def _bind(dialect, rows: List[tuple]) -> Any:
+    """Flatten rows into the parameter object matching _placeholders()."""
+    if dialect.paramstyle in _POSITIONAL:
+        return tuple(value for row in rows for value in row)
+    return {f'p{r}_{i}': value for r, row in enumerate(rows) for i, value in enumerate(row)}
+
+
+def _insert_prefix(engine, table, columns: List[str]) -> str:
+    """Render ``INSERT INTO table (columns) VALUES`` with quoted identifiers."""
+    preparer = engine.dialect.identifier_preparer
+    quoted = ', '.join(preparer.quote(column) for column in columns)
+    return f"INSERT INTO {preparer.format_table(table)} ({quoted}) VALUES "
+
+
+@contextmanager
+def _batch_connection(engine, connection=None) -> Iterator[Any]:
+    """Yield ``connection`` as-is, or a new connection committed on exit."""
+    if connection is not None:
+        yield connection
+    else:
+        with engine.begin() as conn:
+            yield conn
+
+
+def insert_executemany(engine, table, data: pd.DataFrame, batch_size: int, connection=None) -> int:
+    """Insert with one prepared statement executed over each batch of rows.
+    
+    Parameters go straight to the driver's ``executemany`` without per-row
+    SQLAlchemy processing.
+    """
+    dialect = engine.dialect
+    columns = list(data.columns)
+    sql = _insert_prefix(engine, table, columns) + _placeholders(dialect, len(columns))
+    for batch in iter_frames(data, batch_size):
+        params = [_bind(dialect, [row]) for row in to_rows(batch)]
+        with _batch_connection(engine, connection) as conn:
+            conn.exec_driver_sql(sql, params)
+    return len(data)
+
+
+def insert_multi_values(engine, table, data: pd.DataFrame, batch_size: int, connection=None) -> int:
+    """Insert with multi-row ``INSERT ... VALUES (...), (...)`` statements.
+    
+    Batches are split further when the dialect caps the number of bound
+    parameters per statement.
+    """
+    dialect = engine.dialect
+    columns = list(data.columns)
+    prefix = _insert_prefix(engine, table, columns)
+    max_params = _MAX_PARAMS.get(dialect.name, 32767)
+    rows_per_statement = max(1, min(batch_size, max_params // max(1, len(columns))))
+    
+    for batch in iter_frames(data, batch_size):
+        with _batch_connection(engine, connection) as conn:
+            for chunk in iter_frames(batch, rows_per_statement):
+                rows = to_rows(chunk)
+                groups = ', '.join(_placeholders(dialect, len(columns), r) for r in range(len(rows)))
+                conn.exec_driver_sql(prefix + groups, _bind(dialect, rows))
+    return len(data)
+
+
+def copy_postgres(
+    engine,
+    table,
+    data: pd.DataFrame,
+    batch_size: int,
+    connection=None,
+    encodings: Optional[SharedEncodings] = None
+) -> int:
+    """Stream batches through PostgreSQL ``COPY ... FROM STDIN``.
+    
+    Each batch is encoded once into an in-memory CSV buffer. Works with
+    psycopg2 (copy_expert) and psycopg 3 (cursor.copy). When
+    ``encodings`` shares the CSV form, the whole frame is encoded through
+    it, so a CSVLoader writing the same frame reuses the bytes, and
+    batches are sent as slices of them.
+    """
+    if engine.dialect.name != 'postgresql':
+        raise ValueError(f"COPY is not supported by dialect '{engine.dialect.name}'")
+    
+    preparer = engine.dialect.identifier_preparer
+    columns = ', '.join(preparer.quote(column) for column in data.columns)
+    sql = f"COPY {preparer.format_table(table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    
+    for buffer in _copy_buffers(data, batch_size, encodings):
+        with _batch_connection(engine, connection) as conn:
+            cursor = conn.connection.cursor()
+            try:
+                if hasattr(cursor, 'copy_expert'):
+                    cursor.copy_expert(sql, buffer)
+                else:
+                    with cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+            finally:
+                cursor.close()
+    return len(data)
+
+
+def _copy_buffers(
+    data: pd.DataFrame,
+    batch_size: int,
+    encodings: Optional[SharedEncodings]
+) -> Iterator[Union[io.StringIO, io.BytesIO]]:
+    """Yield the CSV buffer of every batch, sliced from the shared form if possible."""
+    if encodings is not None and CSV in encodings.forms:
+        body = encodings.encode(data, CSV, encode_csv)
+        for rows in split_rows(body, len(data), batch_size):
+            yield io.BytesIO(rows)
+        return
+    
+    for batch in iter_frames(data, batch_size):
+        buffer = io.StringIO()
+        batch.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+        buffer.seek(0)
+        yield buffer
+
+
+BULK_METHODS: Dict[str, Callable[..., int]] = {
+    'executemany': insert_executemany,
+    'multi_values': insert_multi_values,
+    'copy': copy_postgres,
+}
+
+
+def resolve_method(method: str, dialect_name: str) -> str:
+    """Resolve ``'auto'`` to the fastest method available for a dialect."""
+    if method == 'auto':
+        return 'copy' if dialect_name == 'postgresql' else 'executemany'
+    return method
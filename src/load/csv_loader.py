@@ -1,21 +1,128 @@
 """CSV file loader."""
-import pandas as pd
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import pandas as pd
 from .base import BaseLoader
+from .encoding import CSV, encode_csv
+
+# File suffix of each supported compression codec
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'bz2': '.bz2', 'zstd': '.zst', 'xz': '.xz'}
+
+# Directory name of NA partition values, as in Hive
+HIVE_DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# Config keys consumed by the loader itself rather than passed to to_csv()
+_LOADER_OPTIONS = ('partition_by', 'shards', 'compression', 'atomic', 'if_exists', 'file_workers')
+
+# One file to write: path, rows, to_csv() mode and whether to write the header
+_FileWrite = Tuple[Path, pd.DataFrame, str, bool]
+
+
+def partition_dir(columns: Sequence[str], values: Sequence[Any]) -> str:
+    """Return the Hive-style relative directory of a partition, e.g. ``year=2024/country=DE``.
+    
+    Values are percent-escaped where they could not appear in a directory
+    name, and NA values map to HIVE_DEFAULT_PARTITION.
+    """
+    parts = []
+    for column, value in zip(columns, values):
+        name = HIVE_DEFAULT_PARTITION if pd.isna(value) else quote(str(value), safe=' ')
+        parts.append(f"{column}={name}")
+    return '/'.join(parts)
 
 
 class CSVLoader(BaseLoader):
-    """Load data to CSV files."""
+    """Load data to CSV files.
+    
+    ``output_path`` is a single file unless ``partition_by`` or ``shards``
+    is given. Then it is the root of a directory tree with one Hive-style
+    ``column=value`` level per ``partition_by`` column (those columns are
+    not written to the files), where every frame, or every partition of
+    it, is split into ``shards`` files of about equal size. Files in a tree
+    are named ``part-NNNNN-<run>.csv`` plus the compression suffix and are
+    written by up to ``file_workers`` threads.
+    
+    ``compression`` is ``'gzip'``, ``'bz2'``, ``'zstd'`` (requires
+    ``zstandard``) or ``'xz'``; a single file's codec is inferred from its
+    suffix by default. Rows are compressed as they are written, and
+    appended batches become further compressed members of the file.
+    
+    With ``atomic`` (default), each file is written to a hidden temporary
+    file next to it and renamed into place when complete: at the end of
+    load(), or when disconnect() ends a stream written with load_batch().
+    Readers see either the previous file or the complete new one. A stream
+    that fails keeps its temporary files, so a resumed run can continue it.
     
-    def __init__(self, output_path: Union[str, Path], config: Optional[Dict[str, Any]] = None):
+    ``if_exists`` is ``'replace'`` (default) or ``'append'``. Appending to
+    a single file writes to it in place, with a header only if it is new.
+    Appending to a tree adds new files, while replacing it removes the part
+    files of earlier runs once the new ones are committed.
+    
+    Each option falls back to the same key in ``config``; the remaining
+    config keys are passed to to_csv(). With default write options and an
+    uncompressed single file, the rows are written from the CSV form shared
+    through ``encodings`` when another loader of the pipeline, such as a
+    DatabaseLoader using COPY, encodes it too.
+    """
+    
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        config: Optional[Dict[str, Any]] = None,
+        partition_by: Optional[List[str]] = None,
+        shards: Optional[int] = None,
+        compression: Optional[str] = None,
+        atomic: Optional[bool] = None,
+        if_exists: Optional[str] = None,
+        file_workers: Optional[int] = None
+    ):
         super().__init__(config)
         self.output_path = Path(output_path)
+        self.partition_by = list(partition_by or self.config.get('partition_by') or [])
+        self.shards = shards or self.config.get('shards', 1)
+        self.atomic = atomic if atomic is not None else self.config.get('atomic', True)
+        self.if_exists = if_exists or self.config.get('if_exists', 'replace')
+        self.file_workers = file_workers or self.config.get('file_workers', os.cpu_count() or 1)
+        self.tree = bool(self.partition_by) or self.shards > 1
+        
+        compression = compression or self.config.get('compression')
+        if compression in (None, 'infer') and not self.tree:
+            compression = next(
+                (codec for codec, suffix in COMPRESSION_SUFFIXES.items() if self.output_path.name.endswith(suffix)),
+                None
+            )
+        elif compression == 'infer':
+            compression = None
+        self.compression = compression
+        
+        if self.compression is not None and self.compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {self.compression}")
+        if self.if_exists not in ('replace', 'append'):
+            raise ValueError(f"if_exists must be 'replace' or 'append', got {self.if_exists!r}")
+        if self.shards < 1:
+            raise ValueError("shards must be at least 1")
+        
+        self._run: Optional[str] = None
+        self._append = False
+        self._streaming = False
+        # Final path -> path being written (the temporary file until committed)
+        self._outputs: Dict[Path, Path] = {}
     
     def connect(self) -> None:
         """Ensure output directory exists."""
-        self.output_path.parent.mkdir(parents=True, exist_ok=True)
-        self.logger.info(f"Output directory ready: {self.output_path.parent}")
+        if self.compression == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                raise ImportError("zstandard required. Install with: pip install zstandard")
+        
+        self._root.mkdir(parents=True, exist_ok=True)
+        self.logger.info(f"Output directory ready: {self._root}")
     
     def load(self, data: pd.DataFrame, **kwargs) -> None:
         """Load DataFrame to CSV file.
@@ -27,10 +134,253 @@ class CSVLoader(BaseLoader):
         if not isinstance(data, pd.DataFrame):
             raise TypeError(f"Expected DataFrame, got {type(data)}")
         
-        write_config = {'index': False, **self.config, **kwargs}
-        data.to_csv(self.output_path, **write_config)
-        self.logger.info(f"Loaded {len(data)} rows to {self.output_path}")
+        self._begin(append=self.if_exists == 'append')
+        try:
+            files = self._write(data, kwargs)
+            self._commit()
+        except BaseException:
+            self._discard()
+            raise
+        self.logger.info(f"Loaded {len(data)} rows to {self.output_path} ({files} files)")
+    
+    def load_batch(self, data: pd.DataFrame, first: bool = False, **kwargs) -> None:
+        """Write one batch of a stream, which disconnect() commits.
+        
+        The first batch starts new output as load() would; later batches
+        are appended to the stream's files without a header.
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError(f"Expected DataFrame, got {type(data)}")
+        
+        if first or not self._streaming:
+            self._begin(append=self.if_exists == 'append' or not first)
+            self._streaming = True
+        self._write(data, kwargs)
+        self.logger.debug(f"Appended {len(data)} rows to {self.output_path}")
+    
+    def _begin(self, append: bool) -> None:
+        """Start a new output, dropping temporary files an earlier failure left."""
+        for path in self._temporaries():
+            path.unlink(missing_ok=True)
+        self._run = uuid.uuid4().hex[:8]
+        self._append = append
+        self._outputs = {}
+    
+    def _write(self, data: pd.DataFrame, kwargs: Dict[str, Any]) -> int:
+        """Write ``data`` to its files of the current output; return how many were written."""
+        options = {
+            'index': False,
+            **{k: v for k, v in self.config.items() if k not in _LOADER_OPTIONS},
+            **kwargs
+        }
+        if options.pop('mode', 'w') == 'a':
+            self._append = True
+        header = options.pop('header', True)
+        compression = options.pop('compression', self.compression)
+        
+        writes: List[_FileWrite] = []
+        for final, rows in self._split(data):
+            path = self._outputs.get(final)
+            if path is None:
+                # A single file is appended to in place; tree runs only add files
+                direct = self._append and not self.tree
+                path = final if direct else self._temporary(final)
+                mode = 'a' if direct else 'w'
+                self._outputs[final] = path
+            else:
+                mode = 'a'
+            continues = mode == 'a' and path.exists() and path.stat().st_size > 0
+            writes.append((path, rows, mode, header and not continues))
+        
+        def write(file: _FileWrite) -> None:
+            self._write_file(*file, compression, options)
+        
+        workers = min(self.file_workers, len(writes))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(write, writes))
+        else:
+            for file in writes:
+                write(file)
+        return len(writes)
+    
+    def _split(self, data: pd.DataFrame) -> List[Tuple[Path, pd.DataFrame]]:
+        """Assign the rows of ``data`` to the files they belong in."""
+        if not self.tree:
+            return [(self.output_path, data)]
+        
+        groups = [(self.output_path, data)]
+        if self.partition_by:
+            missing = [column for column in self.partition_by if column not in data.columns]
+            if missing:
+                raise KeyError(f"Partition columns not in data: {missing}")
+            groups = [
+                (self.output_path / partition_dir(self.partition_by, key), rows.drop(columns=self.partition_by))
+                for key, rows in data.groupby(self.partition_by, dropna=False, sort=False, observed=True)
+            ]
+        
+        suffix = COMPRESSION_SUFFIXES.get(self.compression, '')
+        files = []
+        for directory, rows in groups:
+            bounds = [len(rows) * shard // self.shards for shard in range(self.shards + 1)]
+            for shard, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+                if end > start:
+                    files.append((directory / f"part-{shard:05d}-{self._run}.csv{suffix}", rows.iloc[start:end]))
+        return files
+    
+    def _write_file(
+        self,
+        path: Path,
+        data: pd.DataFrame,
+        mode: str,
+        header: bool,
+        compression: Optional[str],
+        options: Dict[str, Any]
+    ) -> None:
+        """Write rows to one file, through the shared CSV form when possible."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if (
+            self.encodings is not None and CSV in self.encodings.forms
+            and compression is None and self._writes_csv_form(options)
+        ):
+            rows = self.encodings.encode(data, CSV, encode_csv)
+            with open(path, 'ab' if mode == 'a' else 'wb') as f:
+                if header:
+                    f.write(data.head(0).to_csv(index=False).encode('utf-8'))
+                f.write(rows)
+        else:
+            data.to_csv(path, mode=mode, header=header, compression=compression, **options)
+    
+    def _writes_csv_form(self, options: Dict[str, Any]) -> bool:
+        """Return whether to_csv() with these options writes the shared CSV form."""
+        return not self.tree and set(options) == {'index'} and options['index'] is False
+    
+    def encoded_forms(self) -> Tuple[str, ...]:
+        """The CSV form, unless options change what to_csv() writes."""
+        options = {'index': False, **{k: v for k, v in self.config.items() if k not in _LOADER_OPTIONS}}
+        return (CSV,) if self.compression is None and self._writes_csv_form(options) else ()
+    
+    def _commit(self) -> None:
+        """Move the written files into place and, when replacing a tree, drop stale parts."""
+        for final, path in self._outputs.items():
+            if path != final:
+                os.replace(path, final)
+                self._outputs[final] = final
+        if self.tree and not self._append:
+            self._remove_stale_parts()
+    
+    def _discard(self) -> None:
+        """Delete the temporary files of the current output."""
+        for final, path in self._outputs.items():
+            if path != final:
+                path.unlink(missing_ok=True)
+        self._outputs = {}
+        self._streaming = False
+    
+    def _remove_stale_parts(self) -> None:
+        """Delete part files of earlier runs and the partition directories left empty."""
+        directories = set()
+        for path in self.output_path.rglob('part-*.csv*'):
+            if path not in self._outputs:
+                path.unlink()
+                directories.update(path.parents)
+        for directory in sorted(directories, key=lambda d: len(d.parts), reverse=True):
+            if directory != self.output_path and self.output_path in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    pass
+    
+    def _temporary(self, final: Path) -> Path:
+        """Path a file is written to before it is committed."""
+        return final.with_name(f".{final.name}.tmp") if self.atomic else final
+    
+    def _temporaries(self) -> List[Path]:
+        """Temporary files of this output present on disk."""
+        if not self.atomic:
+            return []
+        if self.tree:
+            return list(self.output_path.rglob('.part-*.tmp')) if self.output_path.is_dir() else []
+        path = self._temporary(self.output_path)
+        return [path] if path.exists() else []
+    
+    @property
+    def _root(self) -> Path:
+        """Directory holding the output."""
+        return self.output_path if self.tree else self.output_path.parent
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the output file and write options."""
+        return {
+            'config': self.config,
+            'path': str(self.output_path.resolve()),
+            'partition_by': self.partition_by,
+            'shards': self.shards,
+            'compression': self.compression,
+            'atomic': self.atomic,
+            'if_exists': self.if_exists,
+        }
+    
+    def stream_position(self) -> Optional[Dict[str, Any]]:
+        """The files of the stream with their sizes after the batches written so far."""
+        if not self._outputs:
+            return None
+        return {
+            'run': self._run,
+            'append': self._append,
+            'files': {
+                str(final.relative_to(self._root)): [str(path.relative_to(self._root)), path.stat().st_size]
+                for final, path in self._outputs.items()
+            },
+        }
+    
+    def restore_stream_position(self, position: Any) -> bool:
+        """Truncate the stream's files to ``position``, dropping partial batches.
+        
+        Files the stream created after ``position`` was taken are deleted.
+        """
+        if not isinstance(position, dict):
+            return False
+        outputs = {}
+        for name, (written, size) in position['files'].items():
+            path = self._root / written
+            if not path.exists() or path.stat().st_size < size:
+                return False
+            outputs[self._root / name] = (path, size)
+        
+        for path, size in outputs.values():
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+        if self.tree:
+            kept = {path for path, _ in outputs.values()}
+            for path in self.output_path.rglob(f"*part-*-{position['run']}.csv*"):
+                if path not in kept:
+                    path.unlink()
+        
+        self._run = position['run']
+        self._append = position['append']
+        self._outputs = {final: path for final, (path, _) in outputs.items()}
+        self._streaming = True
+        self.logger.info(f"Resuming {self.output_path} with {len(outputs)} files")
+        return True
+    
+    @property
+    def bytes_written(self) -> Optional[int]:
+        """Size of the files of the last load or stream in bytes, or None before any."""
+        sizes = [path.stat().st_size for path in self._outputs.values() if path.exists()]
+        return sum(sizes) if sizes else None
     
     def disconnect(self) -> None:
-        """No cleanup needed for CSV."""
+        """Commit the files of a stream written with load_batch()."""
+        if self._streaming:
+            self._commit()
+            self._streaming = False
+            self.logger.info(f"Committed {len(self._outputs)} files to {self.output_path}")
         self.logger.info("CSV loader disconnected")
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None and self._streaming:
+            # Left uncommitted on disk for a resumed run to continue
+            self._outputs = {}
+            self._streaming = False
+        return super().__exit__(exc_type, exc_val, exc_tb)
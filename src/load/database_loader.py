@@ -1,22 +1,77 @@
 """Database loader using SQLAlchemy."""
+import uuid
 import pandas as pd
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from .base import BaseLoader
+from .bulk import BULK_METHODS, _batch_connection, resolve_method
+from .encoding import CSV
+
+INSERT_METHODS = ('auto', 'to_sql') + tuple(BULK_METHODS)
+
+# Config keys of the load section consumed by the loader or the pipeline rather than passed to to_sql()
+_LOADER_OPTIONS = ('batch_size', 'insert_method', 'key_columns', 'create_key_index', 'max_workers')
+
+# Table recording, per target table, the stream being written and its committed batch count
+PROGRESS_TABLE = '_etl_stream_progress'
 
 
 class DatabaseLoader(BaseLoader):
-    """Load data to SQL databases."""
+    """Load data to SQL databases.
+    
+    ``insert_method`` selects how rows are written:
+    
+    - ``'auto'`` (default): ``'copy'`` on PostgreSQL, ``'executemany'`` elsewhere
+    - ``'executemany'``: one prepared INSERT executed over each batch
+    - ``'multi_values'``: multi-row ``INSERT ... VALUES`` statements
+    - ``'copy'``: PostgreSQL ``COPY FROM STDIN`` from an in-memory CSV buffer,
+      shared with other loaders of the pipeline that write the frame as CSV
+    - ``'to_sql'``: plain ``DataFrame.to_sql`` with ``chunksize=batch_size``
+    
+    Bulk methods commit one transaction per batch of ``batch_size`` rows.
+    ``batch_size``, ``insert_method`` and ``key_columns`` may also be given
+    in ``config``, so the ``load`` section of config.json can be passed
+    directly.
+    
+    ``if_exists='merge'`` upserts on ``key_columns``: rows are bulk loaded
+    into a temporary staging table and merged into the target with a single
+    ``INSERT ... ON CONFLICT DO UPDATE`` (SQLite and PostgreSQL). The target
+    needs a primary key or unique constraint on exactly ``key_columns``; the
+    loader adds a unique index only to tables it creates, or to existing
+    tables when ``create_key_index`` is set.
+    
+    Streamed batches (load_batch()) are each written in one transaction,
+    which also records the number of batches committed so far in
+    ``PROGRESS_TABLE``. That count is the loader's stream position, so a
+    resumed stream continues after the last committed batch.
+    """
     
     def __init__(
         self, 
         connection_string: str,
         table_name: str,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        insert_method: Optional[str] = None,
+        key_columns: Optional[List[str]] = None,
+        create_key_index: Optional[bool] = None
     ):
         super().__init__(config)
         self.connection_string = connection_string
         self.table_name = table_name
+        self.batch_size = batch_size or self.config.get('batch_size', 500)
+        self.insert_method = insert_method or self.config.get('insert_method', 'auto')
+        self.key_columns = key_columns or self.config.get('key_columns')
+        self.create_key_index = (
+            create_key_index if create_key_index is not None
+            else self.config.get('create_key_index', False)
+        )
+        if self.insert_method not in INSERT_METHODS:
+            raise ValueError(f"Unknown insert method: {self.insert_method}")
         self.engine = None
+        self._stream: Optional[str] = None
+        self._batches = 0
+        # Batches committed after the restored position, acknowledged without writing
+        self._skip = 0
     
     def connect(self) -> None:
         """Create database engine."""
@@ -33,16 +88,21 @@ class DatabaseLoader(BaseLoader):
     def load(
         self, 
         data: pd.DataFrame, 
-        if_exists: str = 'append',
+        if_exists: Optional[str] = None,
         **kwargs
     ) -> None:
         """Load DataFrame to database table.
         
         Args:
             data: DataFrame to load
-            if_exists: How to handle existing table ('fail', 'replace', 'append')
+            if_exists: How to handle existing table ('fail', 'replace',
+                'append', 'merge'); defaults to the configured value or 'append'
             **kwargs: Additional arguments passed to to_sql()
         """
+        self._write(data, if_exists, None, **kwargs)
+    
+    def _write(self, data: pd.DataFrame, if_exists: Optional[str], connection: Any, **kwargs) -> None:
+        """Load ``data``, within the transaction of ``connection`` if given."""
         if not isinstance(data, pd.DataFrame):
             raise TypeError(f"Expected DataFrame, got {type(data)}")
         
@@ -51,13 +111,259 @@ class DatabaseLoader(BaseLoader):
         
         write_config = {
             'index': False,
-            'if_exists': if_exists,
-            **self.config,
+            **{k: v for k, v in self.config.items() if k not in _LOADER_OPTIONS},
             **kwargs
         }
+        write_config['if_exists'] = if_exists or write_config.get('if_exists', 'append')
+        
+        method = resolve_method(self.insert_method, self.engine.dialect.name)
+        if write_config['if_exists'] == 'merge':
+            self._merge_load(data, method, write_config, connection)
+        elif method == 'to_sql':
+            write_config.setdefault('chunksize', self.batch_size)
+            con = connection if connection is not None else self.engine
+            data.to_sql(self.table_name, con, **write_config)
+        else:
+            self._bulk_load(data, method, write_config, connection)
+        self.logger.info(f"Loaded {len(data)} rows to table '{self.table_name}' via {method}")
+    
+    def _bulk_load(
+        self, data: pd.DataFrame, method: str, write_config: Dict[str, Any], connection: Any = None
+    ) -> None:
+        """Create or validate the table with pandas, then bulk insert rows."""
+        from sqlalchemy import MetaData, Table
+        
+        if write_config.get('index'):
+            data = data.reset_index()
+            write_config = {**write_config, 'index': False}
+        
+        # pandas handles fail/replace/append and the column types
+        con = connection if connection is not None else self.engine
+        data.head(0).to_sql(self.table_name, con, **write_config)
+        table = Table(
+            self.table_name,
+            MetaData(),
+            schema=write_config.get('schema'),
+            autoload_with=con
+        )
+        BULK_METHODS[method](
+            self.engine, table, data, self.batch_size, connection=connection, **self._bulk_options(method)
+        )
+    
+    def _merge_load(
+        self, data: pd.DataFrame, method: str, write_config: Dict[str, Any], connection: Any = None
+    ) -> None:
+        """Upsert rows on ``key_columns`` through a temporary staging table.
+        
+        Staging load and merge run in one transaction (that of
+        ``connection`` if given), so the target only ever sees the complete
+        batch. Rows sharing a key keep the last one.
+        
+        Raises:
+            ValueError: If ``key_columns`` are missing, or the existing target
+                has no unique key on them and ``create_key_index`` is not set
+        """
+        from sqlalchemy import inspect, table as table_clause
+        
+        if not self.key_columns:
+            raise ValueError("key_columns are required for if_exists='merge'")
+        missing = [column for column in self.key_columns if column not in data.columns]
+        if missing:
+            raise KeyError(f"Key columns not in data: {missing}")
+        if method == 'to_sql':
+            method = resolve_method('auto', self.engine.dialect.name)
+        
+        schema = write_config.get('schema')
+        create_config = {
+            k: v for k, v in write_config.items() if k in ('schema', 'dtype')
+        }
+        con = connection if connection is not None else self.engine
+        inspector = inspect(con)
+        created = not inspector.has_table(self.table_name, schema=schema)
+        if created:
+            data.head(0).to_sql(self.table_name, con, index=False, **create_config)
+        elif not self._has_unique_key(inspector, schema):
+            if not self.create_key_index:
+                raise ValueError(
+                    f"Table '{self.table_name}' has no primary key or unique constraint on "
+                    f"{self.key_columns}, which if_exists='merge' requires; add one or set "
+                    f"create_key_index=True to let the loader create a unique index"
+                )
+            self.logger.info(f"Creating unique index on {self.key_columns} of '{self.table_name}'")
+        
+        # Keep the frame itself when no keys repeat, so a CSV encoding shared with other loaders still applies
+        duplicated = data.duplicated(subset=self.key_columns, keep='last')
+        if duplicated.any():
+            data = data[~duplicated]
+        preparer = self.engine.dialect.identifier_preparer
+        target = preparer.format_table(table_clause(self.table_name, schema=schema))
+        staging_name = f"_stg_{self.table_name}_{uuid.uuid4().hex[:8]}"
+        staging = preparer.quote(staging_name)
+        columns = ', '.join(preparer.quote(column) for column in data.columns)
+        keys = ', '.join(preparer.quote(column) for column in self.key_columns)
+        index_name = preparer.quote(f"ux_{self.table_name}_{'_'.join(self.key_columns)}")
+        updates = [
+            f"{preparer.quote(column)} = excluded.{preparer.quote(column)}"
+            for column in data.columns if column not in self.key_columns
+        ]
+        action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        
+        with _batch_connection(self.engine, connection) as conn:
+            # ON CONFLICT needs a unique index covering exactly the key columns
+            if created or self.create_key_index:
+                conn.exec_driver_sql(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {target} ({keys})"
+                )
+            conn.exec_driver_sql(
+                f"CREATE TEMPORARY TABLE {staging} AS SELECT {columns} FROM {target} WHERE 1 = 0"
+            )
+            BULK_METHODS[method](
+                self.engine, table_clause(staging_name), data, self.batch_size,
+                connection=conn, **self._bulk_options(method)
+            )
+            # WHERE true disambiguates ON CONFLICT from a join constraint in SQLite
+            result = conn.exec_driver_sql(
+                f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {staging} WHERE true "
+                f"ON CONFLICT ({keys}) {action}"
+            )
+            conn.exec_driver_sql(f"DROP TABLE {staging}")
+        self.logger.info(
+            f"Merged {len(data)} rows into '{self.table_name}' on {self.key_columns} "
+            f"({result.rowcount} affected)"
+        )
+    
+    def _has_unique_key(self, inspector: Any, schema: Optional[str]) -> bool:
+        """Whether the target has a primary key or unique index on exactly ``key_columns``."""
+        keys = set(self.key_columns)
+        candidates = [inspector.get_pk_constraint(self.table_name, schema=schema)['constrained_columns']]
+        candidates += [
+            constraint['column_names']
+            for constraint in inspector.get_unique_constraints(self.table_name, schema=schema)
+        ]
+        candidates += [
+            index['column_names']
+            for index in inspector.get_indexes(self.table_name, schema=schema) if index['unique']
+        ]
+        return any(set(columns) == keys for columns in candidates)
+    
+    def _bulk_options(self, method: str) -> Dict[str, Any]:
+        """Extra arguments for a bulk method: COPY encodes through ``encodings``."""
+        return {'encodings': self.encodings} if method == 'copy' else {}
+    
+    def encoded_forms(self) -> Tuple[str, ...]:
+        """The CSV form when rows are written with COPY.
+        
+        Merge mode declares none: it stages the frame deduplicated on
+        ``key_columns``, which is a different frame whenever keys repeat.
+        """
+        if self.config.get('if_exists') == 'merge':
+            return ()
+        try:
+            from sqlalchemy.engine import make_url
+        except ImportError:
+            return ()
+        
+        dialect = make_url(self.connection_string).get_backend_name()
+        return (CSV,) if resolve_method(self.insert_method, dialect) == 'copy' else ()
+    
+    def load_batch(self, data: pd.DataFrame, first: bool = False, **kwargs) -> None:
+        """Honour ``if_exists`` for the first batch and append the rest.
+        
+        In merge mode every batch is merged. Each batch is committed in one
+        transaction together with the stream's batch count.
+        """
+        if not self.engine:
+            raise RuntimeError("Not connected. Call connect() first.")
+        if self._skip:
+            # Committed by the interrupted run after its last checkpoint
+            self._skip -= 1
+            self._batches += 1
+            self.logger.info(f"Batch {self._batches} of the stream is already in '{self.table_name}'")
+            return
+        if first or self._stream is None:
+            self._stream = uuid.uuid4().hex
+            self._batches = 0
+        
+        if_exists = kwargs.pop('if_exists', self.config.get('if_exists'))
+        if not first and if_exists != 'merge':
+            if_exists = 'append'
+        with self.engine.begin() as conn:
+            self._write(data, if_exists, conn, **kwargs)
+            self._record_progress(conn, self._batches + 1)
+        self._batches += 1
+    
+    def stream_position(self) -> Optional[Dict[str, Any]]:
+        """The stream being written and the number of its batches committed."""
+        if self._stream is None:
+            return None
+        return {'stream': self._stream, 'batches': self._batches}
+    
+    def restore_stream_position(self, position: Any) -> bool:
+        """Continue the stream of ``position`` after its committed batches.
+        
+        Batches the stream committed after ``position`` was checkpointed are
+        acknowledged without being written again.
+        """
+        if not isinstance(position, dict) or not self.engine:
+            return False
+        committed = self._committed_batches(position['stream'])
+        if committed is None or committed < position['batches']:
+            self.logger.warning(f"Stream progress of '{self.table_name}' does not match the checkpoint")
+            return False
+        self._stream = position['stream']
+        self._batches = position['batches']
+        self._skip = committed - position['batches']
+        return True
+    
+    def _progress_key(self) -> str:
+        """Identify the target table in ``PROGRESS_TABLE``."""
+        schema = self.config.get('schema')
+        return f"{schema}.{self.table_name}" if schema else self.table_name
+    
+    def _record_progress(self, conn: Any, batches: int) -> None:
+        """Store the stream's committed batch count in the open transaction."""
+        from sqlalchemy import text
+        
+        table = self.engine.dialect.identifier_preparer.quote(PROGRESS_TABLE)
+        conn.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            f"(target VARCHAR(255) PRIMARY KEY, stream VARCHAR(32) NOT NULL, batches INTEGER NOT NULL)"
+        )
+        params = {'target': self._progress_key(), 'stream': self._stream, 'batches': batches}
+        updated = conn.execute(
+            text(f"UPDATE {table} SET stream = :stream, batches = :batches WHERE target = :target"),
+            params
+        )
+        if updated.rowcount == 0:
+            conn.execute(
+                text(f"INSERT INTO {table} (target, stream, batches) VALUES (:target, :stream, :batches)"),
+                params
+            )
+    
+    def _committed_batches(self, stream: str) -> Optional[int]:
+        """Return how many batches of ``stream`` are committed, or None if unknown."""
+        from sqlalchemy import inspect, text
         
-        data.to_sql(self.table_name, self.engine, **write_config)
-        self.logger.info(f"Loaded {len(data)} rows to table '{self.table_name}'")
+        if not inspect(self.engine).has_table(PROGRESS_TABLE):
+            return None
+        table = self.engine.dialect.identifier_preparer.quote(PROGRESS_TABLE)
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text(f"SELECT stream, batches FROM {table} WHERE target = :target"),
+                {'target': self._progress_key()}
+            ).first()
+        if row is None or row[0] != stream:
+            return None
+        return row[1]
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the target table and write options."""
+        return {
+            'config': self.config,
+            'connection': self.connection_string,
+            'table': self.table_name,
+            'key_columns': self.key_columns,
+        }
     
     def disconnect(self) -> None:
         """Dispose database engine."""
@@ -0,0 +1,76 @@
+"""Encoded forms of a frame shared by the loaders writing it."""
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Header-less CSV rows as DataFrame.to_csv() writes them by default, UTF-8 encoded
+CSV = 'csv'
+
+
+def encode_csv(data: pd.DataFrame) -> bytes:
+    """Encode the rows of ``data`` in the CSV form."""
+    return data.to_csv(index=False, header=False).encode('utf-8')
+
+
+def split_rows(body: bytes, rows: int, batch_size: int) -> List[memoryview]:
+    """Split ``rows`` encoded CSV rows into slices of ``batch_size`` rows.
+    
+    Slices are views of ``body``, not copies. When quoted fields contain
+    line breaks, newlines no longer separate rows and the body is
+    returned as a single slice.
+    """
+    view = memoryview(body)
+    ends = np.flatnonzero(np.frombuffer(body, dtype=np.uint8) == ord('\n')) + 1
+    if len(ends) != rows:
+        return [view] if rows else []
+    cuts = [0, *ends[batch_size - 1::batch_size].tolist()]
+    if cuts[-1] != len(body):
+        cuts.append(len(body))
+    return [view[start:end] for start, end in zip(cuts[:-1], cuts[1:])]
+
+
+class _Entry:
+    """One encoded form of a frame; ``lock`` is held while it is encoded."""
+    
+    def __init__(self, data: Any):
+        self.data = data  # Keeps id(data) from being reused while cached
+        self.value = None
+        self.lock = threading.Lock()
+
+
+class SharedEncodings:
+    """Encode a frame once for all loaders that write it in the same form.
+    
+    ETLPipeline hands one to its loaders (as ``loader.encodings``) while
+    they load a frame, listing the ``forms`` that more than one of them
+    asked for through BaseLoader.encoded_forms(). The first loader to call
+    encode() for a frame and form encodes it; loaders calling concurrently
+    wait for that result instead of encoding again. Forms not listed are
+    encoded on every call and not kept.
+    
+    ``stats`` counts ``encoded`` and ``reused`` buffers.
+    """
+    
+    def __init__(self, forms: Iterable[str] = ()):
+        self.forms = frozenset(forms)
+        self.stats = {'encoded': 0, 'reused': 0}
+        self._entries: Dict[Tuple[int, str], _Entry] = {}
+        self._lock = threading.Lock()
+    
+    def encode(self, data: Any, form: str, encoder: Callable[[Any], bytes]) -> bytes:
+        """Return ``encoder(data)``, computed once per frame for shared forms."""
+        if form not in self.forms:
+            return encoder(data)
+        with self._lock:
+            entry = self._entries.setdefault((id(data), form), _Entry(data))
+        with entry.lock:
+            if entry.value is None:
+                entry.value = encoder(data)
+                stat = 'encoded'
+            else:
+                stat = 'reused'
+        with self._lock:
+            self.stats[stat] += 1
+        return entry.value
@@ -0,0 +1,112 @@
+"""Parquet file loader."""
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from .base import BaseLoader
+
+
+class ParquetLoader(BaseLoader):
+    """Load data to Parquet files using pyarrow.
+    
+    ``compression`` accepts any codec supported by pyarrow (``'snappy'``,
+    ``'zstd'``, ``'gzip'``, ``'lz4'``, ``'brotli'`` or ``'none'``) and
+    ``row_group_size`` sets the number of rows per row group, which is also
+    the batch size ParquetExtractor streams back. Streamed batches are
+    appended as new row groups of a single file.
+    """
+    
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        config: Optional[Dict[str, Any]] = None,
+        compression: str = 'snappy',
+        row_group_size: Optional[int] = None
+    ):
+        super().__init__(config)
+        self.output_path = Path(output_path)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._writer = None
+    
+    def connect(self) -> None:
+        """Ensure output directory exists."""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow required. Install with: pip install pyarrow")
+        
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger.info(f"Output directory ready: {self.output_path.parent}")
+    
+    def load(self, data: pd.DataFrame, **kwargs) -> None:
+        """Load DataFrame to Parquet file.
+        
+        Args:
+            data: DataFrame to save
+            **kwargs: Additional arguments passed to pyarrow.parquet.write_table()
+        """
+        import pyarrow.parquet as pq
+        
+        table = self._to_table(data)
+        write_config = {
+            'compression': self.compression,
+            'row_group_size': self.row_group_size,
+            **self.config,
+            **kwargs
+        }
+        pq.write_table(table, self.output_path, **write_config)
+        self.logger.info(f"Loaded {len(data)} rows to {self.output_path}")
+    
+    def checkpoint_signature(self) -> Dict[str, Any]:
+        """Describe the output file and write options."""
+        return {
+            'config': self.config,
+            'path': str(self.output_path.resolve()),
+            'compression': self.compression,
+            'row_group_size': self.row_group_size,
+        }
+    
+    def load_batch(self, data: pd.DataFrame, first: bool = False, **kwargs) -> None:
+        """Write each batch as new row groups of one file.
+        
+        The first batch opens a writer with its schema; later batches are
+        cast to that schema and appended until disconnect() closes the file.
+        """
+        import pyarrow.parquet as pq
+        
+        table = self._to_table(data)
+        if first or self._writer is None:
+            self._close_writer()
+            write_config = {'compression': self.compression, **self.config, **kwargs}
+            self._writer = pq.ParquetWriter(self.output_path, table.schema, **write_config)
+        elif not table.schema.equals(self._writer.schema):
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self.logger.debug(f"Appended {len(data)} rows to {self.output_path}")
+    
+    def _to_table(self, data: pd.DataFrame):
+        """Convert a DataFrame to an Arrow table without its index."""
+        import pyarrow as pa
+        
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError(f"Expected DataFrame, got {type(data)}")
+        return pa.Table.from_pandas(data, preserve_index=False)
+    
+    def _close_writer(self) -> None:
+        """Finalize the file written by load_batch(), if any."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    @property
+    def bytes_written(self) -> Optional[int]:
+        """Size of the output file in bytes, or None before it exists."""
+        try:
+            return self.output_path.stat().st_size
+        except FileNotFoundError:
+            return None
+    
+    def disconnect(self) -> None:
+        """Close any open streaming writer."""
+        self._close_writer()
+        self.logger.info("Parquet loader disconnected")
@@ -1,35 +1,117 @@
 """Main ETL pipeline orchestrator."""
 import logging
-from typing import Any, Callable, List, Optional
-from dataclasses import dataclass, field
+import time
+from collections import Counter
+from concurrent.futures import (
+    FIRST_EXCEPTION, Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+)
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from .dag import DAGScheduler, PipelineStep
+from .engine import PipelinedExecutor, StageStats
 from .extract.base import BaseExtractor
-from .transform.base import BaseTransformer
+from .transform.base import BaseTransformer, QueryPlan
 from .load.base import BaseLoader
+from .load.encoding import SharedEncodings
+from .utils.checkpoint import CheckpointStore
+from .utils.files import stable_hash
+from .utils.metrics import MetricsCollector, RunReport, count_rows
 
 logger = logging.getLogger(__name__)
 
+_EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
 
-@dataclass
-class PipelineStep:
-    """Represents a step in the ETL pipeline."""
-    name: str
-    func: Callable
-    on_error: str = "fail"  # "fail", "skip", "retry"
-    retries: int = 3
+# Config sections that do not affect the data a run produces
+_UNCHECKED_SECTIONS = ('metrics', 'checkpoint')
+
+
+def _component_name(component: Any, index: int) -> str:
+    """Name a pipeline component in run metrics, e.g. ``CSVExtractor[0]``."""
+    return f"{type(component).__name__}[{index}]"
+
+
+def _extract_one(extractor: BaseExtractor, kwargs: Dict[str, Any]) -> Tuple[Any, float, Optional[int], Any]:
+    """Open, drain and close a single extractor (runs inside pool workers).
+    
+    Returns the data with the extraction time, bytes read and pending
+    watermark. Worker processes run on a copy of the extractor, so the
+    parent records these itself rather than relying on the worker's state.
+    """
+    with extractor:
+        start = time.perf_counter()
+        data = extractor.extract(**kwargs)
+        return data, time.perf_counter() - start, extractor.bytes_read, extractor.pending_watermark
 
 
 class ETLPipeline:
-    """Orchestrate ETL operations."""
+    """Orchestrate ETL operations.
+    
+    The optional ``config`` follows the layout of config/config.json.
+    ``pipeline.execution`` selects how data flows through the stages:
+    
+    - ``"batch"`` (default): extract everything, transform, then load.
+    - ``"streaming"``: extractors yield chunks of ``extract.batch_size``
+      records which are transformed and loaded one at a time.
+    - ``"pipelined"``: like streaming, but extract, transform and load run
+      concurrently, connected by queues of ``pipeline.queue_size`` batches.
+      Per-stage timings are kept in ``stage_stats`` after the run.
+    - ``"dag"`` (default when steps were added with add_step()): run named
+      PipelineSteps in dependency order, with independent branches on up to
+      ``pipeline.max_workers`` threads. Returns the results of the steps
+      nothing depends on, keyed by name.
+    
+    When the first transformer is a lazy DataFrameTransformer and a single
+    extractor supports pushdown, the transformer's column selection is read
+    as ``usecols`` and, in batch mode, its leading row-local steps are
+    applied to each chunk while the source is parsed.
     
-    def __init__(self, name: str = "etl_pipeline"):
+    ``extract.max_workers`` greater than 1 runs multiple extractors
+    concurrently on a pool selected by ``extract.executor`` (``"thread"``
+    or ``"process"``). Likewise ``load.max_workers`` greater than 1 hands
+    each frame or batch to the loaders on that many threads. Whatever the
+    setting, a form of the data that several loaders write, such as the
+    CSV rows of a CSVLoader and a DatabaseLoader using COPY, is encoded
+    once and shared (see BaseLoader.encoded_forms()).
+    
+    Every run leaves a RunReport in ``last_report`` with the duration, rows
+    in/out, bytes and peak memory of each extractor, transformer,
+    transformation step and loader; run_with_report() returns it with the
+    data. The ``metrics`` section sets ``trace_memory`` to record
+    tracemalloc peaks per stage, and ``json_path`` / ``prometheus_path`` to
+    write the report after each run.
+    
+    With ``checkpoint.directory`` set, batch runs save the extract and
+    transform outputs there, and streaming and pipelined runs record how
+    many batches each loader has written. resume(), or run() with
+    ``checkpoint.resume`` enabled, then continues a failed run: finished
+    stages are read back from the checkpoint, loaders that finished are
+    skipped, and streamed batches that every loader holds are not loaded
+    again. Checkpoints are discarded when the extractors' sources, the
+    transformations, the loaders or the config change, and deleted after a
+    successful run. DAG runs are not checkpointed.
+    """
+    
+    def __init__(self, name: str = "etl_pipeline", config: Optional[Dict[str, Any]] = None):
         self.name = name
+        self.config = config or {}
         self.logger = logging.getLogger(f"Pipeline.{name}")
         self._extractors: List[BaseExtractor] = []
         self._transformers: List[BaseTransformer] = []
         self._loaders: List[BaseLoader] = []
         self._pre_hooks: List[Callable] = []
         self._post_hooks: List[Callable] = []
+        self._steps: List[PipelineStep] = []
+        self.stage_stats: Dict[str, StageStats] = {}
+        self.last_report: Optional[RunReport] = None
+        self._metrics = MetricsCollector(name)
+        self._checkpoint: Optional[CheckpointStore] = None
+        self._resuming = False
+        self._chunks_done: List[int] = []
     
     def add_extractor(self, extractor: BaseExtractor) -> 'ETLPipeline':
         """Add an extractor to the pipeline."""
@@ -46,6 +128,11 @@ class ETLPipeline:
         self._loaders.append(loader)
         return self
     
+    def add_step(self, step: PipelineStep) -> 'ETLPipeline':
+        """Add a named step for DAG execution."""
+        self._steps.append(step)
+        return self
+    
     def add_pre_hook(self, hook: Callable) -> 'ETLPipeline':
         """Add a pre-execution hook."""
         self._pre_hooks.append(hook)
@@ -63,7 +150,8 @@ class ETLPipeline:
             **extract_kwargs: Arguments passed to extractors
             
         Returns:
-            Final transformed data
+            Final transformed data, the number of rows loaded when
+            running in streaming mode, or sink step results in DAG mode
         """
         self.logger.info(f"Starting pipeline: {self.name}")
         
@@ -71,15 +159,30 @@ class ETLPipeline:
         for hook in self._pre_hooks:
             hook()
         
+        self._start_report()
+        error = None
         try:
-            # Extract
-            data = self._run_extract(**extract_kwargs)
+            # State from an earlier run must not leak into this one
+            self._reset_transformers()
+            execution = self._section('pipeline').get('execution', 'dag' if self._steps else 'batch')
+            plan = self._pushdown_plan()
+            if execution not in ('dag', 'streaming', 'pipelined', 'batch'):
+                raise ValueError(f"Unknown execution mode: {execution}")
+            self._open_checkpoint(execution, extract_kwargs)
+            if execution == 'dag':
+                data = self._run_dag()
+            elif execution == 'streaming':
+                data = self._run_streaming(**{**self._pushdown_kwargs(plan), **extract_kwargs})
+            elif execution == 'pipelined':
+                data = self._run_pipelined(**{**self._pushdown_kwargs(plan), **extract_kwargs})
+            else:
+                data = self._run_batch(plan, extract_kwargs)
             
-            # Transform
-            data = self._run_transform(data)
-            
-            # Load
-            self._run_load(data)
+            # Loaders succeeded, so extractors may persist their progress
+            for extractor in self._extractors:
+                extractor.commit()
+            if self._checkpoint is not None:
+                self._checkpoint.clear()
             
             self.logger.info(f"Pipeline completed: {self.name}")
             
@@ -90,8 +193,191 @@ class ETLPipeline:
             return data
             
         except Exception as e:
+            error = e
             self.logger.error(f"Pipeline failed: {e}")
             raise
+        finally:
+            self._checkpoint = None
+            self._finish_report(error)
+    
+    def resume(self, **extract_kwargs) -> Any:
+        """Execute the pipeline, continuing from the checkpoint of a failed run.
+        
+        Requires ``checkpoint.directory`` in the config. Without a usable
+        checkpoint, this is the same as run().
+        
+        Args:
+            **extract_kwargs: Arguments passed to extractors
+            
+        Returns:
+            The value returned by run()
+        """
+        if not self._section('checkpoint').get('directory'):
+            raise ValueError("Resuming requires checkpoint.directory in the config")
+        self._resuming = True
+        try:
+            return self.run(**extract_kwargs)
+        finally:
+            self._resuming = False
+    
+    def run_with_report(self, **extract_kwargs) -> Tuple[Any, RunReport]:
+        """Execute the ETL pipeline and return its result with the RunReport.
+        
+        Args:
+            **extract_kwargs: Arguments passed to extractors
+            
+        Returns:
+            Tuple of the value returned by run() and the run's report
+        """
+        data = self.run(**extract_kwargs)
+        return data, self.last_report
+    
+    def _start_report(self) -> None:
+        """Start collecting metrics for a new run."""
+        trace_memory = self._section('metrics').get('trace_memory', False)
+        self._metrics = MetricsCollector(self.name, trace_memory=trace_memory)
+        for index, transformer in enumerate(self._transformers):
+            transformer.step_observer = self._step_observer(_component_name(transformer, index))
+    
+    def _finish_report(self, error: Optional[BaseException]) -> None:
+        """Close the run's report and write the configured exports."""
+        for transformer in self._transformers:
+            transformer.step_observer = None
+        report = self._metrics.finish(error)
+        self.last_report = report
+        
+        for metrics in report.stages:
+            rate = metrics.rows_per_second
+            self.logger.debug(
+                f"{metrics.stage} {metrics.name}: {metrics.duration_seconds:.3f}s, "
+                f"rows {metrics.rows_in} -> {metrics.rows_out}"
+                + (f", {rate:.0f} rows/s" if rate is not None else "")
+            )
+        self.logger.info(f"Run took {report.duration_seconds:.3f}s ({report.status})")
+        
+        metrics_config = self._section('metrics')
+        try:
+            if metrics_config.get('json_path'):
+                report.to_json(metrics_config['json_path'])
+            if metrics_config.get('prometheus_path'):
+                report.to_prometheus(metrics_config['prometheus_path'])
+        except OSError as e:
+            self.logger.warning(f"Could not write run report: {e}")
+    
+    def _step_observer(self, component: str) -> Callable[[str, Callable, Any], Any]:
+        """Return a transformer step observer recording into the run's metrics."""
+        def observe(label: str, func: Callable, data: Any) -> Any:
+            with self._metrics.measure('transform_step', f"{component}/{label}", count_rows(data)) as timer:
+                result = func(data)
+                timer.rows_out = count_rows(result)
+            return result
+        return observe
+    
+    def _section(self, name: str) -> Dict[str, Any]:
+        """Return a config section, or an empty dict if absent."""
+        return self.config.get(name) or {}
+    
+    def _pushdown_plan(self) -> Optional[QueryPlan]:
+        """Return the first transformer's plan if it can be pushed into extraction."""
+        if len(self._extractors) != 1 or not self._transformers:
+            return None
+        transformer = self._transformers[0]
+        if not getattr(transformer, 'lazy', False) or not self._extractors[0].supports_pushdown:
+            return None
+        plan = transformer.optimize()
+        self.logger.debug(
+            f"Pushdown plan: usecols={plan.usecols}, "
+            f"chunk steps={[step.op for step in plan.chunk_steps]}"
+        )
+        return plan
+    
+    def _pushdown_kwargs(self, plan: Optional[QueryPlan], chunked: bool = False) -> Dict[str, Any]:
+        """Translate a plan into extractor arguments."""
+        if plan is None:
+            return {}
+        kwargs: Dict[str, Any] = {}
+        if plan.usecols is not None:
+            kwargs['usecols'] = plan.usecols
+        if chunked and plan.chunk_steps:
+            kwargs['chunk_transform'] = plan.apply_chunk
+        return kwargs
+    
+    def _open_checkpoint(self, execution: str, extract_kwargs: Dict[str, Any]) -> None:
+        """Open the run's checkpoint, discarding it unless resuming with unchanged inputs."""
+        settings = self._section('checkpoint')
+        if not settings.get('directory') or execution == 'dag':
+            return
+        
+        key = stable_hash(
+            self.name,
+            execution,
+            {name: section for name, section in self.config.items() if name not in _UNCHECKED_SECTIONS},
+            extract_kwargs,
+            [[type(extractor).__name__, extractor.checkpoint_signature()] for extractor in self._extractors],
+            [[type(transformer).__name__, transformer.checkpoint_signature()] for transformer in self._transformers],
+            [[type(loader).__name__, loader.checkpoint_signature()] for loader in self._loaders],
+        )
+        self._checkpoint = CheckpointStore(Path(settings['directory']) / self.name, key)
+        self._checkpoint.open(resume=self._resuming or settings.get('resume', False))
+    
+    def _save_stage(self, stage: str, data: Any, per_extractor: bool = False) -> None:
+        """Checkpoint a stage's output with the extractors' pending watermarks.
+        
+        ``per_extractor`` marks ``data`` as the list of every extractor's
+        output, which is stored one file per extractor.
+        """
+        if self._checkpoint is None:
+            return
+        self._checkpoint.save(stage, data, per_item=per_extractor)
+        self._checkpoint.mark('watermarks', [extractor.pending_watermark for extractor in self._extractors])
+    
+    def _restore_stage(self, stage: str) -> Any:
+        """Return a stage's checkpointed output, or None if it has to run."""
+        if self._checkpoint is None:
+            return None
+        data = self._checkpoint.load(stage)
+        if data is not None:
+            watermarks = self._checkpoint.get('watermarks') or [None] * len(self._extractors)
+            for extractor, watermark in zip(self._extractors, watermarks):
+                extractor.pending_watermark = watermark
+            self.logger.info(f"Reusing checkpointed {stage} output")
+        return data
+    
+    def _run_batch(self, plan: Optional[QueryPlan], extract_kwargs: Dict[str, Any]) -> Any:
+        """Extract everything, transform, then load, skipping checkpointed stages."""
+        data = self._restore_stage('transform')
+        if data is None:
+            # Extract
+            pushdown = self._pushdown_kwargs(plan, chunked=True)
+            data = self._restore_stage('extract')
+            if data is None:
+                data = self._run_extract(**{**pushdown, **extract_kwargs})
+                self._save_stage('extract', data, per_extractor=len(self._extractors) > 1)
+            
+            # Transform
+            data = self._run_transform(data, plan if pushdown.get('chunk_transform') else None)
+            self._save_stage('transform', data)
+        
+        # Load
+        self._run_load(data)
+        return data
+    
+    def _run_dag(self) -> Dict[str, Any]:
+        """Run the registered steps as a DAG and commit completed steps."""
+        if not self._steps:
+            raise ValueError("No steps configured")
+        
+        max_workers = self._section('pipeline').get('max_workers', 4)
+        scheduler = DAGScheduler(max_workers=max_workers, metrics=self._metrics)
+        results = scheduler.run(self._steps)
+        if scheduler.skipped:
+            self.logger.warning(f"Skipped steps: {', '.join(sorted(scheduler.skipped))}")
+        
+        # Progress is only persisted when nothing downstream was skipped
+        for step in scheduler.committable():
+            if step.commit is not None:
+                step.commit()
+        return results
     
     def _run_extract(self, **kwargs) -> Any:
         """Run all extractors."""
@@ -100,26 +386,311 @@ class ETLPipeline:
         
         # For single extractor, return data directly
         if len(self._extractors) == 1:
-            extractor = self._extractors[0]
-            with extractor:
-                return extractor.extract(**kwargs)
+            return self._extract_measured(0, self._extractors[0], kwargs)
         
         # For multiple extractors, return list of data
-        results = []
-        for extractor in self._extractors:
-            with extractor:
-                results.append(extractor.extract(**kwargs))
-        return results
+        max_workers = self._section('extract').get('max_workers', 1)
+        if max_workers > 1:
+            return self._run_extract_concurrent(max_workers, **kwargs)
+        
+        return [
+            self._extract_measured(index, extractor, kwargs)
+            for index, extractor in enumerate(self._extractors)
+        ]
+    
+    def _extract_measured(self, index: int, extractor: BaseExtractor, kwargs: Dict[str, Any]) -> Any:
+        """Run one extractor and record its metrics."""
+        name = _component_name(extractor, index)
+        with extractor:
+            with self._metrics.measure('extract', name) as timer:
+                data = extractor.extract(**kwargs)
+                timer.rows_out = count_rows(data)
+        self._metrics.get('extract', name).bytes_read = extractor.bytes_read
+        return data
     
-    def _run_transform(self, data: Any) -> Any:
-        """Run all transformers."""
+    def _run_extract_concurrent(self, max_workers: int, **kwargs) -> List[Any]:
+        """Run all extractors on a worker pool.
+        
+        Results keep the order in which extractors were added. When an
+        extractor fails, extractors that have not started yet are cancelled
+        and the failure of the earliest registered extractor is raised.
+        """
+        executor_kind = self._section('extract').get('executor', 'thread')
+        if executor_kind not in _EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor_kind}")
+        
+        pool: Executor = _EXECUTORS[executor_kind](max_workers=max_workers)
+        try:
+            futures = [
+                pool.submit(_extract_one, extractor, kwargs)
+                for extractor in self._extractors
+            ]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            
+            for future in futures:
+                if future in done and future.exception() is not None:
+                    raise future.exception()
+            
+            results = []
+            for index, (extractor, future) in enumerate(zip(self._extractors, futures)):
+                data, elapsed, bytes_read, watermark = future.result()
+                extractor.pending_watermark = watermark
+                metrics = self._metrics.record(
+                    'extract', _component_name(extractor, index), elapsed, rows_out=count_rows(data)
+                )
+                metrics.bytes_read = bytes_read
+                results.append(data)
+            return results
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _run_transform(self, data: Any, plan: Optional[QueryPlan] = None) -> Any:
+        """Run all transformers.
+        
+        If ``plan`` is given, the extractor already applied its chunk steps,
+        so the first transformer only runs the remaining steps.
+        """
         result = data
-        for transformer in self._transformers:
-            result = transformer.transform(result)
+        for index, transformer in enumerate(self._transformers):
+            rows_in = count_rows(result)
+            start = time.perf_counter()
+            if index == 0 and plan is not None:
+                result = transformer.apply_steps(plan.final_steps, result)
+            else:
+                result = transformer.transform(result)
+            # Timed without tracemalloc so the steps measured inside keep their peaks
+            self._metrics.record(
+                'transform', _component_name(transformer, index), time.perf_counter() - start,
+                rows_in=rows_in, rows_out=count_rows(result)
+            )
         return result
     
     def _run_load(self, data: Any) -> None:
-        """Run all loaders."""
-        for loader in self._loaders:
+        """Run all loaders, skipping those a resumed run already completed."""
+        pending = []
+        for index, loader in enumerate(self._loaders):
+            if self._checkpoint is not None and self._checkpoint.get(f"load:{index}"):
+                self.logger.info(f"Skipping {_component_name(loader, index)}: loaded before the run was resumed")
+                continue
+            pending.append((index, loader))
+        
+        def load(index: int, loader: BaseLoader) -> None:
             with loader:
+                self._load_measured(index, loader, data)
+        
+        def finish(index: int, loader: BaseLoader) -> None:
+            self._record_bytes_written(index, loader)
+            if self._checkpoint is not None:
+                self._checkpoint.mark(f"load:{index}", True)
+        
+        self._fan_out(pending, load, finish)
+    
+    def _fan_out(
+        self,
+        pending: List[Tuple[int, BaseLoader]],
+        load: Callable[[int, BaseLoader], None],
+        finish: Callable[[int, BaseLoader], None]
+    ) -> None:
+        """Call ``load`` for every (index, loader), then ``finish`` for those that succeeded.
+        
+        With ``load.max_workers`` above 1, loads run on a thread pool while
+        ``finish`` (checkpointing) stays on the calling thread. A failing
+        loader does not interrupt the others, which finish and are
+        checkpointed; the failure of the earliest registered loader is then
+        raised.
+        """
+        max_workers = min(self._section('load').get('max_workers', 1), len(pending))
+        encodings = self._share_encodings([loader for _, loader in pending])
+        try:
+            if max_workers <= 1:
+                for index, loader in pending:
+                    load(index, loader)
+                    finish(index, loader)
+                return
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {pool.submit(load, index, loader): (index, loader) for index, loader in pending}
+                for future in as_completed(futures):
+                    if future.exception() is None:
+                        finish(*futures[future])
+            for future in futures:
+                if future.exception() is not None:
+                    raise future.exception()
+        finally:
+            for _, loader in pending:
+                loader.encodings = None
+            if encodings is not None:
+                self.logger.debug(
+                    f"Shared encodings {sorted(encodings.forms)}: {encodings.stats['encoded']} encoded, "
+                    f"{encodings.stats['reused']} reused"
+                )
+    
+    def _share_encodings(self, loaders: List[BaseLoader]) -> Optional[SharedEncodings]:
+        """Hand loaders a SharedEncodings for the forms more than one of them writes."""
+        counts = Counter(form for loader in loaders for form in set(loader.encoded_forms()))
+        forms = [form for form, count in counts.items() if count > 1]
+        if not forms:
+            return None
+        encodings = SharedEncodings(forms)
+        for loader in loaders:
+            loader.encodings = encodings
+        return encodings
+    
+    def _load_measured(self, index: int, loader: BaseLoader, data: Any, batch: Optional[int] = None) -> None:
+        """Load data, or the batch with the given index, and record its metrics."""
+        with self._metrics.measure('load', _component_name(loader, index), count_rows(data)):
+            if batch is None:
                 loader.load(data)
+            else:
+                loader.load_batch(data, first=batch == 0)
+    
+    def _record_bytes_written(self, index: int, loader: BaseLoader) -> None:
+        """Record the output size of a finished loader."""
+        self._metrics.get('load', _component_name(loader, index)).bytes_written = loader.bytes_written
+    
+    def _iter_batches(self, **kwargs) -> Iterator[Any]:
+        """Yield batches from every extractor in registration order."""
+        if not self._extractors:
+            raise ValueError("No extractors configured")
+        
+        batch_size = self._section('extract').get('batch_size', 1000)
+        for index, extractor in enumerate(self._extractors):
+            name = _component_name(extractor, index)
+            with extractor:
+                batches = extractor.extract_batches(batch_size=batch_size, **kwargs)
+                while True:
+                    with self._metrics.measure('extract', name) as timer:
+                        batch = next(batches, None)
+                        if batch is None:
+                            # Reaching the end is timed but is not a batch
+                            timer.batches = 0
+                        else:
+                            timer.rows_out = count_rows(batch)
+                    if batch is None:
+                        break
+                    yield batch
+            self._metrics.get('extract', name).bytes_read = extractor.bytes_read
+    
+    def _resume_stream(self) -> None:
+        """Find how many batches each connected loader holds from an earlier run."""
+        self._chunks_done = [0] * len(self._loaders)
+        if self._checkpoint is None:
+            return
+        for index, loader in enumerate(self._loaders):
+            progress = self._checkpoint.get(f"chunks:{index}")
+            if progress and loader.restore_stream_position(progress['position']):
+                self._chunks_done[index] = progress['count']
+        if any(self._chunks_done):
+            self.logger.info(f"Resuming stream; batches already loaded per loader: {self._chunks_done}")
+    
+    def _reset_transformers(self) -> None:
+        """Reset every stateful transformer."""
+        for transformer in self._transformers:
+            if transformer.stateful:
+                transformer.reset()
+    
+    def _pending_batches(self, **kwargs) -> Iterator[Tuple[int, Any]]:
+        """Yield (index, batch) for every batch some loader still needs.
+        
+        Batches every loader already holds are read but not yielded; they
+        are only transformed if a stateful transformer has to see them.
+        """
+        done = min(self._chunks_done, default=0)
+        stateful = any(transformer.stateful for transformer in self._transformers)
+        if done and stateful:
+            # Rebuild the state from the replayed batches alone
+            self._reset_transformers()
+        for index, batch in enumerate(self._iter_batches(**kwargs)):
+            if index >= done:
+                yield index, batch
+            elif stateful:
+                self._run_transform(batch)
+    
+    def _load_chunk(self, index: int, batch: Any) -> None:
+        """Hand a batch to every loader that does not hold it yet and checkpoint progress."""
+        pending = [
+            (loader_index, loader) for loader_index, loader in enumerate(self._loaders)
+            if index >= self._chunks_done[loader_index]
+        ]
+        
+        def load(loader_index: int, loader: BaseLoader) -> None:
+            self._load_measured(loader_index, loader, batch, batch=index)
+        
+        def finish(loader_index: int, loader: BaseLoader) -> None:
+            position = loader.stream_position() if self._checkpoint is not None else None
+            if position is not None:
+                self._checkpoint.mark(f"chunks:{loader_index}", {'count': index + 1, 'position': position})
+        
+        self._fan_out(pending, load, finish)
+    
+    def _run_streaming(self, **kwargs) -> int:
+        """Transform and load extracted batches one at a time.
+        
+        Loaders stay connected for the whole stream and receive every batch
+        through load_batch(). Transformations are applied per batch, so
+        operations such as drop_duplicates only see rows of the same batch.
+        
+        Returns:
+            Total number of rows loaded by this run
+        """
+        total_rows = 0
+        with ExitStack() as stack:
+            for loader in self._loaders:
+                stack.enter_context(loader)
+            self._resume_stream()
+            
+            for index, batch in self._pending_batches(**kwargs):
+                batch = self._run_transform(batch)
+                self._load_chunk(index, batch)
+                total_rows += len(batch)
+                self.logger.debug(f"Processed batch {index}: {len(batch)} rows")
+        
+        for index, loader in enumerate(self._loaders):
+            self._record_bytes_written(index, loader)
+        self.logger.info(f"Streamed {total_rows} rows")
+        return total_rows
+    
+    def _run_pipelined(self, **kwargs) -> int:
+        """Overlap extraction, transformation and loading of batches.
+        
+        Each stage runs on its own thread; bounded queues between them apply
+        backpressure so at most ``pipeline.queue_size`` batches wait between
+        two stages. Loading of batch N overlaps with parsing of batch N+1.
+        
+        Returns:
+            Total number of rows loaded by this run
+        """
+        queue_size = self._section('pipeline').get('queue_size', 2)
+        loaded = {'rows': 0}
+        
+        def transform(item: Tuple[int, Any]) -> Tuple[int, Any]:
+            index, batch = item
+            return index, self._run_transform(batch)
+        
+        def load(item: Tuple[int, Any]) -> None:
+            index, batch = item
+            self._load_chunk(index, batch)
+            loaded['rows'] += len(batch)
+        
+        with ExitStack() as stack:
+            for loader in self._loaders:
+                stack.enter_context(loader)
+            self._resume_stream()
+            
+            executor = PipelinedExecutor(queue_size=queue_size)
+            self.stage_stats = executor.run(
+                self._pending_batches(**kwargs),
+                [('transform', transform), ('load', load)],
+            )
+        
+        for index, loader in enumerate(self._loaders):
+            self._record_bytes_written(index, loader)
+        for stats in self.stage_stats.values():
+            self.logger.info(
+                f"Stage {stats.name}: {stats.items} batches, busy {stats.busy_seconds:.3f}s, "
+                f"starved {stats.starved_seconds:.3f}s, blocked {stats.blocked_seconds:.3f}s"
+            )
+        self.logger.info(f"Streamed {loaded['rows']} rows")
+        return loaded['rows']
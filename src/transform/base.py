@@ -1,18 +1,49 @@
 """Base transformer class for ETL pipeline."""
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Optional
+from dataclasses import dataclass, field
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import logging
 import pandas as pd
 
+from .expressions import Expr, ExpressionBlock, as_expr
+from .parallel import run_partitioned
+
 logger = logging.getLogger(__name__)
 
+# Steps that may be pre-applied per partition but need a final pass on the
+# combined frame to be exact
+_PARTIAL_STEPS = ('drop_duplicates',)
+
+
+# Called as observer(label, func, data) in place of func(data)
+StepObserver = Callable[[str, Callable, Any], Any]
+
+
+def _filter_mask(condition: Callable[[pd.DataFrame], pd.Series], data: pd.DataFrame) -> pd.DataFrame:
+    """Keep the rows of ``data`` selected by a mask function."""
+    return data[condition(data)]
+
 
 class BaseTransformer(ABC):
-    """Abstract base class for all transformers."""
+    """Abstract base class for all transformers.
+    
+    When ``step_observer`` is set, every transformation step is run through
+    it, which lets ETLPipeline time steps individually.
+    
+    Transformers whose output depends on earlier calls set ``stateful``
+    and implement reset(). ETLPipeline resets them at the start of every
+    run, and when a streaming run is resumed they still see the batches
+    that were already loaded so that their state is rebuilt.
+    """
+    
+    stateful: bool = False
     
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
         self._transformations: List[Callable] = []
+        self.step_observer: Optional[StepObserver] = None
     
     @abstractmethod
     def transform(self, data: Any) -> Any:
@@ -34,14 +65,125 @@ class BaseTransformer(ABC):
     def apply_transformations(self, data: Any) -> Any:
         """Apply all registered transformations sequentially."""
         result = data
-        for transform in self._transformations:
-            result = transform(result)
+        for index, transform in enumerate(self._transformations):
+            result = self._apply_step(f"{index}:{transform.__name__}", transform, result)
             self.logger.debug(f"Applied transformation: {transform.__name__}")
         return result
+    
+    def reset(self) -> None:
+        """Forget state kept from earlier calls. The default does nothing."""
+        pass
+    
+    def checkpoint_signature(self) -> List[Any]:
+        """Describe the transformations so that stale checkpoints can be detected.
+        
+        Only names are covered, not the code of the functions.
+        """
+        return [getattr(func, '__qualname__', repr(func)) for func in self._transformations]
+    
+    def _apply_step(self, label: str, func: Callable, data: Any) -> Any:
+        """Run one transformation, through ``step_observer`` when set."""
+        if self.step_observer is None:
+            return func(data)
+        return self.step_observer(label, func, data)
+
+
+@dataclass
+class PlanStep:
+    """A transformation recorded by DataFrameTransformer with its metadata.
+    
+    ``columns`` lists the input columns the step reads (None means it may
+    read any column). ``row_local`` steps decide each output row from the
+    matching input row alone, so they give the same result when applied to
+    chunks of a frame one at a time.
+    """
+    op: str
+    func: Callable[[pd.DataFrame], pd.DataFrame]
+    columns: Optional[List[str]] = None
+    row_local: bool = False
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def fuse_steps(steps: List['PlanStep']) -> List[Tuple[List['PlanStep'], Callable[[pd.DataFrame], pd.DataFrame]]]:
+    """Group steps for execution, merging runs of consecutive expression steps.
+    
+    Returns ``(steps, func)`` pairs; ``func`` of a merged run is one
+    ExpressionBlock evaluating all of its filters and derived columns.
+    """
+    groups: List[Tuple[List[PlanStep], Callable]] = []
+    for step in steps:
+        if groups and isinstance(step.func, ExpressionBlock) and isinstance(groups[-1][1], ExpressionBlock):
+            previous, block = groups[-1]
+            groups[-1] = (previous + [step], block.then(step.func))
+        else:
+            groups.append(([step], step.func))
+    return groups
+
+
+@dataclass
+class QueryPlan:
+    """Optimized execution plan for a DataFrameTransformer chain.
+    
+    ``usecols`` are the source columns the chain needs (None for all),
+    ``chunk_steps`` is the leading run of row-local steps that can be applied
+    to each chunk while reading, and ``final_steps`` run on the assembled
+    frame.
+    """
+    usecols: Optional[List[str]] = None
+    chunk_steps: List[PlanStep] = field(default_factory=list)
+    final_steps: List[PlanStep] = field(default_factory=list)
+    
+    def apply_chunk(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Apply the row-local prefix of the chain to one chunk."""
+        for _, func in fuse_steps(self.chunk_steps):
+            data = func(data)
+        return data
+    
+    def finish(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Apply the steps that need the assembled frame."""
+        for _, func in fuse_steps(self.final_steps):
+            data = func(data)
+        return data
 
 
 class DataFrameTransformer(BaseTransformer):
-    """Transformer for pandas DataFrames."""
+    """Transformer for pandas DataFrames.
+    
+    With ``lazy=True`` the chain is treated as a logical plan: transform()
+    projects to the needed columns first, and ETLPipeline pushes the column
+    selection and leading row-local steps into extractors that support it
+    (see ``BaseExtractor.supports_pushdown``).
+    
+    With ``n_workers > 1`` row-local steps run on ``n_partitions`` row
+    partitions across a process pool (see ``transform.parallel``). Steps
+    that are not partition-safe run on the combined frame; drop_duplicates
+    is applied per partition first and then once more on the combined frame.
+    Built-in steps can be pickled, so they also reach workers started
+    without ``fork``; steps wrapping functions that cannot be pickled (such
+    as lambdas) then run in a single process.
+    
+    filter_rows() and with_column() accept expressions (see
+    ``transform.expressions``), which are evaluated on whole columns and
+    declare the columns they read. Consecutive expression steps are fused
+    into one pass that copies the frame once.
+    """
+    
+    def __init__(self, lazy: bool = False, n_workers: int = 1, n_partitions: Optional[int] = None):
+        super().__init__()
+        self.lazy = lazy
+        self.n_workers = n_workers
+        self.n_partitions = n_partitions
+        self._steps: List[PlanStep] = []
+    
+    def add_transformation(self, func: Callable) -> 'DataFrameTransformer':
+        """Add an opaque transformation function to the pipeline."""
+        return self._add_step(PlanStep(getattr(func, '__name__', 'custom'), func))
+    
+    def _add_step(self, step: PlanStep) -> 'DataFrameTransformer':
+        """Register a transformation together with its plan metadata."""
+        super().add_transformation(step.func)
+        self._steps.append(step)
+        return self
     
     def transform(self, data: pd.DataFrame) -> pd.DataFrame:
         """Apply all transformations to DataFrame.
@@ -55,41 +197,194 @@ class DataFrameTransformer(BaseTransformer):
         if not isinstance(data, pd.DataFrame):
             raise TypeError(f"Expected DataFrame, got {type(data)}")
         
-        result = self.apply_transformations(data)
+        if self.lazy:
+            plan = self.optimize()
+            if plan.usecols is not None and set(plan.usecols) <= set(data.columns):
+                data = data[[column for column in data.columns if column in plan.usecols]]
+            if self.n_workers > 1:
+                result = self.apply_partitioned(data, plan.chunk_steps + plan.final_steps)
+            else:
+                result = self.apply_steps(plan.chunk_steps + plan.final_steps, data)
+        elif self.n_workers > 1:
+            result = self.apply_partitioned(data, self._steps)
+        else:
+            result = self.apply_steps(self._steps, data)
         self.logger.info(f"Transformed DataFrame: {len(result)} rows")
         return result
     
+    def checkpoint_signature(self) -> List[Any]:
+        """Describe each step by its operation, input columns and parameters."""
+        return [[step.op, step.columns, step.params] for step in self._steps]
+    
+    def apply_steps(self, steps: List[PlanStep], data: pd.DataFrame) -> pd.DataFrame:
+        """Apply ``steps`` one after another in this process."""
+        for group, func in fuse_steps(steps):
+            data = self._apply_step('+'.join(self._label(step) for step in group), func, data)
+            self.logger.debug(f"Applied transformation: {'+'.join(step.op for step in group)}")
+        return data
+    
+    def apply_partitioned(self, data: pd.DataFrame, steps: List[PlanStep]) -> pd.DataFrame:
+        """Apply ``steps`` with consecutive partition-safe steps run in parallel."""
+        pending: List[PlanStep] = []
+        for step in steps:
+            if step.row_local:
+                pending.append(step)
+                continue
+            
+            if step.op in _PARTIAL_STEPS:
+                pending.append(step)
+                self.logger.debug(f"Step '{step.op}' runs per partition plus a final pass")
+            else:
+                self.logger.info(f"Step '{step.op}' is not partition-safe; running it on the combined frame")
+            data = self._run_partitioned(pending, data)
+            pending = []
+            data = self._apply_step(self._label(step), step.func, data)
+        
+        if pending:
+            data = self._run_partitioned(pending, data)
+        return data
+    
+    def _run_partitioned(self, steps: List[PlanStep], data: pd.DataFrame) -> pd.DataFrame:
+        """Run a group of steps on the process pool as one observed step."""
+        if not steps:
+            return data
+        funcs = [func for _, func in fuse_steps(steps)]
+        label = '+'.join(self._label(step) for step in steps)
+        return self._apply_step(
+            label,
+            lambda df: run_partitioned(df, funcs, self.n_workers, self.n_partitions),
+            data
+        )
+    
+    def _label(self, step: PlanStep) -> str:
+        """Identify a step by its position in the chain and its operation."""
+        index = next(i for i, candidate in enumerate(self._steps) if candidate is step)
+        return f"{index}:{step.op}"
+    
+    def optimize(self) -> QueryPlan:
+        """Build a QueryPlan with projection and predicate pushdown.
+        
+        Projection: if the chain selects columns, every step before that
+        selection declares the columns it reads, and renames are tracked
+        back to source names, only those source columns need to be read.
+        
+        Predicates: the leading run of row-local steps (selection, renames,
+        filters with declared columns, NA removal) is moved to per-chunk
+        execution; everything from the first other step on runs afterwards.
+        """
+        plan = QueryPlan()
+        
+        # Current column name -> name in the source, for renamed columns;
+        # None for columns derived by with_column()
+        source_names: Dict[str, Optional[str]] = {}
+        needed = set()
+        for step in self._steps:
+            if step.op == 'rename_columns':
+                mapping = step.params['columns']
+                renamed = {new: source_names.get(old, old) for old, new in mapping.items()}
+                for old in mapping:
+                    source_names.pop(old, None)
+                source_names.update(renamed)
+                continue
+            if step.columns is None:
+                break
+            sources = (source_names.get(column, column) for column in step.columns)
+            needed.update(source for source in sources if source is not None)
+            if step.op == 'with_column':
+                source_names[step.params['name']] = None
+            if step.op == 'select_columns':
+                plan.usecols = sorted(needed)
+                break
+        
+        split = 0
+        while split < len(self._steps) and self._steps[split].row_local:
+            split += 1
+        plan.chunk_steps = self._steps[:split]
+        plan.final_steps = self._steps[split:]
+        return plan
+    
     def drop_duplicates(self, subset: Optional[List[str]] = None) -> 'DataFrameTransformer':
         """Add duplicate removal transformation."""
-        self.add_transformation(
-            lambda df: df.drop_duplicates(subset=subset)
-        )
-        return self
+        return self._add_step(PlanStep(
+            'drop_duplicates',
+            partial(pd.DataFrame.drop_duplicates, subset=subset),
+            columns=subset,
+        ))
     
     def drop_na(self, subset: Optional[List[str]] = None) -> 'DataFrameTransformer':
         """Add NA removal transformation."""
-        self.add_transformation(
-            lambda df: df.dropna(subset=subset)
-        )
-        return self
+        return self._add_step(PlanStep(
+            'drop_na',
+            partial(pd.DataFrame.dropna, subset=subset),
+            columns=subset,
+            row_local=True,
+        ))
     
     def rename_columns(self, columns: dict) -> 'DataFrameTransformer':
         """Add column renaming transformation."""
-        self.add_transformation(
-            lambda df: df.rename(columns=columns)
-        )
-        return self
+        return self._add_step(PlanStep(
+            'rename_columns',
+            partial(pd.DataFrame.rename, columns=columns),
+            columns=[],
+            row_local=True,
+            params={'columns': dict(columns)},
+        ))
     
     def select_columns(self, columns: List[str]) -> 'DataFrameTransformer':
         """Add column selection transformation."""
-        self.add_transformation(
-            lambda df: df[columns]
-        )
-        return self
+        return self._add_step(PlanStep(
+            'select_columns',
+            itemgetter(columns),
+            columns=list(columns),
+            row_local=True,
+        ))
     
-    def filter_rows(self, condition: Callable[[pd.DataFrame], pd.Series]) -> 'DataFrameTransformer':
-        """Add row filtering transformation."""
-        self.add_transformation(
-            lambda df: df[condition(df)]
-        )
-        return self
+    def filter_rows(
+        self,
+        condition: Union[Callable[[pd.DataFrame], pd.Series], str, Expr],
+        columns: Optional[List[str]] = None
+    ) -> 'DataFrameTransformer':
+        """Add row filtering transformation.
+        
+        Args:
+            condition: Expression string or Expr selecting the rows to keep
+                (see ``transform.expressions``), or a function returning a
+                boolean mask for a DataFrame
+            columns: Columns a function condition reads. Declaring them
+                marks the filter as row-wise, which lets a lazy plan push it
+                into chunked reads; only declare columns for conditions that
+                do not use frame-wide statistics such as means or ranks.
+                Expressions always declare their columns.
+        """
+        if isinstance(condition, (str, Expr)):
+            expr = as_expr(condition)
+            return self._add_step(PlanStep(
+                'filter_rows',
+                ExpressionBlock([(None, expr)]),
+                columns=sorted(expr.columns()),
+                row_local=True,
+                params={'expression': str(expr)},
+            ))
+        return self._add_step(PlanStep(
+            'filter_rows',
+            partial(_filter_mask, condition),
+            columns=list(columns) if columns is not None else None,
+            row_local=columns is not None,
+        ))
+    
+    def with_column(self, name: str, expression: Union[str, Expr]) -> 'DataFrameTransformer':
+        """Add a transformation setting column ``name`` to an expression.
+        
+        Args:
+            name: Column to add, or to replace if it exists
+            expression: Expression string or Expr (see
+                ``transform.expressions``), e.g. ``"price * quantity"``
+        """
+        expr = as_expr(expression)
+        return self._add_step(PlanStep(
+            'with_column',
+            ExpressionBlock([(name, expr)]),
+            columns=sorted(expr.columns()),
+            row_local=True,
+            params={'name': name, 'expression': str(expr)},
+        ))
@@ -0,0 +1,238 @@
+"""Bounded-memory deduplication across a stream of DataFrame chunks."""
+import logging
+import os
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .base import BaseTransformer
+
+logger = logging.getLogger(__name__)
+
+# Fingerprint of missing values, whatever their dtype
+_NA_HASH = np.uint64(0x9E3779B97F4A7C15)
+_COMBINE_PRIME = np.uint64(0x100000001B3)
+
+
+def row_fingerprints(data: pd.DataFrame, subset: Optional[List[str]] = None) -> np.ndarray:
+    """Return a uint64 fingerprint per row of ``data[subset]``.
+    
+    Fingerprints depend on values, not on dtypes, so chunks whose columns
+    were inferred differently still match: integers of any width, bools,
+    whole-number floats and nullable integers hash alike, as do strings
+    stored as object, Arrow strings or categoricals, and every kind of NA.
+    """
+    columns = subset if subset is not None else list(data.columns)
+    result = np.zeros(len(data), dtype=np.uint64)
+    for column in columns:
+        result = (result * _COMBINE_PRIME) ^ _column_hash(data[column])
+    return result
+
+
+def _column_hash(series: pd.Series) -> np.ndarray:
+    """Hash one column, normalizing numeric types and missing values."""
+    dtype = series.dtype
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        values = (series.fillna(0) if missing.any() else series).to_numpy()
+        if values.dtype == np.uint64:
+            values = values.view(np.int64)
+        hashes = pd.util.hash_array(values.astype(np.int64))
+    elif pd.api.types.is_float_dtype(dtype):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        hashes = pd.util.hash_array(values)
+        with np.errstate(invalid='ignore'):
+            integral = ~missing & (np.mod(values, 1) == 0) & (np.abs(values) < 2.0 ** 63)
+        if integral.any():
+            hashes[integral] = pd.util.hash_array(values[integral].astype(np.int64))
+    else:
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(copy=True)
+    hashes[missing] = _NA_HASH
+    return hashes
+
+
+class FingerprintSet:
+    """Set of uint64 fingerprints stored as sorted NumPy arrays.
+    
+    Keys are split into ``2 ** partition_bits`` partitions by their top
+    bits. Each partition keeps a few sorted runs of geometrically growing
+    size (as in a log-structured merge tree), so adding n keys costs
+    O(n log n) overall and a lookup is a binary search per run, at 8 bytes
+    per key.
+    
+    When ``memory_budget`` bytes are exceeded, the partition holding the
+    most memory is merged into a single sorted run in ``spill_dir`` that is
+    memory-mapped for later lookups. Lookups for a batch of keys visit
+    each partition's runs in key order, so spilled runs are read mostly
+    sequentially.
+    """
+    
+    def __init__(
+        self,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[Union[str, Path]] = None,
+        partition_bits: int = 6
+    ):
+        self.memory_budget = memory_budget
+        self.partition_bits = partition_bits
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[Path] = None
+        self._runs: List[List[np.ndarray]] = [[] for _ in range(2 ** partition_bits)]
+        self._spilled: Dict[int, np.ndarray] = {}
+        self._memory_bytes = 0
+        self._size = 0
+        self.spills = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of keys held in memory (spilled runs excluded)."""
+        return self._memory_bytes
+    
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Return a boolean mask of which ``keys`` (sorted, unique) are in the set."""
+        found = np.zeros(len(keys), dtype=bool)
+        for partition, start, stop in self._partition_slices(keys):
+            part = keys[start:stop]
+            runs = self._runs[partition]
+            if partition in self._spilled:
+                runs = [self._spilled[partition]] + runs
+            for run in runs:
+                index = np.searchsorted(run, part)
+                index[index == len(run)] = 0
+                found[start:stop] |= run[index] == part
+        return found
+    
+    def add(self, keys: np.ndarray) -> None:
+        """Add sorted keys that are not in the set yet."""
+        for partition, start, stop in self._partition_slices(keys):
+            runs = self._runs[partition]
+            runs.append(keys[start:stop].copy())
+            # Merge runs of similar size so each partition keeps O(log n) runs
+            while len(runs) > 1 and len(runs[-2]) <= 2 * len(runs[-1]):
+                last = runs.pop()
+                runs[-1] = np.sort(np.concatenate([runs[-1], last]), kind='stable')
+        self._memory_bytes += keys.nbytes
+        self._size += len(keys)
+        while self.memory_budget is not None and self._memory_bytes > self.memory_budget:
+            self._spill_largest()
+    
+    def close(self) -> None:
+        """Drop all keys and delete spilled runs."""
+        self._runs = [[] for _ in range(2 ** self.partition_bits)]
+        self._spilled.clear()
+        self._memory_bytes = 0
+        self._size = 0
+        if self._spill_dir is not None:
+            self._cleanup()
+            self._spill_dir = None
+    
+    def _partition_slices(self, keys: np.ndarray):
+        """Yield (partition, start, stop) for the slices of sorted ``keys``."""
+        shift = np.uint64(64 - self.partition_bits)
+        bounds = np.searchsorted(
+            keys >> shift,
+            np.arange(2 ** self.partition_bits + 1, dtype=np.uint64)
+        )
+        for partition in np.flatnonzero(bounds[1:] > bounds[:-1]):
+            yield int(partition), int(bounds[partition]), int(bounds[partition + 1])
+    
+    def _spill_largest(self) -> None:
+        """Merge the partition holding the most memory into its on-disk run."""
+        sizes = [sum(run.nbytes for run in runs) for runs in self._runs]
+        partition = int(np.argmax(sizes))
+        if sizes[partition] == 0:
+            return
+        
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix='dedup-', dir=self._spill_root))
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        parts = self._runs[partition]
+        if partition in self._spilled:
+            parts = [np.asarray(self._spilled.pop(partition))] + parts
+        merged = np.sort(np.concatenate(parts), kind='stable')
+        
+        path = self._spill_dir / f"partition-{partition}.npy"
+        tmp_path = path.with_suffix('.tmp.npy')
+        np.save(tmp_path, merged)
+        os.replace(tmp_path, path)
+        self._spilled[partition] = np.load(path, mmap_mode='r')
+        self._runs[partition] = []
+        self._memory_bytes -= sizes[partition]
+        self.spills += 1
+        logger.debug(f"Spilled partition {partition} ({len(merged)} keys) to {path}")
+
+
+class StreamingDeduplicator(BaseTransformer):
+    """Drop rows already seen in this or any earlier chunk of a stream.
+    
+    Unlike ``DataFrameTransformer.drop_duplicates``, which needs the whole
+    frame, this transformer is stateful: every call to transform() returns
+    the rows of the chunk whose ``subset`` key has not been seen before,
+    keeping the first occurrence. Only a 64-bit fingerprint per distinct
+    key is retained (see FingerprintSet), so 500M distinct keys take 4 GB,
+    or less with ``memory_budget`` set and the rest spilled to
+    ``spill_dir`` (the system temp directory by default).
+    
+    Fingerprints are hashes: two different keys collide with probability
+    about n² / 2⁶⁵ for n distinct keys (under 1% at 500M), in which case
+    the later row is dropped.
+    """
+    
+    stateful = True
+    
+    def __init__(
+        self,
+        subset: Optional[List[str]] = None,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[Union[str, Path]] = None,
+        partition_bits: int = 6
+    ):
+        super().__init__()
+        self.subset = subset
+        self.keys = FingerprintSet(memory_budget, spill_dir, partition_bits)
+        self.rows_in = 0
+        self.rows_out = 0
+    
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Return the rows of ``data`` with keys not seen before.
+        
+        Args:
+            data: Next chunk of the stream
+        
+        Returns:
+            The chunk without duplicates, in its original row order
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError(f"Expected DataFrame, got {type(data)}")
+        
+        fingerprints = row_fingerprints(data, self.subset)
+        keys, first = np.unique(fingerprints, return_index=True)
+        new = ~self.keys.contains(keys)
+        self.keys.add(keys[new])
+        result = data.iloc[np.sort(first[new])]
+        
+        self.rows_in += len(data)
+        self.rows_out += len(result)
+        self.logger.debug(
+            f"Kept {len(result)} of {len(data)} rows; {len(self.keys)} distinct keys, "
+            f"{self.keys.memory_bytes / 1024 ** 2:.1f} MiB in memory"
+        )
+        return result
+    
+    def checkpoint_signature(self) -> List[Any]:
+        """Describe the deduplication key."""
+        return ['dedup', self.subset]
+    
+    def reset(self) -> None:
+        """Forget all keys seen so far and remove spilled files."""
+        self.keys.close()
+        self.rows_in = 0
+        self.rows_out = 0
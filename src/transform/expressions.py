@@ -0,0 +1,537 @@
+"""Vectorized column expressions for filters and derived columns.
+
+Expressions are written as strings in a small subset of Python syntax::
+
+    "amount * (1 - discount) > 100 and country in ('DE', 'FR')"
+
+or built from col() and lit() with operators::
+
+    (col('amount') * (1 - col('discount')) > 100) & col('country').isin(['DE', 'FR'])
+
+Names refer to columns; ``col('unit price')`` reaches names that are not
+identifiers. Supported are arithmetic (``+ - * / // % **``), comparisons
+(also chained), ``and`` / ``or`` / ``not`` (or ``& | ~``, which are
+logical too: numbers are true when non-zero), ``in`` and ``not in`` with
+a list or tuple of literals, and the functions in FUNCTIONS. Each
+operator is applied to whole columns at once; when numexpr is installed,
+purely numeric expressions on large frames are evaluated by it in a
+single multi-threaded pass without temporaries.
+"""
+import ast
+import keyword
+import operator
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Frames smaller than this are evaluated with NumPy, as numexpr's setup costs more
+NUMEXPR_MIN_ROWS = 10_000
+
+
+def _where(condition: Any, then: Any, otherwise: Any) -> Any:
+    if not isinstance(condition, pd.Series):
+        return then if condition else otherwise
+    return pd.Series(np.where(_as_mask(condition), then, otherwise), index=condition.index)
+
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'exp': np.exp,
+    'log': np.log,
+    'log10': np.log10,
+    'floor': np.floor,
+    'ceil': np.ceil,
+    'round': lambda value, decimals=0: value.round(decimals),
+    'isna': pd.isna,
+    'notna': pd.notna,
+    'where': _where,
+    'lower': lambda value: value.str.lower(),
+    'upper': lambda value: value.str.upper(),
+    'strip': lambda value: value.str.strip(),
+    'startswith': lambda value, prefix: value.str.startswith(prefix),
+    'endswith': lambda value, suffix: value.str.endswith(suffix),
+    'contains': lambda value, text: value.str.contains(text, regex=False),
+}
+
+_BINARY: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+    '//': operator.floordiv, '%': operator.mod, '**': operator.pow,
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge, '&': operator.and_, '|': operator.or_,
+}
+
+_AST_OPERATORS = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.FloorDiv: '//',
+    ast.Mod: '%', ast.Pow: '**', ast.BitAnd: '&', ast.BitOr: '|',
+    ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=',
+    ast.And: '&', ast.Or: '|',
+}
+
+_COMPARISONS = frozenset({'==', '!=', '<', '<=', '>', '>='})
+
+# What numexpr can evaluate, on columns of these dtype kinds (bool, int, uint, float)
+_NUMEXPR_BINARY = frozenset({'+', '-', '*', '/', '%', '**', '&', '|'}) | _COMPARISONS
+_NUMEXPR_FUNCTIONS = frozenset({'abs', 'sqrt', 'exp', 'log', 'log10', 'where'})
+_NUMEXPR_KINDS = frozenset('biuf')
+
+# Column name -> its values, derived earlier in the same block or read from the frame
+Lookup = Callable[[str], Any]
+
+# An expression rendered for numexpr and the kind of its result: 'b' (bool), 'i' (int) or 'f' (float)
+Rendered = Tuple[str, str]
+
+
+def _operator(op: str, reflected: bool = False) -> Callable[[Any, Any], Any]:
+    """Build an Expr operator method producing a BinaryOp."""
+    def method(self: 'Expr', other: Any) -> 'Expr':
+        return self._binary(op, other, reflected)
+    return method
+
+
+class Expr(ABC):
+    """Node of an expression tree; combine nodes with Python operators."""
+    
+    @abstractmethod
+    def columns(self) -> Set[str]:
+        """Names of the columns the expression reads."""
+        pass
+    
+    @abstractmethod
+    def evaluate(self, lookup: Lookup) -> Any:
+        """Compute the expression with NumPy / pandas operations on whole columns."""
+        pass
+    
+    def numexpr(self, aliases: Dict[str, str], kinds: Dict[str, str]) -> Optional[Rendered]:
+        """Render the expression for numexpr, or None if it uses anything numexpr lacks.
+        
+        ``kinds`` holds the dtype kind of every column read, and ``aliases``
+        collects a variable name for every column used. Operations numexpr
+        has no kernel for, such as arithmetic on booleans or ``&`` on
+        integers, are not rendered.
+        """
+        return None
+    
+    def isin(self, values: Iterable[Any]) -> 'Expr':
+        return IsIn(self, tuple(values))
+    
+    def _binary(self, op: str, other: Any, reflected: bool = False) -> 'Expr':
+        other = _wrap(other)
+        return BinaryOp(op, other, self) if reflected else BinaryOp(op, self, other)
+    
+    __add__, __radd__ = _operator('+'), _operator('+', reflected=True)
+    __sub__, __rsub__ = _operator('-'), _operator('-', reflected=True)
+    __mul__, __rmul__ = _operator('*'), _operator('*', reflected=True)
+    __truediv__, __rtruediv__ = _operator('/'), _operator('/', reflected=True)
+    __floordiv__, __rfloordiv__ = _operator('//'), _operator('//', reflected=True)
+    __mod__, __rmod__ = _operator('%'), _operator('%', reflected=True)
+    __pow__, __rpow__ = _operator('**'), _operator('**', reflected=True)
+    __and__, __rand__ = _operator('&'), _operator('&', reflected=True)
+    __or__, __ror__ = _operator('|'), _operator('|', reflected=True)
+    __eq__, __ne__ = _operator('=='), _operator('!=')  # type: ignore[assignment]
+    __lt__, __le__ = _operator('<'), _operator('<=')
+    __gt__, __ge__ = _operator('>'), _operator('>=')
+    
+    def __neg__(self) -> 'Expr':
+        return UnaryOp('-', self)
+    
+    def __invert__(self) -> 'Expr':
+        return UnaryOp('~', self)
+    
+    __hash__ = object.__hash__
+    
+    def __bool__(self):
+        raise TypeError("Expressions have no truth value; use & | ~ instead of and / or / not")
+
+
+@dataclass(eq=False)
+class Column(Expr):
+    name: str
+    
+    def columns(self) -> Set[str]:
+        return {self.name}
+    
+    def evaluate(self, lookup: Lookup) -> Any:
+        return lookup(self.name)
+    
+    def numexpr(self, aliases: Dict[str, str], kinds: Dict[str, str]) -> Optional[Rendered]:
+        return aliases.setdefault(self.name, f"_c{len(aliases)}"), kinds[self.name]
+    
+    def __str__(self) -> str:
+        if self.name.isidentifier() and not keyword.iskeyword(self.name) and self.name not in FUNCTIONS:
+            return self.name
+        return f"col({self.name!r})"
+
+
+@dataclass(eq=False)
+class Literal(Expr):
+    value: Any
+    
+    def columns(self) -> Set[str]:
+        return set()
+    
+    def evaluate(self, lookup: Lookup) -> Any:
+        return self.value
+    
+    def numexpr(self, aliases: Dict[str, str], kinds: Dict[str, str]) -> Optional[Rendered]:
+        for kind, types in (('b', bool), ('i', int), ('f', float)):
+            if isinstance(self.value, types):
+                return repr(self.value), kind
+        return None
+    
+    def __str__(self) -> str:
+        return repr(self.value)
+
+
+@dataclass(eq=False)
+class BinaryOp(Expr):
+    op: str
+    left: Expr
+    right: Expr
+    
+    def columns(self) -> Set[str]:
+        return self.left.columns() | self.right.columns()
+    
+    def evaluate(self, lookup: Lookup) -> Any:
+        left, right = self.left.evaluate(lookup), self.right.evaluate(lookup)
+        if self.op in ('&', '|'):
+            left, right = _truth(left, self.left), _truth(right, self.right)
+        return _BINARY[self.op](left, right)
+    
+    def numexpr(self, aliases: Dict[str, str], kinds: Dict[str, str]) -> Optional[Rendered]:
+        left, right = self.left.numexpr(aliases, kinds), self.right.numexpr(aliases, kinds)
+        if self.op not in _NUMEXPR_BINARY or left is None or right is None:
+            return None
+        (left_text, left_kind), (right_text, right_kind) = left, right
+        if self.op in ('&', '|'):
+            kind = 'b' if left_kind == right_kind == 'b' else None
+        elif 'b' in (left_kind, right_kind):
+            kind = 'b' if self.op in ('==', '!=') and left_kind == right_kind else None
+        elif self.op in _COMPARISONS:
+            kind = 'b'
+        else:
+            kind = 'f' if 'f' in (left_kind, right_kind) or self.op == '/' else 'i'
+        return None if kind is None else (f"({left_text} {self.op} {right_text})", kind)
+    
+    def __str__(self) -> str:
+        return f"({self.left} {self.op} {self.right})"
+
+
+@dataclass(eq=False)
+class UnaryOp(Expr):
+    op: str
+    operand: Expr
+    
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+    
+    def evaluate(self, lookup: Lookup) -> Any:
+        value = self.operand.evaluate(lookup)
+        if self.op == '-':
+            return -value
+        value = _truth(value, self.operand)
+        return ~value if isinstance(value, pd.Series) else value if pd.isna(value) else not value
+    
+    def numexpr(self, aliases: Dict[str, str], kinds: Dict[str, str]) -> Optional[Rendered]:
+        operand = self.operand.numexpr(aliases, kinds)
+        if operand is None or (self.op == '~') != (operand[1] == 'b'):
+            # Negation needs numbers, logical not booleans
+            return None
+        return f"({self.op}{operand[0]})", operand[1]
+    
+    def __str__(self) -> str:
+        return f"({self.op}{self.operand})"
+
+
+@dataclass(eq=False)
+class IsIn(Expr):
+    operand: Expr
+    values: Tuple[Any, ...]
+    
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+    
+    def evaluate(self, lookup: Lookup) -> Any:
+        value = self.operand.evaluate(lookup)
+        if isinstance(value, pd.Series):
+            return value.isin(self.values)
+        return value in self.values
+    
+    def __str__(self) -> str:
+        return f"({self.operand} in {list(self.values)!r})"
+
+
+@dataclass(eq=False)
+class Call(Expr):
+    function: str
+    args: Tuple[Expr, ...]
+    
+    def columns(self) -> Set[str]:
+        return set().union(*(arg.columns() for arg in self.args))
+    
+    def evaluate(self, lookup: Lookup) -> Any:
+        return FUNCTIONS[self.function](*(arg.evaluate(lookup) for arg in self.args))
+    
+    def numexpr(self, aliases: Dict[str, str], kinds: Dict[str, str]) -> Optional[Rendered]:
+        args = [arg.numexpr(aliases, kinds) for arg in self.args]
+        if self.function not in _NUMEXPR_FUNCTIONS or None in args:
+            return None
+        arg_kinds = [kind for _, kind in args]
+        if self.function == 'where':
+            if len(args) != 3 or arg_kinds[0] != 'b' or 'b' in arg_kinds[1:]:
+                return None
+            kind = 'f' if 'f' in arg_kinds else 'i'
+        else:
+            if len(args) != 1 or arg_kinds[0] == 'b':
+                return None
+            kind = arg_kinds[0] if self.function == 'abs' else 'f'
+        return f"{self.function}({', '.join(text for text, _ in args)})", kind
+    
+    def __str__(self) -> str:
+        return f"{self.function}({', '.join(str(arg) for arg in self.args)})"
+
+
+def col(name: str) -> Column:
+    """Refer to a column."""
+    return Column(name)
+
+
+def lit(value: Any) -> Literal:
+    """Wrap a constant."""
+    return Literal(value)
+
+
+def _wrap(value: Any) -> Expr:
+    if isinstance(value, Expr):
+        return value
+    if isinstance(value, np.generic):
+        value = value.item()
+    return Literal(value)
+
+
+def parse(text: str) -> Expr:
+    """Parse an expression string.
+    
+    Raises:
+        ValueError: If the text is not valid Python or uses unsupported syntax
+    """
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {text!r}: {e.msg}") from None
+    return _convert(tree.body, text)
+
+
+def as_expr(expression: Union[str, Expr]) -> Expr:
+    """Return ``expression`` as an Expr, parsing strings."""
+    return parse(expression) if isinstance(expression, str) else expression
+
+
+def _convert(node: ast.AST, text: str) -> Expr:
+    """Translate a Python AST node into an Expr."""
+    if isinstance(node, ast.Name):
+        return Column(node.id)
+    if isinstance(node, ast.Constant):
+        return Literal(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in _AST_OPERATORS:
+        return BinaryOp(_AST_OPERATORS[type(node.op)], _convert(node.left, text), _convert(node.right, text))
+    if isinstance(node, ast.BoolOp):
+        values = [_convert(value, text) for value in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = BinaryOp(_AST_OPERATORS[type(node.op)], result, value)
+        return result
+    if isinstance(node, ast.UnaryOp):
+        operand = _convert(node.operand, text)
+        if isinstance(node.op, ast.USub):
+            if isinstance(operand, Literal) and isinstance(operand.value, (int, float)):
+                return Literal(-operand.value)
+            return UnaryOp('-', operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        return UnaryOp('~', operand)
+    if isinstance(node, ast.Compare):
+        return _convert_compare(node, text)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id == 'col' and len(node.args) == 1 and isinstance(node.args[0], ast.Constant):
+            return Column(str(node.args[0].value))
+        if node.func.id in FUNCTIONS:
+            return Call(node.func.id, tuple(_convert(arg, text) for arg in node.args))
+        raise ValueError(f"Unknown function {node.func.id!r} in expression {text!r}")
+    raise ValueError(f"Unsupported syntax {ast.unparse(node)!r} in expression {text!r}")
+
+
+def _convert_compare(node: ast.Compare, text: str) -> Expr:
+    """Translate a (chained) comparison into comparisons joined by ``&``."""
+    parts: List[Expr] = []
+    left = _convert(node.left, text)
+    for op, comparator in zip(node.ops, node.comparators):
+        if isinstance(op, (ast.In, ast.NotIn)):
+            if not isinstance(comparator, (ast.List, ast.Tuple, ast.Set)):
+                raise ValueError(f"'in' needs a list of values in expression {text!r}")
+            values = tuple(_convert(element, text) for element in comparator.elts)
+            if not all(isinstance(value, Literal) for value in values):
+                raise ValueError(f"'in' needs literal values in expression {text!r}")
+            part: Expr = IsIn(left, tuple(value.value for value in values))
+            parts.append(UnaryOp('~', part) if isinstance(op, ast.NotIn) else part)
+            left = None
+            continue
+        if type(op) not in _AST_OPERATORS or left is None:
+            raise ValueError(f"Unsupported comparison in expression {text!r}")
+        right = _convert(comparator, text)
+        parts.append(BinaryOp(_AST_OPERATORS[type(op)], left, right))
+        left = right
+    result = parts[0]
+    for part in parts[1:]:
+        result = BinaryOp('&', result, part)
+    return result
+
+
+def evaluate(expr: Expr, data: pd.DataFrame, lookup: Optional[Lookup] = None) -> Any:
+    """Evaluate ``expr`` on ``data``, returning a Series (or a scalar for constants).
+    
+    ``lookup`` resolves column names, by default to the columns of ``data``.
+    Uses numexpr when installed, for frames of at least NUMEXPR_MIN_ROWS
+    rows and expressions it supports on bool and numeric NumPy columns.
+    """
+    if lookup is None:
+        lookup = _frame_lookup(data)
+    if len(data) >= NUMEXPR_MIN_ROWS:
+        result = _evaluate_numexpr(expr, lookup)
+        if result is not None:
+            return pd.Series(result, index=data.index)
+    with np.errstate(all='ignore'):
+        return expr.evaluate(lookup)
+
+
+def _evaluate_numexpr(expr: Expr, lookup: Lookup) -> Optional[np.ndarray]:
+    """Evaluate with numexpr, or return None if it is missing or cannot."""
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    columns = {}
+    for name in expr.columns():
+        values = lookup(name)
+        if not isinstance(values, pd.Series) or values.dtype.kind not in _NUMEXPR_KINDS:
+            return None
+        if isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            return None
+        columns[name] = values
+    # numexpr upcasts unsigned integers to signed ones
+    kinds = {name: 'i' if values.dtype.kind == 'u' else values.dtype.kind for name, values in columns.items()}
+    aliases: Dict[str, str] = {}
+    rendered = expr.numexpr(aliases, kinds)
+    if rendered is None or not aliases:
+        return None
+    local_dict = {alias: columns[name].to_numpy() for name, alias in aliases.items()}
+    try:
+        return numexpr.evaluate(rendered[0], local_dict=local_dict)
+    except ValueError:
+        # e.g. more columns than numexpr takes in one expression
+        return None
+
+
+def _frame_lookup(data: pd.DataFrame) -> Lookup:
+    def lookup(name: str) -> Any:
+        if name not in data.columns:
+            raise KeyError(f"Unknown column in expression: {name!r}")
+        return data[name]
+    return lookup
+
+
+def _truth(value: Any, expr: Expr) -> Any:
+    """Coerce an operand of ``& | ~`` to booleans, as ``and`` / ``or`` / ``not`` would.
+    
+    Numbers are true when non-zero. Missing values stay missing, so rows
+    whose filter they decide are dropped.
+    
+    Raises:
+        TypeError: If ``expr`` yields values that are neither booleans nor numbers
+    """
+    if not isinstance(value, pd.Series):
+        return value if pd.isna(value) else bool(value)
+    if pd.api.types.is_bool_dtype(value.dtype):
+        return value
+    if not pd.api.types.is_numeric_dtype(value.dtype):
+        raise TypeError(f"Logical operators need booleans or numbers, but {expr} is {value.dtype}")
+    return (value != 0).astype('boolean').mask(value.isna())
+
+
+def _as_mask(value: Any, length: Optional[int] = None) -> np.ndarray:
+    """Convert a predicate result to a boolean array where NA is False."""
+    if isinstance(value, pd.Series):
+        if value.dtype != bool:
+            value = value.fillna(False).astype(bool)
+        return value.to_numpy()
+    if isinstance(value, np.ndarray):
+        return value.astype(bool)
+    return np.full(length or 0, bool(value) and not pd.isna(value))
+
+
+class ExpressionBlock:
+    """Filters and derived columns evaluated together in one pass over a frame.
+    
+    ``ops`` are ``(None, predicate)`` for filters and ``(name, expression)``
+    for derived columns, in order. Each expression sees the columns derived
+    before it. All of them run on the full input; the rows failing the
+    combined filters are dropped once at the end, so a chain of filters and
+    derivations copies the frame once instead of once per step. Rows where
+    a predicate is NA are dropped.
+    """
+    
+    def __init__(self, ops: List[Tuple[Optional[str], Expr]]):
+        self.ops = ops
+    
+    def then(self, other: 'ExpressionBlock') -> 'ExpressionBlock':
+        """Return a block running this block's operations, then ``other``'s.
+        
+        Adjacent filters become one conjunction, evaluated as one expression.
+        """
+        ops = list(self.ops)
+        for name, expr in other.ops:
+            if name is None and ops and ops[-1][0] is None:
+                ops[-1] = (None, BinaryOp('&', ops[-1][1], expr))
+            else:
+                ops.append((name, expr))
+        return ExpressionBlock(ops)
+    
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        derived: Dict[str, Any] = {}
+        read = _frame_lookup(data)
+        
+        def lookup(name: str) -> Any:
+            return derived[name] if name in derived else read(name)
+        
+        keep = None
+        for name, expr in self.ops:
+            value = evaluate(expr, data, lookup)
+            if name is not None:
+                derived[name] = value
+                continue
+            mask = _as_mask(value, len(data))
+            keep = mask if keep is None else keep & mask
+        
+        result = data if keep is None else data[keep]
+        if derived:
+            if keep is None:
+                result = result.copy(deep=False)
+            for name, value in derived.items():
+                result[name] = _take(value, keep)
+        return result
+    
+    def __repr__(self) -> str:
+        steps = [f"filter {expr}" if name is None else f"{name} = {expr}" for name, expr in self.ops]
+        return f"ExpressionBlock({'; '.join(steps)})"
+
+
+def _take(value: Any, keep: Optional[np.ndarray]) -> Any:
+    """Values of a derived column for the kept rows (positionally, ignoring the index)."""
+    if isinstance(value, pd.Series):
+        value = value.array
+    elif not isinstance(value, np.ndarray):
+        return value
+    return value if keep is None else value[keep]
@@ -0,0 +1,169 @@
+"""Partitioned multi-process execution of row-local transformations."""
+import logging
+import multiprocessing
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Input frame and functions of a worker process, set by _init_worker()
+_WORKER_STATE: Dict[str, Any] = {}
+
+# Blocks are freed by the parent's unlink(); from 3.13 they can skip the
+# resource tracker, before that workers share the parent's tracker
+_SHARED_MEMORY_OPTIONS: Dict[str, Any] = {'track': False} if sys.version_info >= (3, 13) else {}
+
+SharedResult = Tuple[str, bytes, List[int]]
+
+
+def fork_available() -> bool:
+    """Return whether worker processes can be forked on this platform."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def _start_method() -> str:
+    """Pick how to start workers: fork only while no other thread is running."""
+    if fork_available() and threading.active_count() == 1:
+        return 'fork'
+    methods = multiprocessing.get_all_start_methods()
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+def run_partitioned(
+    data: pd.DataFrame,
+    funcs: List[Callable[[pd.DataFrame], pd.DataFrame]],
+    n_workers: int,
+    n_partitions: Optional[int] = None
+) -> pd.DataFrame:
+    """Apply ``funcs`` to row partitions of ``data`` on a process pool.
+    
+    Workers are forked with the input and functions as their initializer
+    arguments, so they read their partition from memory shared
+    copy-on-write with the parent and receive only its row range. Forking
+    a process that runs other threads can deadlock the children, so while
+    other threads are alive (e.g. DAG or pipelined runs), and on platforms
+    without ``fork``, workers are started with ``forkserver`` or ``spawn``
+    and the input and functions are pickled to each of them instead. If
+    the functions cannot be pickled, they run in this process and a warning
+    is logged. Results come back through ``multiprocessing`` shared memory:
+    numeric buffers are written there out-of-band (pickle protocol 5) and
+    only the small frame metadata is pickled. Partitions are concatenated
+    in their original order.
+    
+    Args:
+        data: Input DataFrame
+        funcs: Row-local transformations applied to each partition in order
+        n_workers: Number of worker processes
+        n_partitions: Number of partitions (defaults to ``n_workers``)
+    
+    Returns:
+        Concatenated result of all partitions
+    """
+    n_partitions = max(1, min(n_partitions or n_workers, len(data)))
+    if not funcs:
+        return data
+    parallel = n_workers > 1 and n_partitions > 1
+    start_method = _start_method()
+    if parallel and start_method != 'fork':
+        try:
+            pickle.dumps(funcs)
+        except Exception as e:
+            logger.warning(
+                f"Cannot fork while other threads are running and the transformations "
+                f"cannot be pickled for '{start_method}' workers ({e}); transforming in this process"
+            )
+            parallel = False
+    if not parallel:
+        for func in funcs:
+            data = func(data)
+        return data
+    
+    bounds = np.linspace(0, len(data), n_partitions + 1, dtype=int)
+    if not _SHARED_MEMORY_OPTIONS:
+        # Workers register their blocks with this tracker, and unlink() here unregisters them
+        resource_tracker.ensure_running()
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=context, initializer=_init_worker, initargs=(data, funcs)
+    ) as pool:
+        futures = [
+            pool.submit(_run_partition, int(start), int(stop))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        # Collect every result so no shared memory block leaks on failure
+        results = []
+        error = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                error = error or e
+    
+    parts = []
+    for result in results:
+        part = _from_shared(result)
+        if error is None:
+            parts.append(part)
+    if error is not None:
+        raise error
+    logger.debug(
+        f"Processed {len(data)} rows in {n_partitions} partitions on {n_workers} {start_method} workers"
+    )
+    return pd.concat(parts)
+
+
+def _init_worker(data: pd.DataFrame, funcs: List[Callable[[pd.DataFrame], pd.DataFrame]]) -> None:
+    """Keep a worker's input and functions (inherited without pickling when forked)."""
+    _WORKER_STATE['data'] = data
+    _WORKER_STATE['funcs'] = funcs
+
+
+def _run_partition(start: int, stop: int) -> SharedResult:
+    """Worker body: transform one row range and publish it to shared memory."""
+    part = _WORKER_STATE['data'].iloc[start:stop]
+    for func in _WORKER_STATE['funcs']:
+        part = func(part)
+    return _to_shared(part)
+
+
+def _to_shared(obj: Any) -> SharedResult:
+    """Pickle ``obj`` with its data buffers placed in a new shared memory block."""
+    buffers: List[pickle.PickleBuffer] = []
+    meta = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    sizes = [raw.nbytes for raw in raws]
+    
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(sizes)), **_SHARED_MEMORY_OPTIONS)
+    offset = 0
+    for raw, size in zip(raws, sizes):
+        block.buf[offset:offset + size] = raw
+        offset += size
+    name = block.name
+    # The parent unlinks the block after reading it
+    block.close()
+    return name, meta, sizes
+
+
+def _from_shared(result: SharedResult) -> Any:
+    """Rebuild an object published by _to_shared() and free its block."""
+    name, meta, sizes = result
+    block = shared_memory.SharedMemory(name=name, **_SHARED_MEMORY_OPTIONS)
+    try:
+        # Copy each buffer out once so no view outlives the block
+        buffers = []
+        offset = 0
+        for size in sizes:
+            with block.buf[offset:offset + size] as view:
+                buffers.append(bytearray(view))
+            offset += size
+        return pickle.loads(meta, buffers=buffers)
+    finally:
+        block.close()
+        block.unlink()
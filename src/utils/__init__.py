@@ -1,3 +1,5 @@
 # Utility modules
 from .logging_config import setup_logging
 from .config_loader import load_config
+from .cache import ExtractCache
+from .metrics import MetricsCollector, RunReport
@@ -0,0 +1,137 @@
+"""Persistent on-disk cache for extraction results."""
+import json
+import logging
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .files import atomic_write, stable_hash
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class ExtractCache:
+    """Size-bounded LRU cache of extract results on local disk.
+    
+    Each entry is a pickle (protocol 5, which writes NumPy/pandas buffers
+    without intermediate copies) plus a small JSON sidecar holding its
+    creation time, last access time and size. Entries older than ``ttl``
+    seconds are treated as misses; when the total size exceeds
+    ``max_bytes`` the least recently used entries are evicted.
+    
+    Only cache data from sources you trust: entries are unpickled on read.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_bytes: int = 1024 ** 3,
+        ttl: Optional[float] = None
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Derive a stable cache key from JSON-serializable parts."""
+        return stable_hash(*parts)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        value = self._read(key)
+        if value is _MISSING:
+            self.stats['misses'] += 1
+            logger.info(f"Cache miss: {key[:12]}")
+            return default
+        self.stats['hits'] += 1
+        logger.info(f"Cache hit: {key[:12]}")
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key`` and evict entries over the size budget."""
+        data_path, meta_path = self._paths(key)
+        payload = pickle.dumps(value, protocol=5)
+        if len(payload) > self.max_bytes:
+            logger.warning(f"Not caching {key[:12]}: {len(payload)} bytes exceeds cache size")
+            return
+        
+        now = time.time()
+        atomic_write(data_path, payload)
+        atomic_write(meta_path, json.dumps(
+            {'created': now, 'accessed': now, 'size': len(payload)}
+        ).encode('utf-8'))
+        self._evict()
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path in self.cache_dir.glob('*.pkl'):
+            self._remove(path.stem)
+    
+    def _read(self, key: str) -> Any:
+        """Load an entry, dropping it if expired or unreadable."""
+        meta = self._read_meta(key)
+        if meta is None:
+            return _MISSING
+        if self._is_expired(meta):
+            self.stats['expired'] += 1
+            self._remove(key)
+            return _MISSING
+        
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(data_path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self._remove(key)
+            return _MISSING
+        
+        meta['accessed'] = time.time()
+        atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+        return value
+    
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry's sidecar, or None if the entry does not exist."""
+        _, meta_path = self._paths(key)
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def _is_expired(self, meta: Dict[str, Any]) -> bool:
+        """Return whether an entry has outlived ``ttl``."""
+        return self.ttl is not None and time.time() - meta['created'] > self.ttl
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for meta_path in self.cache_dir.glob('*.json'):
+            meta = self._read_meta(meta_path.stem)
+            if meta is not None:
+                entries.append((meta['accessed'], meta['size'], meta_path.stem))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.stats['evictions'] += 1
+            logger.debug(f"Evicted cache entry {key[:12]}")
+    
+    def _paths(self, key: str):
+        """Return the payload and sidecar paths of an entry."""
+        return self.cache_dir / f"{key}.pkl", self.cache_dir / f"{key}.json"
+    
+    def _remove(self, key: str) -> None:
+        """Delete an entry's files if present."""
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,178 @@
+"""On-disk checkpoints of pipeline stage outputs for resumable runs."""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import pandas as pd
+
+from .files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+_MANIFEST = 'manifest.json'
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Directory of stage outputs and progress markers of one pipeline.
+    
+    DataFrames are written as Parquet (through pyarrow, when installed) and
+    anything else as pickles. A JSON manifest records the run's
+    ``fingerprint``, the SHA-256 of every file and the progress markers set
+    with mark(). Checkpoints written for a different fingerprint are
+    discarded by open(), and files whose digest no longer matches are
+    discarded by load(). All writes are atomic.
+    
+    Only resume from checkpoints you wrote yourself: pickled outputs are
+    unpickled on load.
+    """
+    
+    def __init__(self, directory: Union[str, Path], fingerprint: str):
+        self.directory = Path(directory)
+        self.fingerprint = fingerprint
+        self._manifest: Dict[str, Any] = self._empty_manifest()
+    
+    def open(self, resume: bool = True) -> bool:
+        """Load the manifest, or start over if it is stale or ``resume`` is off.
+        
+        Returns:
+            Whether checkpoints of an earlier run are available
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            self.clear()
+            return False
+        if not resume:
+            logger.info(f"Discarding checkpoint in {self.directory}")
+            self.clear()
+            return False
+        if manifest.get('version') != CHECKPOINT_VERSION or manifest.get('fingerprint') != self.fingerprint:
+            logger.warning(f"Discarding stale checkpoint in {self.directory}: inputs or config changed")
+            self.clear()
+            return False
+        self._manifest = manifest
+        logger.info(f"Resuming from checkpoint in {self.directory}")
+        return True
+    
+    def has(self, stage: str) -> bool:
+        """Return whether an output is recorded for ``stage``."""
+        return stage in self._manifest['stages']
+    
+    def save(self, stage: str, data: Any, per_item: bool = False) -> None:
+        """Persist the output of ``stage``.
+        
+        Args:
+            stage: Stage name
+            data: Output of the stage, stored as one file
+            per_item: Store each item of the list ``data`` in its own file
+                instead, e.g. one output per extractor
+        """
+        items = data if per_item else [data]
+        entry: Dict[str, Any] = {'list': per_item, 'files': []}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for index, item in enumerate(items):
+            path = self._write_item(f"{stage}-{index}", item)
+            entry['files'].append({'name': path.name, 'sha256': file_sha256(path)})
+        self._manifest['stages'][stage] = entry
+        self._write_manifest()
+        logger.info(f"Checkpointed {stage} output in {self.directory}")
+    
+    def load(self, stage: str) -> Any:
+        """Return the saved output of ``stage``, or None if missing or corrupt."""
+        entry = self._manifest['stages'].get(stage)
+        if entry is None:
+            return None
+        items = []
+        for item in entry['files']:
+            path = self.directory / item['name']
+            try:
+                valid = file_sha256(path) == item['sha256']
+            except OSError:
+                valid = False
+            if not valid:
+                logger.warning(f"Checkpoint {path} is missing or corrupt; {stage} will run again")
+                self.discard(stage)
+                return None
+            items.append(self._read_item(path))
+        return items if entry['list'] else items[0]
+    
+    def discard(self, stage: str) -> None:
+        """Forget the output of ``stage`` and delete its files."""
+        entry = self._manifest['stages'].pop(stage, None)
+        if entry is None:
+            return
+        for item in entry['files']:
+            try:
+                (self.directory / item['name']).unlink()
+            except FileNotFoundError:
+                pass
+        self._write_manifest()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the progress marker ``key``."""
+        return self._manifest['progress'].get(key, default)
+    
+    def mark(self, key: str, value: Any) -> None:
+        """Record a JSON-serializable progress marker."""
+        self._manifest['progress'][key] = value
+        self._write_manifest()
+    
+    def clear(self) -> None:
+        """Delete every checkpoint file."""
+        self._manifest = self._empty_manifest()
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+    
+    def _empty_manifest(self) -> Dict[str, Any]:
+        return {'version': CHECKPOINT_VERSION, 'fingerprint': self.fingerprint, 'stages': {}, 'progress': {}}
+    
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        """Read the manifest, or None if there is no usable one."""
+        try:
+            return json.loads((self.directory / _MANIFEST).read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def _write_manifest(self) -> None:
+        payload = json.dumps(self._manifest, indent=2, sort_keys=True, default=str)
+        atomic_write(self.directory / _MANIFEST, payload.encode('utf-8'))
+    
+    def _write_item(self, stem: str, item: Any) -> Path:
+        """Write one output as Parquet if possible, otherwise as a pickle."""
+        if isinstance(item, pd.DataFrame):
+            path = self.directory / f"{stem}.parquet"
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            os.close(fd)
+            try:
+                item.to_parquet(tmp_path, engine='pyarrow', compression='lz4')
+                os.replace(tmp_path, path)
+                return path
+            except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+                os.unlink(tmp_path)
+                logger.debug(f"Cannot write {stem} as Parquet ({e}); pickling it instead")
+        path = self.directory / f"{stem}.pkl"
+        atomic_write(path, pickle.dumps(item, protocol=5))
+        return path
+    
+    @staticmethod
+    def _read_item(path: Path) -> Any:
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path, engine='pyarrow')
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
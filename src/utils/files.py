@@ -0,0 +1,35 @@
+"""Helpers for the state files the pipeline keeps on disk."""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Union
+
+
+def stable_hash(*parts: Any) -> str:
+    """Derive a stable SHA-256 hex digest from JSON-serializable parts.
+    
+    Dict keys are sorted and values JSON cannot encode are hashed by their
+    repr(), so equal inputs give the same digest across runs.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def atomic_write(path: Union[str, Path], payload: bytes) -> None:
+    """Write ``payload`` to a temporary file and rename it over ``path``.
+    
+    Readers see either the previous file or the complete new one, never a
+    partial write. The parent directory is created if needed.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,203 @@
+"""HTTP response cache with conditional revalidation for requests sessions."""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .cache import _MISSING, ExtractCache
+
+logger = logging.getLogger(__name__)
+
+# Request headers that select a different representation of the same URL
+KEY_HEADERS = ('Accept', 'Authorization')
+
+# Describe the transfer rather than the (decoded) body that is stored
+_TRANSFER_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a ``Cache-Control`` header into lower-cased directives."""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+class HTTPCache(ExtractCache):
+    """On-disk cache of GET responses validated with ETag and Last-Modified.
+    
+    A stored response is served without a request while it is fresh, for
+    the ``max-age`` of its ``Cache-Control`` header. Once stale it is
+    revalidated with ``If-None-Match`` / ``If-Modified-Since``, and a 304
+    answer serves the stored body and renews its freshness. Responses
+    marked ``no-store``, and those with neither a validator nor a
+    ``max-age``, are not stored; ``no-cache`` ones are revalidated on every
+    use. Entries share ExtractCache's ``max_bytes`` budget and LRU eviction.
+    
+    ``stats`` counts ``hits`` (fresh), ``revalidated`` (304), ``misses``
+    (downloaded) and ``evictions``.
+    """
+    
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 1024 ** 3):
+        super().__init__(cache_dir, max_bytes=max_bytes)
+        self.stats.update({'revalidated': 0, 'stored': 0})
+        self._stats_lock = threading.Lock()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; copies sent to worker processes get their own
+        state = self.__dict__.copy()
+        del state['_stats_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+    
+    def key(self, request: requests.PreparedRequest) -> str:
+        """Return the cache key of a request: method, URL and KEY_HEADERS."""
+        headers = {name: request.headers.get(name) for name in KEY_HEADERS}
+        return self.make_key('http', request.method, request.url, headers)
+    
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for ``key``, fresh or stale, or None."""
+        entry = self._read(key)
+        return None if entry is _MISSING else entry
+    
+    def store(self, key: str, response: requests.Response) -> Optional[Dict[str, Any]]:
+        """Store a 200 response if its headers allow it, and return the entry."""
+        entry = {
+            'status': response.status_code,
+            'headers': {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in _TRANSFER_HEADERS
+            },
+            'body': response.content,
+        }
+        if not self._refresh(entry):
+            return None
+        self.put(key, entry)
+        self.count('stored')
+        return entry
+    
+    def revalidated(self, key: str, entry: Dict[str, Any], response: requests.Response) -> None:
+        """Merge the headers of a 304 into ``entry`` and store it again."""
+        for name in ('Cache-Control', 'ETag', 'Last-Modified', 'Date', 'Expires'):
+            if name in response.headers:
+                entry['headers'][name] = response.headers[name]
+        if self._refresh(entry):
+            self.put(key, entry)
+        else:
+            self._remove(key)
+    
+    def count(self, stat: str) -> None:
+        """Increment a counter in ``stats`` (thread-safe)."""
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def summary(self) -> str:
+        """Describe the counters for logging."""
+        return (
+            f"{self.stats['hits']} hits, {self.stats['revalidated']} revalidated, "
+            f"{self.stats['misses']} misses, {self.stats['evictions']} evictions"
+        )
+    
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any]) -> bool:
+        """Return whether an entry may be served without revalidation."""
+        return time.time() < entry['fresh_until']
+    
+    @staticmethod
+    def _refresh(entry: Dict[str, Any]) -> bool:
+        """Set the entry's freshness from its headers; return whether it may be stored."""
+        headers = CaseInsensitiveDict(entry['headers'])
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return False
+        
+        max_age = 0.0
+        if 'max-age' in directives and 'no-cache' not in directives:
+            try:
+                max_age = float(directives['max-age'])
+            except (TypeError, ValueError):
+                max_age = 0.0
+            try:
+                max_age -= float(headers.get('Age', 0))
+            except ValueError:
+                pass
+        has_validator = 'ETag' in headers or 'Last-Modified' in headers
+        if max_age <= 0 and not has_validator:
+            return False
+        entry['fresh_until'] = time.time() + max(0.0, max_age)
+        return True
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter answering GET requests from an HTTPCache when it can.
+    
+    Streamed requests (``stream=True``) bypass the cache, since storing
+    them would mean buffering the whole body.
+    """
+    
+    def __init__(self, cache: HTTPCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+    
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        if request.method != 'GET' or stream:
+            return super().send(request, stream=stream, **kwargs)
+        
+        key = self.cache.key(request)
+        entry = self.cache.lookup(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.count('hits')
+            logger.debug(f"HTTP cache hit: {request.url}")
+            return self._from_cache(request, entry)
+        
+        if entry is not None:
+            request = self._conditional(request, entry)
+        response = super().send(request, stream=stream, **kwargs)
+        
+        if entry is not None and response.status_code == 304:
+            self.cache.count('revalidated')
+            logger.debug(f"HTTP cache revalidated: {request.url}")
+            response.close()
+            self.cache.revalidated(key, entry, response)
+            return self._from_cache(request, entry)
+        
+        self.cache.count('misses')
+        logger.debug(f"HTTP cache miss: {request.url}")
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+    
+    @staticmethod
+    def _conditional(request: requests.PreparedRequest, entry: Dict[str, Any]) -> requests.PreparedRequest:
+        """Return a copy of ``request`` carrying the entry's validators."""
+        headers = CaseInsensitiveDict(entry['headers'])
+        request = request.copy()
+        if 'ETag' in headers:
+            request.headers['If-None-Match'] = headers['ETag']
+        if 'Last-Modified' in headers:
+            request.headers['If-Modified-Since'] = headers['Last-Modified']
+        return request
+    
+    def _from_cache(self, request: requests.PreparedRequest, entry: Dict[str, Any]) -> requests.Response:
+        """Build a Response for ``request`` from a stored entry."""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body']
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
@@ -0,0 +1,263 @@
+"""Run metrics collection and reporting for ETL pipelines."""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .files import atomic_write
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PROMETHEUS_FIELDS = {
+    'duration_seconds': 'Time spent in the stage',
+    'rows_in': 'Rows received by the stage',
+    'rows_out': 'Rows produced by the stage',
+    'rows_per_second': 'Rows produced (or received, for loaders) per second',
+    'bytes_read': 'Bytes read from the source',
+    'bytes_written': 'Bytes written to the destination',
+    'tracemalloc_peak_bytes': 'Peak Python allocations above the stage start',
+}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the process's peak resident set size, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+def count_rows(data: Any) -> Optional[int]:
+    """Return the number of rows in a frame, list of frames or list of records."""
+    if data is None:
+        return None
+    if isinstance(data, list) and data and hasattr(data[0], 'shape'):
+        return sum(len(item) for item in data)
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+@dataclass
+class StageMetrics:
+    """Metrics of one extractor, transformer step or loader.
+    
+    In streaming modes the values accumulate over all batches.
+    """
+    stage: str
+    name: str
+    batches: int = 0
+    duration_seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    tracemalloc_peak_bytes: Optional[int] = None
+    
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        """Throughput based on rows out, or rows in for loaders."""
+        rows = self.rows_out if self.rows_out is not None else self.rows_in
+        if rows is None or self.duration_seconds <= 0:
+            return None
+        return rows / self.duration_seconds
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'rows_per_second': self.rows_per_second}
+
+
+@dataclass
+class RunReport:
+    """Structured report of one pipeline run.
+    
+    ``process_peak_rss_bytes`` is the peak resident set size of the whole
+    process when the run finished, as reported by the OS. It is a
+    high-water mark over the process lifetime, so it also covers earlier
+    runs and cannot be attributed to a single stage.
+    """
+    pipeline: str
+    started_at: float
+    duration_seconds: float = 0.0
+    status: str = "running"
+    error: Optional[str] = None
+    process_peak_rss_bytes: Optional[int] = None
+    stages: List[StageMetrics] = field(default_factory=list)
+    
+    def stage(self, stage: str, name: str) -> Optional[StageMetrics]:
+        """Look up the metrics of a component by stage and name."""
+        for metrics in self.stages:
+            if metrics.stage == stage and metrics.name == name:
+                return metrics
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'pipeline': self.pipeline,
+            'started_at': self.started_at,
+            'duration_seconds': self.duration_seconds,
+            'status': self.status,
+            'error': self.error,
+            'process_peak_rss_bytes': self.process_peak_rss_bytes,
+            'stages': [metrics.to_dict() for metrics in self.stages],
+        }
+    
+    def to_json(self, path: Optional[Union[str, Path]] = None) -> str:
+        """Serialize the report as JSON, optionally writing it to ``path``."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path:
+            atomic_write(path, text.encode('utf-8'))
+        return text
+    
+    def to_prometheus(self, path: Optional[Union[str, Path]] = None) -> str:
+        """Render the report in Prometheus text exposition format.
+        
+        Writing to ``path`` is atomic, so the file can be picked up by the
+        node_exporter textfile collector while runs are in progress.
+        """
+        pipeline = _escape(self.pipeline)
+        lines = [
+            '# HELP etl_run_duration_seconds Duration of the last pipeline run',
+            '# TYPE etl_run_duration_seconds gauge',
+            f'etl_run_duration_seconds{{pipeline="{pipeline}"}} {self.duration_seconds}',
+            '# HELP etl_run_success Whether the last pipeline run succeeded',
+            '# TYPE etl_run_success gauge',
+            f'etl_run_success{{pipeline="{pipeline}"}} {int(self.status == "success")}',
+        ]
+        peak_rss = self.process_peak_rss_bytes
+        if peak_rss is not None:
+            lines.extend([
+                '# HELP etl_run_process_peak_rss_bytes Process peak RSS at the end of the last run',
+                '# TYPE etl_run_process_peak_rss_bytes gauge',
+                f'etl_run_process_peak_rss_bytes{{pipeline="{pipeline}"}} {peak_rss}',
+            ])
+        for field_name, description in _PROMETHEUS_FIELDS.items():
+            samples = []
+            for metrics in self.stages:
+                value = getattr(metrics, field_name)
+                if value is None:
+                    continue
+                labels = (
+                    f'pipeline="{pipeline}",stage="{_escape(metrics.stage)}",'
+                    f'name="{_escape(metrics.name)}"'
+                )
+                samples.append(f'etl_stage_{field_name}{{{labels}}} {value}')
+            if samples:
+                lines.append(f'# HELP etl_stage_{field_name} {description}')
+                lines.append(f'# TYPE etl_stage_{field_name} gauge')
+                lines.extend(samples)
+        text = '\n'.join(lines) + '\n'
+        if path:
+            atomic_write(path, text.encode('utf-8'))
+        return text
+
+
+class StageTimer:
+    """Handle yielded by MetricsCollector.measure() to record row counts."""
+    
+    def __init__(self, rows_in: Optional[int] = None):
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.batches = 1
+
+
+class MetricsCollector:
+    """Accumulate StageMetrics for a run.
+    
+    ``trace_memory`` enables tracemalloc peaks per stage, which costs
+    noticeable overhead; the process peak RSS is recorded for the run as a
+    whole where available.
+    """
+    
+    def __init__(self, pipeline: str, trace_memory: bool = False):
+        self.report = RunReport(pipeline=pipeline, started_at=time.time())
+        self.trace_memory = trace_memory
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str], StageMetrics] = {}
+        self._started_tracemalloc = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+    
+    def get(self, stage: str, name: str) -> StageMetrics:
+        """Return (creating if needed) the metrics of a component."""
+        with self._lock:
+            key = (stage, name)
+            if key not in self._index:
+                self._index[key] = StageMetrics(stage=stage, name=name)
+                self.report.stages.append(self._index[key])
+            return self._index[key]
+    
+    @contextmanager
+    def measure(self, stage: str, name: str, rows_in: Optional[int] = None) -> Iterator[StageTimer]:
+        """Time a block of work and add it to the component's metrics."""
+        timer = StageTimer(rows_in)
+        baseline = None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            elapsed = time.perf_counter() - start
+            traced = None
+            if baseline is not None:
+                traced = tracemalloc.get_traced_memory()[1] - baseline
+            self.record(stage, name, elapsed, timer.rows_in, timer.rows_out, traced, timer.batches)
+    
+    def record(
+        self,
+        stage: str,
+        name: str,
+        duration: float,
+        rows_in: Optional[int] = None,
+        rows_out: Optional[int] = None,
+        traced_bytes: Optional[int] = None,
+        batches: int = 1
+    ) -> StageMetrics:
+        """Add one measured batch of work to the component's metrics.
+        
+        Used directly for work timed elsewhere, e.g. in a worker process.
+        """
+        metrics = self.get(stage, name)
+        with self._lock:
+            metrics.batches += batches
+            metrics.duration_seconds += duration
+            metrics.rows_in = _add(metrics.rows_in, rows_in)
+            metrics.rows_out = _add(metrics.rows_out, rows_out)
+            if traced_bytes is not None:
+                metrics.tracemalloc_peak_bytes = max(metrics.tracemalloc_peak_bytes or 0, traced_bytes)
+        return metrics
+    
+    def finish(self, error: Optional[BaseException] = None) -> RunReport:
+        """Close the report with the run's outcome."""
+        self.report.duration_seconds = time.perf_counter() - self._start
+        self.report.status = "failed" if error else "success"
+        self.report.error = str(error) if error else None
+        self.report.process_peak_rss_bytes = peak_rss_bytes()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return self.report
+
+
+def _add(total: Optional[int], value: Optional[int]) -> Optional[int]:
+    """Add ``value`` to a running total where None means unknown."""
+    if value is None:
+        return total
+    return (total or 0) + value
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,50 @@
+"""Client-side request rate limiting."""
+import threading
+import time
+from typing import Any, Dict
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` calls per second on average.
+    
+    Up to ``burst`` calls may happen back to back after an idle period.
+    acquire() is thread-safe and blocks until a token is available.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; copies sent to worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """Take one token, waiting if necessary.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is the wait this caller has reserved
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,64 @@
+"""Persistent watermark store for incremental extraction."""
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Union
+
+from .files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkStore:
+    """JSON file mapping extractor state keys to their last committed watermark.
+    
+    Values must be JSON-serializable (numbers, strings, ISO timestamps).
+    Every set() rewrites the file atomically, so a crash never leaves a
+    partially written store behind.
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; copies sent to worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the committed watermark for ``key``."""
+        return self._read().get(key, default)
+    
+    def set(self, key: str, value: Any) -> None:
+        """Commit a new watermark for ``key``."""
+        with self._lock:
+            state = self._read()
+            state[key] = value
+            self._write(state)
+        logger.info(f"Committed watermark {key} = {value!r}")
+    
+    def delete(self, key: str) -> None:
+        """Forget the watermark for ``key`` so the next run starts over."""
+        with self._lock:
+            state = self._read()
+            if state.pop(key, None) is not None:
+                self._write(state)
+    
+    def _read(self) -> Dict[str, Any]:
+        """Load the whole store, or an empty one if the file does not exist."""
+        if not self.path.exists():
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+    
+    def _write(self, state: Dict[str, Any]) -> None:
+        """Replace the store file atomically."""
+        payload = json.dumps(state, indent=2, sort_keys=True, default=str)
+        atomic_write(self.path, payload.encode('utf-8'))
@@ -4,7 +4,7 @@ import pandas as pd
 from pathlib import Path
 import tempfile
 
-from src.pipeline import ETLPipeline
+from src.pipeline import ETLPipeline, PipelineStep
 from src.extract.csv_extractor import CSVExtractor
 from src.transform.base import DataFrameTransformer
 from src.load.csv_loader import CSVLoader
@@ -60,3 +60,142 @@ class TestETLPipeline:
         output_df = pd.read_csv(output_file)
         assert len(output_df) == 3  # After removing duplicates and NA
         assert list(output_df.columns) == ['id', 'name', 'score']
+    
+    def test_streaming_pipeline(self, temp_dir, sample_csv):
+        """Test streaming execution transforms and loads batch by batch."""
+        output_file = temp_dir / "output.csv"
+        
+        pipeline = ETLPipeline(
+            name="streaming_pipeline",
+            config={'pipeline': {'execution': 'streaming'}, 'extract': {'batch_size': 2}}
+        )
+        pipeline.add_extractor(CSVExtractor(sample_csv))
+        pipeline.add_transformer(DataFrameTransformer().drop_na(subset=['name']))
+        pipeline.add_loader(CSVLoader(output_file))
+        
+        rows = pipeline.run()
+        
+        output_df = pd.read_csv(output_file)
+        assert rows == 4
+        assert output_df['id'].tolist() == [1, 2, 2, 3]
+        assert list(output_df.columns) == ['id', 'name', 'score']
+    
+    def test_streaming_dedup_across_batches(self, temp_dir, sample_csv):
+        """Test StreamingDeduplicator removes duplicates split across batches."""
+        from src.transform.dedup import StreamingDeduplicator
+        
+        output_file = temp_dir / "output.csv"
+        
+        pipeline = ETLPipeline(
+            name="streaming_dedup",
+            config={'pipeline': {'execution': 'streaming'}, 'extract': {'batch_size': 2}}
+        )
+        pipeline.add_extractor(CSVExtractor(sample_csv))
+        pipeline.add_transformer(DataFrameTransformer().drop_na(subset=['name']))
+        pipeline.add_transformer(StreamingDeduplicator())
+        pipeline.add_loader(CSVLoader(output_file))
+        
+        rows = pipeline.run()
+        
+        assert rows == 3
+        assert pd.read_csv(output_file)['id'].tolist() == [1, 2, 3]
+    
+    def test_pipelined_pipeline(self, temp_dir, sample_csv):
+        """Test pipelined execution produces the same output as streaming."""
+        output_file = temp_dir / "output.csv"
+        
+        pipeline = ETLPipeline(
+            name="pipelined_pipeline",
+            config={'pipeline': {'execution': 'pipelined'}, 'extract': {'batch_size': 2}}
+        )
+        pipeline.add_extractor(CSVExtractor(sample_csv))
+        pipeline.add_transformer(DataFrameTransformer().drop_na(subset=['name']))
+        pipeline.add_loader(CSVLoader(output_file))
+        
+        rows = pipeline.run()
+        
+        output_df = pd.read_csv(output_file)
+        assert rows == 4
+        assert output_df['id'].tolist() == [1, 2, 2, 3]
+        assert set(pipeline.stage_stats) == {'extract', 'transform', 'load'}
+        assert pipeline.stage_stats['load'].items == 3
+    
+    def test_lazy_pushdown_pipeline(self, temp_dir, sample_csv):
+        """Test a lazy transformer's projection and filters run during the read."""
+        output_file = temp_dir / "output.csv"
+        extractor = CSVExtractor(sample_csv)
+        calls = []
+        original_extract = extractor.extract
+        
+        def spy_extract(**kwargs):
+            calls.append(kwargs)
+            return original_extract(**kwargs)
+        
+        extractor.extract = spy_extract
+        
+        transformer = DataFrameTransformer(lazy=True)
+        transformer \
+            .filter_rows(lambda df: df['score'] >= 85, columns=['score']) \
+            .select_columns(['id', 'score']) \
+            .drop_duplicates()
+        
+        pipeline = ETLPipeline(name="lazy_pipeline")
+        pipeline.add_extractor(extractor)
+        pipeline.add_transformer(transformer)
+        pipeline.add_loader(CSVLoader(output_file))
+        result = pipeline.run()
+        
+        assert calls[0]['usecols'] == ['id', 'score']
+        assert 'chunk_transform' in calls[0]
+        assert result.values.tolist() == [[1, 85], [2, 90], [4, 95]]
+    
+    def test_watermark_committed_after_load(self, temp_dir, sample_csv):
+        """Test a failed load leaves the watermark untouched."""
+        from src.load.base import BaseLoader
+        from src.utils.state_store import WatermarkStore
+        
+        class FailingLoader(BaseLoader):
+            def connect(self):
+                pass
+            
+            def load(self, data, **kwargs):
+                raise IOError("destination unavailable")
+            
+            def disconnect(self):
+                pass
+        
+        store = WatermarkStore(temp_dir / 'state.json')
+        extractor = CSVExtractor(sample_csv, state_store=store)
+        
+        pipeline = ETLPipeline(name="incremental_pipeline")
+        pipeline.add_extractor(extractor).add_loader(FailingLoader())
+        with pytest.raises(IOError):
+            pipeline.run()
+        assert store.get(extractor.state_key) is None
+        
+        pipeline = ETLPipeline(name="incremental_pipeline")
+        pipeline.add_extractor(extractor).add_loader(CSVLoader(temp_dir / 'output.csv'))
+        assert len(pipeline.run()) == 5
+        assert store.get(extractor.state_key) == sample_csv.stat().st_size
+        assert len(pipeline.run()) == 0
+    
+    def test_dag_fan_out(self, temp_dir, sample_csv):
+        """Test one extract feeding two transform branches and their loaders."""
+        from src.utils.state_store import WatermarkStore
+        
+        store = WatermarkStore(temp_dir / 'state.json')
+        extractor = CSVExtractor(sample_csv, state_store=store)
+        
+        pipeline = ETLPipeline(name="dag_pipeline")
+        pipeline \
+            .add_step(PipelineStep.extract('extract', extractor)) \
+            .add_step(PipelineStep.transform('dedup', DataFrameTransformer().drop_duplicates(), 'extract')) \
+            .add_step(PipelineStep.transform('ids', DataFrameTransformer().select_columns(['id']), 'extract')) \
+            .add_step(PipelineStep.load('load_dedup', CSVLoader(temp_dir / 'dedup.csv'), 'dedup')) \
+            .add_step(PipelineStep.load('load_ids', CSVLoader(temp_dir / 'ids.csv'), 'ids'))
+        result = pipeline.run()
+        
+        assert result == {'load_dedup': None, 'load_ids': None}
+        assert list(pd.read_csv(temp_dir / 'ids.csv').columns) == ['id']
+        assert len(pd.read_csv(temp_dir / 'dedup.csv')) == len(pd.read_csv(sample_csv).drop_duplicates())
+        assert store.get(extractor.state_key) == sample_csv.stat().st_size
@@ -0,0 +1,67 @@
+"""Unit tests for the benchmark suite."""
+import pytest
+
+from benchmarks.datasets import make_dataset
+from benchmarks.suite import compare, main
+
+
+def _results(**medians):
+    return {
+        'meta': {'rows': 1000, 'seed': 0},
+        'results': {name: {'median_seconds': seconds} for name, seconds in medians.items()},
+    }
+
+
+class TestDatasets:
+    """Tests for the synthetic dataset generators."""
+    
+    def test_seeded_generators_are_reproducible(self):
+        """Test the same seed yields identical data and another seed does not."""
+        first = make_dataset('strings', 500, seed=1)
+        
+        assert first.equals(make_dataset('strings', 500, seed=1))
+        assert not first.equals(make_dataset('strings', 500, seed=2))
+    
+    def test_dirty_has_duplicates_and_nas(self):
+        """Test the dirty dataset contains repeated rows and missing values."""
+        data = make_dataset('dirty', 1000)
+        
+        assert len(data) == 1000
+        assert data['id'].duplicated().sum() == 200
+        assert data['amount'].isna().any()
+    
+    def test_unknown_dataset(self):
+        """Test unknown dataset names are rejected."""
+        with pytest.raises(ValueError, match="Unknown dataset"):
+            make_dataset('tall', 10)
+
+
+class TestCompare:
+    """Tests for regression detection."""
+    
+    def test_flags_slowdowns_beyond_threshold(self):
+        """Test only scenarios slower than the threshold are regressions."""
+        baseline = _results(a=1.0, b=1.0, c=1.0)
+        current = _results(a=1.1, b=1.3, c=0.5)
+        
+        assert compare(baseline, current, threshold=0.15) == ['b']
+    
+    def test_incomparable_results(self):
+        """Test results for different dataset sizes are not compared."""
+        current = _results(a=1.0)
+        current['meta']['rows'] = 2000
+        
+        with pytest.raises(ValueError, match="not comparable"):
+            compare(_results(a=1.0), current)
+    
+    def test_run_fails_on_regression(self, tmp_path):
+        """Test the run command exits non-zero when a scenario regressed."""
+        import json
+        
+        baseline = _results(**{'transform.drop_na': 1e-9})
+        path = tmp_path / 'baseline.json'
+        path.write_text(json.dumps(baseline))
+        
+        status = main(['run', '--compare', str(path), '--filter', 'transform.drop_na', '--repeat', '1'])
+        
+        assert status == 1
@@ -0,0 +1,75 @@
+"""Unit tests for the pipelined execution engine."""
+import time
+
+import pytest
+
+from src.engine import PipelinedExecutor
+
+
+class TestPipelinedExecutor:
+    """Tests for PipelinedExecutor."""
+    
+    def test_stages_overlap(self):
+        """Test slow stages run concurrently instead of back to back."""
+        def source():
+            for i in range(5):
+                time.sleep(0.05)
+                yield i
+        
+        results = []
+        
+        def slow_load(item):
+            time.sleep(0.05)
+            results.append(item)
+        
+        start = time.perf_counter()
+        stats = PipelinedExecutor(queue_size=1).run(
+            source(), [('transform', lambda x: x * 2), ('load', slow_load)]
+        )
+        elapsed = time.perf_counter() - start
+        
+        assert results == [0, 2, 4, 6, 8]
+        assert elapsed < 0.45  # sequential execution would take 0.5s
+        assert stats['extract'].items == 5
+        assert stats['load'].items == 5
+        assert stats['load'].busy_seconds >= 0.2
+        assert stats['transform'].starved_seconds > stats['transform'].busy_seconds
+    
+    def test_backpressure_bounds_buffered_items(self):
+        """Test a slow consumer throttles the producer."""
+        produced = []
+        
+        def source():
+            for i in range(20):
+                produced.append(i)
+                yield i
+        
+        max_ahead = []
+        
+        def load(item):
+            max_ahead.append(len(produced) - item)
+            time.sleep(0.01)
+        
+        PipelinedExecutor(queue_size=2).run(source(), [('load', load)])
+        
+        # At most queue_size items queued, plus one held by each thread
+        assert max(max_ahead) <= 4
+    
+    def test_stage_failure_propagates(self):
+        """Test the first stage error stops the run and is re-raised."""
+        closed = []
+        
+        def source():
+            try:
+                for i in range(1000):
+                    yield i
+            finally:
+                closed.append(True)
+        
+        def load(item):
+            if item == 3:
+                raise RuntimeError("load failed")
+        
+        with pytest.raises(RuntimeError, match="load failed"):
+            PipelinedExecutor().run(source(), [('load', load)])
+        assert closed == [True]
@@ -30,6 +30,171 @@ class TestCSVExtractor:
         finally:
             Path(temp_path).unlink()
     
+    def test_extract_batches(self):
+        """Test chunked extraction yields batches of the configured size."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            f.write("id,value\n")
+            for i in range(5):
+                f.write(f"{i},{i * 10}\n")
+            temp_path = f.name
+        
+        try:
+            extractor = CSVExtractor(temp_path)
+            with extractor:
+                batches = list(extractor.extract_batches(batch_size=2))
+            
+            assert [len(batch) for batch in batches] == [2, 2, 1]
+            assert pd.concat(batches)['id'].tolist() == [0, 1, 2, 3, 4]
+        finally:
+            Path(temp_path).unlink()
+    
+    def test_extract_uses_cache(self, tmp_path):
+        """Test cached results are reused until the file changes."""
+        from src.utils.cache import ExtractCache
+        
+        csv_path = tmp_path / 'data.csv'
+        csv_path.write_text("id,value\n1,10\n")
+        cache = ExtractCache(tmp_path / 'cache')
+        
+        for _ in range(2):
+            with CSVExtractor(csv_path, cache=cache) as extractor:
+                extractor.extract()
+        assert cache.stats == {'hits': 1, 'misses': 1, 'expired': 0, 'evictions': 0}
+        
+        csv_path.write_text("id,value\n1,10\n2,20\n")
+        with CSVExtractor(csv_path, cache=cache) as extractor:
+            data = extractor.extract()
+        assert len(data) == 2
+        assert cache.stats['misses'] == 2
+    
+    def test_incremental_byte_offset(self, tmp_path):
+        """Test only lines appended after the committed offset are read."""
+        from src.utils.state_store import WatermarkStore
+        
+        csv_path = tmp_path / 'events.csv'
+        csv_path.write_text("id,value\n1,10\n2,20\n")
+        store = WatermarkStore(tmp_path / 'state.json')
+        
+        with CSVExtractor(csv_path, state_store=store) as extractor:
+            assert extractor.extract()['id'].tolist() == [1, 2]
+            extractor.commit()
+        
+        with open(csv_path, 'a') as f:
+            f.write("3,30\n4,4")  # last line still being written
+        with CSVExtractor(csv_path, state_store=store) as extractor:
+            assert extractor.extract()['id'].tolist() == [3]
+            # Not committed: the next run sees the same rows again
+        with CSVExtractor(csv_path, state_store=store) as extractor:
+            assert extractor.extract()['id'].tolist() == [3]
+    
+    def test_watermark_read_once_per_stream(self, tmp_path):
+        """Test the committed watermark is read once per stream, not once per chunk."""
+        from src.utils.state_store import WatermarkStore
+        
+        class CountingStore(WatermarkStore):
+            reads = 0
+            
+            def get(self, key, default=None):
+                CountingStore.reads += 1
+                return super().get(key, default)
+        
+        csv_path = tmp_path / 'events.csv'
+        csv_path.write_text("id\n" + "".join(f"{i}\n" for i in range(10)))
+        store = CountingStore(tmp_path / 'state.json')
+        store.set('events', 4)
+        
+        with CSVExtractor(csv_path, state_store=store, watermark_column='id', state_key='events') as extractor:
+            batches = list(extractor.extract_batches(batch_size=2))
+            assert CountingStore.reads == 1
+            extractor.commit()
+            assert extractor.checkpoint_signature()['watermark'] == 9
+        
+        assert pd.concat(batches)['id'].tolist() == [5, 6, 7, 8, 9]
+        assert CountingStore.reads == 1
+    
+    def test_incremental_watermark_column(self, tmp_path):
+        """Test rows at or below the committed column watermark are skipped."""
+        from src.utils.state_store import WatermarkStore
+        
+        csv_path = tmp_path / 'events.csv'
+        csv_path.write_text("id,value\n1,10\n2,20\n")
+        store = WatermarkStore(tmp_path / 'state.json')
+        
+        with CSVExtractor(csv_path, state_store=store, watermark_column='id') as extractor:
+            batches = list(extractor.extract_batches(batch_size=1))
+            extractor.commit()
+        assert store.get(extractor.state_key) == 2
+        
+        csv_path.write_text("id,value\n1,10\n2,20\n3,30\n")
+        with CSVExtractor(csv_path, state_store=store, watermark_column='id') as extractor:
+            assert extractor.extract()['id'].tolist() == [3]
+    
+    def test_optimize_dtypes_saves_schema(self, tmp_path):
+        """Test compact dtypes are inferred once, saved and reused."""
+        csv_path = tmp_path / 'data.csv'
+        rows = [f"{i},{i % 3 * 1.5},{'ab'[i % 2]}," for i in range(100)]
+        rows[5] = "5,,a,"
+        csv_path.write_text("id,amount,kind,empty\n" + "\n".join(rows) + "\n")
+        
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            data = extractor.extract()
+        
+        assert str(data['id'].dtype) == 'uint8'
+        assert str(data['amount'].dtype) == 'float32'
+        assert str(data['kind'].dtype) == 'category'
+        assert extractor.memory_report.loc['id', 'saved_bytes'] == 700
+        schema_path = tmp_path / 'data.csv.schema.json'
+        assert schema_path.exists()
+        
+        saved = schema_path.read_text()
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            reread = extractor.extract()
+        pd.testing.assert_frame_equal(reread, data)
+        assert schema_path.read_text() == saved
+        assert extractor.memory_report.loc['kind', 'before_bytes'] > extractor.memory_report.loc['kind', 'after_bytes']
+    
+    def test_optimize_dtypes_adapts_to_new_values(self, tmp_path):
+        """Test a saved schema is widened or re-inferred when values no longer fit."""
+        csv_path = tmp_path / 'data.csv'
+        csv_path.write_text("id,value\n1,10\n2,20\n")
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            extractor.extract()
+        
+        csv_path.write_text("id,value\n1,10\n2,70000\n")
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            data = extractor.extract()
+        assert data['value'].tolist() == [10, 70000]
+        assert str(data['value'].dtype) == 'uint32'
+        
+        csv_path.write_text("id,value\n1,10\n2,2.5\n")
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            data = extractor.extract()
+        assert data['value'].tolist() == [10, 2.5]
+        
+        # Whole floats are saved as nullable integers, which 1.5 cannot be cast to
+        csv_path.write_text("id,value\n1,1.0\n2,\n")
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            extractor.extract()
+        csv_path.write_text("id,value\n1,1.5\n2,\n")
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            data = extractor.extract()
+        assert data['value'].tolist()[0] == 1.5
+    
+    def test_streaming_stale_schema(self, tmp_path):
+        """Test a saved schema that stops fitting mid-stream is re-inferred for the remaining rows."""
+        csv_path = tmp_path / 'data.csv'
+        csv_path.write_text("id,value\n" + "".join(f"{i},{i}\n" for i in range(6)))
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            extractor.extract()
+        
+        csv_path.write_text("id,value\n" + "".join(f"{i},{i if i != 4 else ''}\n" for i in range(6)))
+        with CSVExtractor(csv_path, optimize_dtypes=True) as extractor:
+            batches = list(extractor.extract_batches(batch_size=2))
+        
+        assert [batch['id'].tolist() for batch in batches] == [[0, 1], [2, 3], [4, 5]]
+        assert batches[2]['value'].isna().tolist() == [True, False]
+        assert str(batches[0]['value'].dtype) == 'uint8'
+    
     def test_extract_nonexistent_file(self):
         """Test extraction from nonexistent file raises error."""
         extractor = CSVExtractor("/nonexistent/file.csv")
@@ -38,6 +203,103 @@ class TestCSVExtractor:
             extractor.connect()
 
 
+
+class TestMultiFileCSV:
+    """Tests for CSVExtractor over globs, directories and file lists."""
+    
+    @pytest.fixture
+    def shards(self, tmp_path):
+        """Write four hourly shards: plain, gzip and (with pyarrow) zstd."""
+        landing = tmp_path / 'landing'
+        landing.mkdir()
+        suffixes = ['.csv', '.csv.gz', '.csv', '.csv.gz']
+        try:
+            import pyarrow  # noqa: F401
+            suffixes[2] = '.csv.zst'
+        except ImportError:
+            pass
+        for hour, suffix in enumerate(suffixes):
+            shard = pd.DataFrame({
+                'id': range(hour * 10, hour * 10 + 10),
+                'day': '2024-01-02' if hour >= 2 else '2024-01-01',
+                'name': [f"n{i}" for i in range(10)],
+            })
+            path = landing / f"events-{hour:02d}{suffix}"
+            if suffix == '.csv.zst':
+                import pyarrow as pa
+                with pa.output_stream(str(path), compression='zstd') as f:
+                    f.write(shard.to_csv(index=False).encode('utf-8'))
+            else:
+                shard.to_csv(path, index=False)
+        (landing / 'notes.json').write_text('{}')
+        return landing
+    
+    @pytest.mark.parametrize('executor', ['process', 'thread'])
+    def test_directory_in_order(self, shards, executor):
+        """Test a directory's compressed shards are parsed by workers and kept in order."""
+        with CSVExtractor(shards, file_workers=2, executor=executor) as extractor:
+            data = extractor.extract()
+            assert len(extractor.files) == 4
+        
+        assert data['id'].tolist() == list(range(40))
+        assert data.index.is_unique
+    
+    def test_glob_streams_per_file(self, shards):
+        """Test a glob yields one frame per matching file."""
+        with CSVExtractor(str(shards / 'events-*.csv.gz'), file_workers=2) as extractor:
+            batches = list(extractor.extract_batches(batch_size=3))
+        
+        assert [batch['id'].iloc[0] for batch in batches] == [10, 30]
+        assert all(len(batch) == 10 for batch in batches)
+    
+    def test_watermark_across_files(self, shards, tmp_path):
+        """Test a watermark column filters rows across a list of files."""
+        from src.utils.state_store import WatermarkStore
+        
+        store = WatermarkStore(tmp_path / 'state.json')
+        store.set('files', 15)
+        paths = sorted(shards.glob('events-0[01]*'))
+        extractor = CSVExtractor(paths, state_store=store, watermark_column='id', state_key='files', file_workers=1)
+        with extractor:
+            data = extractor.extract(usecols=['id', 'day'])
+        extractor.commit()
+        
+        assert data['id'].tolist() == list(range(16, 20))
+        assert store.get('files') == 19
+        with pytest.raises(ValueError):
+            CSVExtractor(paths, state_store=store)
+    
+    def test_file_lists_have_own_identity(self, shards):
+        """Test different lists from one directory get their own state key and schema."""
+        paths = sorted(shards.glob('events-*'))
+        first = CSVExtractor(paths[:2], optimize_dtypes=True)
+        second = CSVExtractor(paths[2:], optimize_dtypes=True)
+        
+        assert first.state_key != second.state_key
+        assert first.schema_cache.path != second.schema_cache.path
+        assert first.source != second.source
+        assert CSVExtractor(paths[1::-1]).state_key == first.state_key
+        assert first.schema_cache.path.parent == shards
+    
+    def test_read_csv_file_options(self, shards):
+        """Test read options apply to compressed files."""
+        from src.extract.csv_extractor import read_csv_file
+        
+        path = shards / 'events-01.csv.gz'
+        assert len(read_csv_file(path, {'nrows': 3})) == 3
+        data = read_csv_file(path, {})
+        assert data['id'].tolist() == list(range(10, 20))
+    
+    def test_single_match_equals_file(self, shards):
+        """Test a glob matching one file returns the frame of that file read directly."""
+        with CSVExtractor(str(shards / 'events-01.*'), file_workers=1) as extractor:
+            via_glob = extractor.extract()
+        with CSVExtractor(shards / 'events-01.csv.gz') as extractor:
+            direct = extractor.extract()
+        
+        pd.testing.assert_frame_equal(via_glob, direct)
+
+
 class TestAPIExtractor:
     """Tests for APIExtractor."""
     
@@ -52,3 +314,552 @@ class TestAPIExtractor:
         
         extractor.disconnect()
         assert extractor.session is None
+    
+    def test_incremental_since_param(self, tmp_path):
+        """Test the committed watermark is sent and advanced from records."""
+        from src.extract.api_extractor import APIExtractor
+        from src.utils.state_store import WatermarkStore
+        
+        class StubResponse:
+            content = b'[]'
+            links = {}
+            
+            def raise_for_status(self):
+                pass
+            
+            def json(self):
+                return [{'id': 1, 'updated': '2024-01-02'}, {'id': 2, 'updated': '2024-01-03'}]
+        
+        requests_made = []
+        
+        class StubSession:
+            def request(self, **kwargs):
+                requests_made.append(kwargs)
+                return StubResponse()
+        
+        store = WatermarkStore(tmp_path / 'state.json')
+        store.set('api:https://api.example.com', '2024-01-01')
+        extractor = APIExtractor(
+            "https://api.example.com", state_store=store, watermark_field='updated'
+        )
+        extractor.session = StubSession()
+        
+        extractor.extract('items')
+        extractor.commit()
+        
+        assert requests_made[0]['params'] == {'since': '2024-01-01'}
+        assert store.get(extractor.state_key) == '2024-01-03'
+    
+    def test_pickles_for_worker_processes(self, tmp_path):
+        """Test an extractor with locked helpers can be sent to a process pool."""
+        import pickle
+        
+        from src.extract.api_extractor import APIExtractor
+        from src.utils.http_cache import HTTPCache
+        from src.utils.state_store import WatermarkStore
+        
+        extractor = APIExtractor(
+            "https://api.example.com", rate_limit=5, http_cache=HTTPCache(tmp_path / 'http'),
+            state_store=WatermarkStore(tmp_path / 'state.json'),
+        )
+        copy = pickle.loads(pickle.dumps(extractor))
+        
+        assert copy.base_url == extractor.base_url
+        assert copy.rate_limiter.rate == 5
+        copy.rate_limiter.acquire()
+        assert copy.http_cache.stats == extractor.http_cache.stats
+        copy.state_store.set(copy.state_key, 1)
+        assert extractor.state_store.get(extractor.state_key) == 1
+
+
+class TestAPIPagination:
+    """Tests for paginated APIExtractor requests against a local server."""
+    
+    @pytest.fixture
+    def api(self):
+        """Serve 25 records through several pagination styles."""
+        import http.server
+        import json
+        import threading
+        from urllib.parse import parse_qs, urlparse
+        
+        records = [{'id': i, 'updated': f"2024-01-{i + 1:02d}"} for i in range(25)]
+        state = {'requests': [], 'flaky': 0}
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                state['requests'].append((url.path, query))
+                headers = {}
+                status = 200
+                if url.path == '/pages':
+                    size = int(query['per_page'])
+                    start = (int(query['page']) - 1) * size
+                    body = {'data': records[start:start + size], 'total': len(records)}
+                elif url.path == '/offsets':
+                    start = int(query['offset'])
+                    body = records[start:start + int(query['limit'])]
+                elif url.path == '/cursor':
+                    start = int(query.get('cursor', 0))
+                    body = {'items': records[start:start + 10], 'meta': {'next': start + 10 if start + 10 < 25 else None}}
+                elif url.path == '/nested':
+                    items = [
+                        {'id': r['id'], 'customer': {'name': f"c{r['id']}", 'address': {'city': 'Oslo'}}, 'updated': r['updated']}
+                        for r in records
+                    ]
+                    del items[3]['customer']['address']
+                    body = {'meta': {'note': 'braces } and [brackets'}, 'data': {'items': items}}
+                elif url.path == '/link':
+                    start = int(query.get('start', 0))
+                    body = records[start:start + 10]
+                    if start + 10 < 25:
+                        headers['Link'] = f'<http://{self.headers["Host"]}/link?start={start + 10}>; rel="next"'
+                else:  # /flaky
+                    state['flaky'] += 1
+                    if state['flaky'] == 1:
+                        status, body, headers = 429, {}, {'Retry-After': '0'}
+                    else:
+                        body = records[:2]
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_port}", state
+        server.shutdown()
+        server.server_close()
+    
+    def test_page_numbers_fetched_concurrently(self, api):
+        """Test numbered pages stop at the announced total and keep their order."""
+        from src.extract.api_extractor import APIExtractor
+        from src.extract.pagination import PageNumberPagination
+        
+        base_url, state = api
+        pagination = PageNumberPagination(page_size=4, total_field='total')
+        with APIExtractor(base_url, pagination=pagination, records_field='data', page_workers=3) as extractor:
+            records = extractor.extract('pages')
+        
+        assert [record['id'] for record in records] == list(range(25))
+        assert sorted(int(query['page']) for _, query in state['requests']) == list(range(1, 8))
+    
+    def test_offsets_stop_at_short_page(self, api):
+        """Test offset pages are read until one comes back short."""
+        from src.extract.api_extractor import APIExtractor
+        from src.extract.pagination import OffsetPagination
+        
+        base_url, state = api
+        with APIExtractor(base_url, pagination=OffsetPagination(page_size=10), page_workers=2) as extractor:
+            batches = list(extractor.extract_batches(batch_size=8, endpoint='offsets'))
+        
+        assert [len(batch) for batch in batches] == [8, 8, 8, 1]
+        assert batches[-1][0]['id'] == 24
+    
+    @pytest.mark.parametrize('endpoint, pagination, records_field', [
+        ('cursor', 'cursor', 'items'),
+        ('link', 'link', None),
+    ])
+    def test_sequential_strategies(self, api, endpoint, pagination, records_field, tmp_path):
+        """Test cursor and Link header pages are followed to the end."""
+        from src.extract.api_extractor import APIExtractor
+        from src.extract.pagination import CursorPagination
+        from src.utils.state_store import WatermarkStore
+        
+        base_url, state = api
+        if pagination == 'cursor':
+            pagination = CursorPagination(next_field='meta.next')
+        store = WatermarkStore(tmp_path / 'state.json')
+        with APIExtractor(
+            base_url, pagination=pagination, records_field=records_field,
+            state_store=store, watermark_field='updated'
+        ) as extractor:
+            records = extractor.extract(endpoint)
+            extractor.commit()
+        
+        assert [record['id'] for record in records] == list(range(25))
+        assert len(state['requests']) == 3
+        assert store.get(extractor.state_key) == '2024-01-25'
+    
+    def test_retry_after_is_honoured(self, api):
+        """Test a 429 response is retried and a timeout is sent."""
+        from src.extract.api_extractor import APIExtractor
+        
+        base_url, state = api
+        with APIExtractor(base_url, config={'timeout': 5, 'backoff_factor': 0, 'rate_limit': 50}) as extractor:
+            assert extractor.extract('flaky') == [{'id': 0, 'updated': '2024-01-01'}, {'id': 1, 'updated': '2024-01-02'}]
+        
+        assert state['flaky'] == 2
+        assert extractor.timeout == 5
+    
+    def test_normalize_streams_frames(self, api, tmp_path):
+        """Test a nested response is parsed into typed DataFrame batches."""
+        from src.extract.api_extractor import APIExtractor
+        from src.utils.state_store import WatermarkStore
+        
+        base_url, _ = api
+        schema = {'id': 'int64', 'customer.name': 'string', 'customer.address.city': 'string'}
+        store = WatermarkStore(tmp_path / 'state.json')
+        with APIExtractor(
+            base_url, records_field='data.items', normalize=True, schema=schema,
+            state_store=store, watermark_field='updated'
+        ) as extractor:
+            batches = list(extractor.extract_batches(batch_size=10, endpoint='nested'))
+            extractor.commit()
+        
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        data = pd.concat(batches, ignore_index=True)
+        assert list(data.columns) == list(schema)
+        assert data['id'].tolist() == list(range(25))
+        assert str(data['customer.name'].dtype) == 'string'
+        assert pd.isna(data.loc[3, 'customer.address.city'])
+        assert store.get(extractor.state_key) == '2024-01-25'
+        assert extractor.bytes_read > 0
+    
+    def test_normalize_pages(self, api):
+        """Test paginated records are flattened without a schema."""
+        from src.extract.api_extractor import APIExtractor
+        from src.extract.pagination import PageNumberPagination
+        
+        base_url, _ = api
+        pagination = PageNumberPagination(page_size=10, total_field='total')
+        with APIExtractor(base_url, pagination=pagination, records_field='data', normalize=True) as extractor:
+            data = extractor.extract('pages')
+        
+        assert isinstance(data, pd.DataFrame)
+        assert data['id'].tolist() == list(range(25))
+
+
+class TestHTTPCache:
+    """Tests for APIExtractor's conditional HTTP cache against a local server."""
+    
+    @pytest.fixture
+    def api(self):
+        """Serve endpoints with different caching headers."""
+        import http.server
+        import json
+        import threading
+        
+        state = {'requests': [], 'version': 'v1'}
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                state['requests'].append((self.path, self.headers.get('If-None-Match')))
+                etag = f'"{state["version"]}"'
+                headers = {'ETag': etag, 'Cache-Control': 'max-age=0'}
+                if self.path == '/fresh':
+                    headers = {'Cache-Control': 'max-age=60'}
+                elif self.path == '/nostore':
+                    headers = {'ETag': etag, 'Cache-Control': 'no-store'}
+                elif self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                payload = json.dumps({'path': self.path, 'version': state['version'], 'pad': 'x' * 200}).encode('utf-8')
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_port}", state
+        server.shutdown()
+        server.server_close()
+    
+    def test_revalidation_and_freshness(self, api, tmp_path):
+        """Test stale entries are revalidated, fresh ones served without a request."""
+        from src.extract.api_extractor import APIExtractor
+        from src.utils.http_cache import HTTPCache
+        
+        base_url, state = api
+        cache = HTTPCache(tmp_path / 'http')
+        for _ in range(2):
+            with APIExtractor(base_url, http_cache=cache) as extractor:
+                first = extractor.extract('etag')
+                extractor.extract('fresh')
+                extractor.extract('nostore')
+        
+        assert first['version'] == 'v1'
+        assert state['requests'] == [
+            ('/etag', None), ('/fresh', None), ('/nostore', None),
+            ('/etag', '"v1"'), ('/nostore', None),
+        ]
+        assert cache.stats['hits'] == 1
+        assert cache.stats['revalidated'] == 1
+        assert cache.stats['misses'] == 4
+        
+        state['version'] = 'v2'
+        with APIExtractor(base_url, http_cache=cache) as extractor:
+            assert extractor.extract('etag')['version'] == 'v2'
+    
+    def test_lru_eviction(self, api, tmp_path):
+        """Test the least recently used response is evicted over the size cap."""
+        from src.extract.api_extractor import APIExtractor
+        from src.utils.http_cache import HTTPCache
+        
+        base_url, state = api
+        cache = HTTPCache(tmp_path / 'http', max_bytes=1000)
+        with APIExtractor(base_url, http_cache=cache) as extractor:
+            for endpoint in ('a', 'b', 'a', 'c', 'a', 'b'):
+                extractor.extract(endpoint)
+        
+        # Two entries fit: 'c' evicts 'b', which 'a' was used more recently than
+        assert state['requests'][3:] == [('/c', None), ('/a', '"v1"'), ('/b', None)]
+        assert cache.stats['evictions'] >= 1
+
+
+class TestJSONStream:
+    """Tests for incremental JSON record parsing."""
+    
+    def test_records_path_with_small_reads(self):
+        """Test records are found past sibling values split across reads."""
+        import io
+        import json
+        from src.extract.json_stream import _iter_records
+        
+        records = [{'id': i, 'value': 1234.5 * i, 'tags': ['a', '}'], 'text': 'é"]'} for i in range(50)]
+        document = {'skip': {'nested': [1, {'x': '['}]}, 'data': {'other': 12345, 'items': records}}
+        stream = io.BytesIO(json.dumps(document, ensure_ascii=False).encode('utf-8'))
+        
+        assert list(_iter_records(stream, ['data', 'items'], chunk_size=7)) == records
+    
+    @pytest.mark.parametrize('document, path, expected', [
+        ('[1, 2, 3]', [], [1, 2, 3]),
+        ('[]', [], []),
+        ('{"data": []}', ['data'], []),
+        ('{"other": [1]}', ['data'], []),
+        ('{"data": {"items": null}}', ['data', 'items'], []),
+    ])
+    def test_shapes(self, document, path, expected):
+        """Test top-level arrays, empty arrays and missing paths."""
+        import io
+        from src.extract.json_stream import _iter_records
+        
+        assert list(_iter_records(io.StringIO(document), path, chunk_size=2)) == expected
+    
+    def test_truncated_document(self):
+        """Test a body cut off mid-record raises."""
+        import io
+        from src.extract.json_stream import _iter_records
+        
+        with pytest.raises(ValueError):
+            list(_iter_records(io.StringIO('[{"id": 1}, {"id": '), [], chunk_size=4))
+    
+    def test_normalize_records(self):
+        """Test records are flattened to the schema's columns and dtypes."""
+        from src.extract.json_stream import normalize_records
+        
+        records = [{'id': 1, 'a': {'b': 2.5}, 'extra': 'x'}, {'id': 2}]
+        data = normalize_records(records, {'id': 'int64', 'a.b': 'float64'})
+        
+        assert list(data.columns) == ['id', 'a.b']
+        assert data['a.b'].iloc[0] == 2.5
+        assert pd.isna(data['a.b'].iloc[1])
+
+
+class TestAsyncAPIExtractor:
+    """Tests for AsyncAPIExtractor against a local server."""
+    
+    @pytest.fixture
+    def api(self):
+        """Serve ``/customers/<id>`` and an endpoint failing once with 503."""
+        pytest.importorskip('aiohttp')
+        import http.server
+        import json
+        import threading
+        
+        state = {'flaky': 0}
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                status, headers = 200, {}
+                if self.path.startswith('/customers/'):
+                    body = {'id': int(self.path.rsplit('/', 1)[-1])}
+                else:
+                    state['flaky'] += 1
+                    body = {'ok': state['flaky'] > 1}
+                    if state['flaky'] == 1:
+                        status, headers = 503, {'Retry-After': '0'}
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_port}", state
+        server.shutdown()
+        server.server_close()
+    
+    def test_extract_per_key(self, api):
+        """Test one request per key with results in key order."""
+        from src.extract.async_api_extractor import AsyncAPIExtractor
+        
+        base_url, _ = api
+        with AsyncAPIExtractor(base_url, concurrency=8) as extractor:
+            results = extractor.extract('customers/{key}', keys=range(200))
+        
+        assert [result['id'] for result in results] == list(range(200))
+        assert extractor.requests_made == 200
+    
+    def test_stream_batches_and_retry(self, api):
+        """Test streamed batches cover every key and 503s are retried."""
+        from src.extract.async_api_extractor import AsyncAPIExtractor
+        
+        base_url, state = api
+        with AsyncAPIExtractor(base_url, concurrency=4, backoff_factor=0) as extractor:
+            batches = list(extractor.extract_batches(batch_size=30, endpoint='customers/{key}', keys=iter(range(100))))
+            assert extractor.extract('flaky') == {'ok': True}
+        
+        assert [len(batch) for batch in batches] == [30, 30, 30, 10]
+        assert sorted(result['id'] for batch in batches for result in batch) == list(range(100))
+        assert state['flaky'] == 2
+    
+    def test_async_api(self, api):
+        """Test the coroutine API streams results on the caller's loop."""
+        import asyncio
+        from src.extract.async_api_extractor import AsyncAPIExtractor
+        
+        base_url, _ = api
+        
+        async def collect():
+            async with AsyncAPIExtractor(base_url, concurrency=16) as extractor:
+                return [key async for key, _ in extractor.stream_async('customers/{key}', range(50))]
+        
+        assert sorted(asyncio.run(collect())) == list(range(50))
+
+class TestParquetExtractor:
+    """Tests for ParquetExtractor."""
+    
+    @pytest.fixture
+    def parquet_file(self):
+        """Create a Parquet file with row groups of 10 rows."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        import pyarrow as pa
+        
+        df = pd.DataFrame({'id': range(50), 'name': [f'n{i}' for i in range(50)], 'value': range(0, 500, 10)})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'data.parquet'
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=10)
+            yield path
+    
+    def test_extract_columns_and_filters(self, parquet_file):
+        """Test projection and filters are applied on read."""
+        from src.extract.parquet_extractor import ParquetExtractor
+        
+        with ParquetExtractor(parquet_file) as extractor:
+            data = extractor.extract(columns=['id', 'value'], filters=[('id', '>=', 45)])
+        
+        assert list(data.columns) == ['id', 'value']
+        assert data['id'].tolist() == [45, 46, 47, 48, 49]
+    
+    def test_extract_batches_by_row_group(self, parquet_file):
+        """Test streaming yields only row groups whose statistics can match."""
+        from src.extract.parquet_extractor import ParquetExtractor
+        
+        with ParquetExtractor(parquet_file) as extractor:
+            batches = list(extractor.extract_batches(filters=[('id', '<', 15)], usecols=['id']))
+        
+        assert [len(batch) for batch in batches] == [10, 5]
+        assert list(batches[0].columns) == ['id']
+
+
+class TestDatabaseExtractor:
+    """Tests for DatabaseExtractor against SQLite."""
+    
+    @pytest.fixture
+    def db_url(self, tmp_path):
+        """Create a SQLite database with an events table of 1000 rows."""
+        from sqlalchemy import create_engine
+        
+        url = f"sqlite:///{tmp_path / 'source.db'}"
+        engine = create_engine(url)
+        pd.DataFrame({
+            'id': range(1000),
+            'day': pd.date_range('2024-01-01', periods=1000, freq='h'),
+            'kind': ['a', 'b'] * 500,
+            'value': [i * 0.5 for i in range(1000)],
+        }).to_sql('events', engine, index=False)
+        pd.DataFrame({'id': [None], 'day': [None], 'kind': ['n'], 'value': [0.0]}).to_sql(
+            'events', engine, index=False, if_exists='append'
+        )
+        engine.dispose()
+        return url
+    
+    def test_chunks_with_projection(self, db_url):
+        """Test batches stream in chunk_size rows with only the selected columns."""
+        from src.extract.database_extractor import DatabaseExtractor
+        
+        with DatabaseExtractor(db_url, 'events', columns=['id', 'kind']) as extractor:
+            batches = list(extractor.extract_batches(batch_size=300))
+        
+        assert [len(batch) for batch in batches] == [300, 300, 300, 101]
+        assert list(batches[0].columns) == ['id', 'kind']
+    
+    @pytest.mark.parametrize('column', ['id', 'day'])
+    def test_partitioned_read(self, db_url, column):
+        """Test key range partitions read every row once, NULL keys included."""
+        from src.extract.database_extractor import DatabaseExtractor
+        
+        with DatabaseExtractor(db_url, 'events', partition_column=column, partitions=4) as extractor:
+            data = extractor.extract()
+            batches = list(extractor.extract_batches(batch_size=100))
+        
+        assert len(data) == 1001
+        assert data['id'].dropna().is_monotonic_increasing
+        streamed = pd.concat(batches)
+        assert len(streamed) == 1001
+        assert sorted(streamed['id'].dropna()) == list(range(1000))
+    
+    def test_query_with_params_and_pushdown(self, db_url):
+        """Test a query source, bound parameters, usecols and chunk_transform."""
+        from src.extract.database_extractor import DatabaseExtractor
+        
+        extractor = DatabaseExtractor(
+            db_url, query="SELECT * FROM events WHERE kind = :kind", where="value < :limit",
+            params={'kind': 'a', 'limit': 100}, chunk_size=7, partition_column='id', partitions=3
+        )
+        with extractor:
+            data = extractor.extract(usecols=['id', 'value'], chunk_transform=lambda chunk: chunk[chunk['id'] % 4 == 0])
+        
+        assert list(data.columns) == ['id', 'value']
+        assert data['id'].tolist() == list(range(0, 200, 4))
+    
+    def test_split_range(self):
+        """Test numeric, date and narrow ranges are split into contiguous parts."""
+        from datetime import date
+        from src.extract.database_extractor import split_range
+        
+        assert split_range(0, 10, 4) == [(0, 2), (2, 5), (5, 7), (7, 10)]
+        assert split_range(5, 6, 4) == [(5, 6)]
+        assert split_range(date(2024, 1, 1), date(2024, 1, 5), 2) == [
+            (date(2024, 1, 1), date(2024, 1, 3)), (date(2024, 1, 3), date(2024, 1, 5))
+        ]
+        with pytest.raises(TypeError):
+            split_range(b'a', b'z', 2)
+        with pytest.raises(TypeError, match="not dates"):
+            split_range('alice', 'zoe', 2)
@@ -0,0 +1,309 @@
+"""Unit tests for loaders."""
+import pytest
+import pandas as pd
+from pathlib import Path
+import tempfile
+
+from src.load.csv_loader import CSVLoader
+from src.load.database_loader import DatabaseLoader
+from src.load.encoding import CSV, SharedEncodings, encode_csv, split_rows
+
+
+class TestDatabaseLoader:
+    """Tests for DatabaseLoader."""
+    
+    @pytest.fixture
+    def db_url(self):
+        """Create a temporary SQLite database URL."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield f"sqlite:///{Path(tmpdir) / 'test.db'}"
+    
+    @pytest.fixture
+    def sample_df(self):
+        """Create sample DataFrame with missing values."""
+        return pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'name': ['alice', 'bob', None, 'dave', 'eve'],
+            'score': [1.5, None, 3.0, 4.5, 5.0]
+        })
+    
+    @pytest.mark.parametrize('method', ['to_sql', 'executemany', 'multi_values', 'auto'])
+    def test_insert_methods(self, db_url, sample_df, method):
+        """Test every insert method writes the same rows."""
+        loader = DatabaseLoader(db_url, 'scores', batch_size=2, insert_method=method)
+        with loader:
+            loader.load(sample_df)
+            loader.load(sample_df)
+            result = pd.read_sql_table('scores', loader.engine)
+        
+        expected = pd.concat([sample_df, sample_df], ignore_index=True)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    
+    def test_batch_size_from_config(self, db_url, sample_df):
+        """Test load-section options are consumed instead of passed to to_sql."""
+        config = {'batch_size': 3, 'if_exists': 'replace', 'insert_method': 'multi_values'}
+        loader = DatabaseLoader(db_url, 'scores', config=config)
+        with loader:
+            loader.load(sample_df)
+            loader.load(sample_df)
+            count = len(pd.read_sql_table('scores', loader.engine))
+        
+        assert loader.batch_size == 3
+        assert count == len(sample_df)
+    
+    def test_copy_requires_postgresql(self, db_url, sample_df):
+        """Test COPY is rejected on dialects that do not support it."""
+        loader = DatabaseLoader(db_url, 'scores', insert_method='copy')
+        with loader:
+            with pytest.raises(ValueError, match="COPY"):
+                loader.load(sample_df)
+    
+    def test_unknown_insert_method(self, db_url):
+        """Test an unsupported insert method is rejected."""
+        with pytest.raises(ValueError, match="Unknown insert method"):
+            DatabaseLoader(db_url, 'scores', insert_method='bcp')
+    
+    @pytest.mark.parametrize('method', ['executemany', 'multi_values'])
+    def test_merge_upserts_on_keys(self, db_url, method):
+        """Test merge mode updates existing keys and inserts new ones."""
+        initial = pd.DataFrame({'id': [1, 2, 3], 'value': ['a', 'b', 'c']})
+        changes = pd.DataFrame({'id': [2, 4, 4], 'value': ['B', 'd', 'D']})
+        
+        loader = DatabaseLoader(db_url, 'items', key_columns=['id'], insert_method=method)
+        with loader:
+            loader.load(initial, if_exists='merge')
+            loader.load(changes, if_exists='merge')
+            result = pd.read_sql_query('SELECT * FROM items ORDER BY id', loader.engine)
+        
+        assert result['id'].tolist() == [1, 2, 3, 4]
+        assert result['value'].tolist() == ['a', 'B', 'c', 'D']
+    
+    def test_merge_streaming_batches(self, db_url):
+        """Test merge configured in the load section applies to every batch."""
+        loader = DatabaseLoader(db_url, 'items', config={'if_exists': 'merge', 'key_columns': ['id']})
+        with loader:
+            loader.load_batch(pd.DataFrame({'id': [1, 2], 'value': [10, 20]}), first=True)
+            loader.load_batch(pd.DataFrame({'id': [2, 3], 'value': [21, 30]}))
+            result = pd.read_sql_query('SELECT * FROM items ORDER BY id', loader.engine)
+        
+        assert result.values.tolist() == [[1, 10], [2, 21], [3, 30]]
+    
+    def test_merge_requires_unique_key(self, db_url):
+        """Test merge into an existing table without a unique key leaves its schema alone."""
+        from sqlalchemy import inspect
+        
+        loader = DatabaseLoader(db_url, 'items', key_columns=['id'])
+        with loader:
+            pd.DataFrame({'id': [1, 1], 'value': ['a', 'b']}).to_sql('items', loader.engine, index=False)
+            with pytest.raises(ValueError, match="create_key_index"):
+                loader.load(pd.DataFrame({'id': [1], 'value': ['c']}), if_exists='merge')
+            assert inspect(loader.engine).get_indexes('items') == []
+    
+    def test_merge_uses_existing_primary_key(self, db_url):
+        """Test merge relies on an existing primary key, or creates an index when asked to."""
+        from sqlalchemy import inspect
+        
+        loader = DatabaseLoader(db_url, 'items', key_columns=['id'])
+        with loader:
+            with loader.engine.begin() as conn:
+                conn.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+                conn.exec_driver_sql("CREATE TABLE other (id INTEGER, value TEXT)")
+            loader.load(pd.DataFrame({'id': [1, 2], 'value': ['a', 'b']}), if_exists='merge')
+            loader.load(pd.DataFrame({'id': [2], 'value': ['B']}), if_exists='merge')
+            result = pd.read_sql_query('SELECT * FROM items ORDER BY id', loader.engine)
+            assert inspect(loader.engine).get_indexes('items') == []
+            
+            opted_in = DatabaseLoader(db_url, 'other', config={'key_columns': ['id'], 'create_key_index': True})
+            opted_in.engine = loader.engine
+            opted_in.load(pd.DataFrame({'id': [1], 'value': ['a']}), if_exists='merge')
+            assert [bool(index['unique']) for index in inspect(loader.engine).get_indexes('other')] == [True]
+        
+        assert result.values.tolist() == [[1, 'a'], [2, 'B']]
+    
+    def test_merge_requires_key_columns(self, db_url, sample_df):
+        """Test merge mode without key columns is rejected."""
+        loader = DatabaseLoader(db_url, 'scores')
+        with loader:
+            with pytest.raises(ValueError, match="key_columns"):
+                loader.load(sample_df, if_exists='merge')
+
+
+class TestParquetLoader:
+    """Tests for ParquetLoader."""
+    
+    def test_load_batches_roundtrip(self):
+        """Test streamed batches become row groups of one compressed file."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        from src.load.parquet_loader import ParquetLoader
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'out' / 'data.parquet'
+            loader = ParquetLoader(path, compression='zstd')
+            with loader:
+                loader.load_batch(pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']}), first=True)
+                loader.load_batch(pd.DataFrame({'id': [3], 'name': ['c']}))
+            
+            parquet_file = pq.ParquetFile(path)
+            result = parquet_file.read().to_pandas()
+            
+            assert parquet_file.metadata.num_row_groups == 2
+            assert parquet_file.metadata.row_group(0).column(0).compression == 'ZSTD'
+            assert result['id'].tolist() == [1, 2, 3]
+
+
+class TestCSVLoader:
+    """Tests for CSVLoader output layouts."""
+    
+    @pytest.fixture
+    def data(self):
+        return pd.DataFrame({
+            'id': range(8),
+            'country': ['DE', 'FR', 'DE', None, 'FR', 'DE', 'a/b', 'DE'],
+            'amount': [1.5, 2.0, 3.25, 4.0, 5.0, 6.0, 7.0, 8.0],
+        })
+    
+    @staticmethod
+    def _read_tree(root):
+        files = sorted(root.rglob('part-*.csv*'))
+        frames = [pd.read_csv(path).assign(partition=path.parent.name) for path in files]
+        return files, pd.concat(frames, ignore_index=True).sort_values('id', ignore_index=True)
+    
+    def test_stream_is_committed_on_disconnect(self, data, tmp_path):
+        """Test readers never see a partially streamed file."""
+        path = tmp_path / 'out.csv'
+        path.write_text('old\n')
+        with CSVLoader(path) as loader:
+            loader.load_batch(data.head(3), first=True)
+            loader.load_batch(data.tail(5))
+            assert path.read_text() == 'old\n'
+            assert (tmp_path / '.out.csv.tmp').exists()
+        
+        assert pd.read_csv(path)['id'].tolist() == list(range(8))
+        assert loader.bytes_written == path.stat().st_size
+        assert not (tmp_path / '.out.csv.tmp').exists()
+    
+    def test_failed_load_keeps_previous_file(self, data, tmp_path):
+        """Test a failing write leaves the old file and no temporary file."""
+        path = tmp_path / 'out.csv'
+        path.write_text('old\n')
+        with CSVLoader(path) as loader:
+            with pytest.raises(TypeError):
+                loader.load(data, no_such_option=True)
+        
+        assert path.read_text() == 'old\n'
+        assert list(tmp_path.iterdir()) == [path]
+    
+    def test_partitioned_shards(self, data, tmp_path):
+        """Test Hive-style partitions split into compressed shards, replaced on the next load."""
+        root = tmp_path / 'out'
+        with CSVLoader(root, partition_by=['country'], shards=2, compression='gzip', file_workers=4) as loader:
+            loader.load(data)
+            files, result = self._read_tree(root)
+            
+            assert all(path.name.endswith('.csv.gz') for path in files)
+            assert len(files) == 6  # DE and FR in 2 shards each, single rows in 1
+            assert sorted({path.parent.name for path in files}) == [
+                'country=DE', 'country=FR', 'country=__HIVE_DEFAULT_PARTITION__', 'country=a%2Fb'
+            ]
+            assert list(result.columns) == ['id', 'amount', 'partition']
+            assert result['id'].tolist() == list(range(8))
+            
+            loader.load(data[data['country'] == 'DE'])
+        
+        files, result = self._read_tree(root)
+        assert result['id'].tolist() == [0, 2, 5, 7]
+        assert sorted(path.name for path in root.iterdir()) == ['country=DE']
+    
+    def test_append(self, data, tmp_path):
+        """Test appending writes one header to a single file and adds files to a tree."""
+        path = tmp_path / 'out.csv.gz'
+        with CSVLoader(path, if_exists='append') as loader:
+            loader.load(data.head(2))
+            loader.load(data.tail(2))
+        assert pd.read_csv(path)['id'].tolist() == [0, 1, 6, 7]
+        
+        root = tmp_path / 'tree'
+        with CSVLoader(root, config={'shards': 2, 'if_exists': 'append'}) as loader:
+            loader.load(data.head(4))
+            loader.load(data.tail(4))
+        files, result = self._read_tree(root)
+        assert len(files) == 4
+        assert result['id'].tolist() == list(range(8))
+    
+    def test_stream_resumes_from_position(self, data, tmp_path):
+        """Test a failed partitioned stream continues from its checkpointed position."""
+        root = tmp_path / 'out'
+        with pytest.raises(IOError):
+            with CSVLoader(root, partition_by=['country']) as loader:
+                loader.load_batch(data.head(3), first=True)
+                position = loader.stream_position()
+                loader.load_batch(data.iloc[3:5])
+                raise IOError("crashed")
+        assert not list(root.rglob('part-*'))
+        
+        loader = CSVLoader(root, partition_by=['country'])
+        with loader:
+            assert loader.restore_stream_position(position)
+            loader.load_batch(data.iloc[5:])
+        
+        files, result = self._read_tree(root)
+        assert result['id'].tolist() == [0, 1, 2, 5, 6, 7]
+        assert not list(root.rglob('.*.tmp'))
+    
+    def test_zstd(self, data, tmp_path):
+        """Test zstd output written through the streaming compressor."""
+        pytest.importorskip('zstandard')
+        path = tmp_path / 'out.csv.zst'
+        with CSVLoader(path) as loader:
+            loader.load(data)
+        assert pd.read_csv(path)['id'].tolist() == list(range(8))
+    
+    def test_invalid_options(self, tmp_path):
+        """Test unknown codecs and modes are rejected."""
+        with pytest.raises(ValueError, match="compression"):
+            CSVLoader(tmp_path / 'out.csv', compression='lzma')
+        with pytest.raises(ValueError, match="if_exists"):
+            CSVLoader(tmp_path / 'out.csv', if_exists='merge')
+
+
+class TestSharedEncodings:
+    """Tests for encoded forms shared between loaders."""
+    
+    def test_split_rows(self):
+        """Test encoded rows split into batches, or stay whole around embedded newlines."""
+        data = pd.DataFrame({'id': range(5), 'text': ['a', 'b', 'c,d', 'e', 'f']})
+        body = encode_csv(data)
+        
+        batches = [bytes(rows) for rows in split_rows(body, len(data), 2)]
+        assert batches == [encode_csv(data.iloc[i:i + 2]) for i in (0, 2, 4)]
+        assert split_rows(encode_csv(data.head(0)), 0, 2) == []
+        
+        data.loc[1, 'text'] = 'line\nbreak'
+        assert [bytes(rows) for rows in split_rows(encode_csv(data), len(data), 2)] == [encode_csv(data)]
+    
+    def test_csv_loader_writes_shared_rows(self, tmp_path):
+        """Test CSVLoader output from the shared form matches to_csv()."""
+        data = pd.DataFrame({'id': [1, 2], 'name': ['x "y"', None], 'when': pd.to_datetime(['2024-01-01', None])})
+        encodings = SharedEncodings([CSV])
+        loaders = [CSVLoader(tmp_path / 'a.csv'), CSVLoader(tmp_path / 'b.csv', config={'sep': ';'})]
+        assert [loader.encoded_forms() for loader in loaders] == [(CSV,), ()]
+        
+        for loader in loaders:
+            loader.encodings = encodings
+            with loader:
+                loader.load_batch(data, first=True)
+                loader.load_batch(data)
+        
+        assert encodings.stats == {'encoded': 1, 'reused': 1}
+        assert (tmp_path / 'a.csv').read_text() == data.to_csv(index=False) + data.to_csv(index=False, header=False)
+        assert (tmp_path / 'b.csv').read_text() == (
+            data.to_csv(index=False, sep=';') + data.to_csv(index=False, header=False, sep=';')
+        )
+    
+    def test_database_loader_forms(self):
+        """Test only COPY loaders declare the CSV form."""
+        assert DatabaseLoader('postgresql://host/db', 't').encoded_forms() == (CSV,)
+        assert DatabaseLoader('postgresql://host/db', 't', insert_method='executemany').encoded_forms() == ()
+        assert DatabaseLoader('sqlite:///x.db', 't').encoded_forms() == ()
+        merge = {'if_exists': 'merge', 'key_columns': ['id']}
+        assert DatabaseLoader('postgresql://host/db', 't', config=merge).encoded_forms() == ()
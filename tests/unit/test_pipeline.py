@@ -0,0 +1,506 @@
+"""Unit tests for pipeline orchestration."""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.extract.base import BaseExtractor
+from src.extract.csv_extractor import CSVExtractor
+from src.load.csv_loader import CSVLoader
+from src.load.database_loader import DatabaseLoader
+from src.dag import DAGScheduler
+from src.pipeline import ETLPipeline, PipelineStep
+from src.transform.base import DataFrameTransformer
+
+
+class StaticExtractor(BaseExtractor):
+    """Extractor returning a fixed value after an optional delay."""
+    
+    def __init__(self, value, delay: float = 0.0, error: Exception = None):
+        super().__init__()
+        self.value = value
+        self.delay = delay
+        self.error = error
+    
+    def connect(self) -> None:
+        pass
+    
+    def extract(self, **kwargs):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.value
+    
+    def disconnect(self) -> None:
+        pass
+
+
+class TestConcurrentExtract:
+    """Tests for concurrent extraction of multiple sources."""
+    
+    def test_results_keep_registration_order(self):
+        """Test concurrent results are ordered like the extractors."""
+        pipeline = ETLPipeline(config={'extract': {'max_workers': 3}})
+        for value, delay in [('a', 0.2), ('b', 0.0), ('c', 0.1)]:
+            pipeline.add_extractor(StaticExtractor(value, delay))
+        
+        start = time.perf_counter()
+        result = pipeline.run()
+        elapsed = time.perf_counter() - start
+        
+        assert result == ['a', 'b', 'c']
+        assert elapsed < 0.3
+    
+    def test_first_failure_is_raised(self):
+        """Test a failing extractor aborts the run with its exception."""
+        pipeline = ETLPipeline(config={'extract': {'max_workers': 2}})
+        pipeline.add_extractor(StaticExtractor('a', 0.05))
+        pipeline.add_extractor(StaticExtractor('b', error=ValueError("boom")))
+        pipeline.add_extractor(StaticExtractor('c', 0.05))
+        
+        with pytest.raises(ValueError, match="boom"):
+            pipeline.run()
+    
+    def test_unknown_executor(self):
+        """Test an unsupported executor name is rejected."""
+        pipeline = ETLPipeline(config={'extract': {'max_workers': 2, 'executor': 'fiber'}})
+        pipeline.add_extractor(StaticExtractor('a'))
+        pipeline.add_extractor(StaticExtractor('b'))
+        
+        with pytest.raises(ValueError, match="Unknown executor"):
+            pipeline.run()
+    
+    def test_process_executor_commits_watermarks(self, tmp_path):
+        """Test watermarks reached in worker processes are committed by the parent."""
+        from src.utils.state_store import WatermarkStore
+        
+        store = WatermarkStore(tmp_path / 'state.json')
+        pipeline = ETLPipeline(config={'extract': {'max_workers': 2, 'executor': 'process'}})
+        for name, ids in [('a', [1, 2]), ('b', [5, 6, 7])]:
+            path = tmp_path / f'{name}.csv'
+            pd.DataFrame({'id': ids}).to_csv(path, index=False)
+            pipeline.add_extractor(CSVExtractor(path, state_store=store, watermark_column='id', state_key=name))
+        
+        result = pipeline.run()
+        
+        assert [frame['id'].tolist() for frame in result] == [[1, 2], [5, 6, 7]]
+        assert store.get('a') == 2
+        assert store.get('b') == 7
+
+
+class BarrierLoader(CSVLoader):
+    """CSVLoader whose loads wait until ``barrier`` has all its parties."""
+    
+    def __init__(self, output_path, barrier):
+        super().__init__(output_path)
+        self.barrier = barrier
+        self.encodings_seen = []
+    
+    def load(self, data, **kwargs):
+        self.barrier.wait()
+        self.encodings_seen.append(self.encodings)
+        super().load(data, **kwargs)
+
+
+class TestConcurrentLoad:
+    """Tests for loading into several loaders at once."""
+    
+    @pytest.fixture
+    def data(self):
+        return pd.DataFrame({'id': range(7), 'name': ['a', 'b,c', None, 'd"e', 'f', 'g', 'h'], 'x': [0.5] * 7})
+    
+    def test_loaders_share_one_encoding(self, data, tmp_path):
+        """Test loaders run concurrently and the CSV rows are encoded once."""
+        barrier = threading.Barrier(2, timeout=5)
+        loaders = [BarrierLoader(tmp_path / f'{name}.csv', barrier) for name in 'ab']
+        pipeline = ETLPipeline(config={'load': {'max_workers': 2}})
+        pipeline.add_extractor(StaticExtractor(data))
+        for loader in loaders:
+            pipeline.add_loader(loader)
+        
+        pipeline.run()
+        
+        encodings = loaders[0].encodings_seen[0]
+        assert loaders[1].encodings_seen == [encodings]
+        assert encodings.stats == {'encoded': 1, 'reused': 1}
+        assert all(loader.encodings is None for loader in loaders)
+        expected = data.to_csv(index=False)
+        for name in 'ab':
+            assert (tmp_path / f'{name}.csv').read_text() == expected
+    
+    @pytest.mark.parametrize('execution', ['streaming', 'pipelined'])
+    def test_streamed_batches(self, data, tmp_path, execution):
+        """Test every batch reaches all loaders when they load concurrently."""
+        pipeline = ETLPipeline(config={
+            'pipeline': {'execution': execution},
+            'extract': {'batch_size': 3},
+            'load': {'max_workers': 2},
+        })
+        source = tmp_path / 'input.csv'
+        data.to_csv(source, index=False)
+        pipeline.add_extractor(CSVExtractor(source))
+        pipeline.add_loader(CSVLoader(tmp_path / 'a.csv'))
+        pipeline.add_loader(CSVLoader(tmp_path / 'b.csv'))
+        
+        assert pipeline.run() == 7
+        for name in 'ab':
+            assert (tmp_path / f'{name}.csv').read_text() == source.read_text()
+
+
+class TestRunReport:
+    """Tests for per-stage run metrics."""
+    
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        path = tmp_path / 'input.csv'
+        pd.DataFrame({
+            'id': [1, 2, 2, 3, None],
+            'value': [10, 20, 20, 30, 40],
+        }).to_csv(path, index=False)
+        return path
+    
+    def _pipeline(self, csv_file, tmp_path, config=None):
+        transformer = DataFrameTransformer().drop_na().drop_duplicates()
+        return (
+            ETLPipeline('report', config=config)
+            .add_extractor(CSVExtractor(csv_file))
+            .add_transformer(transformer)
+            .add_loader(CSVLoader(tmp_path / 'output.csv'))
+        )
+    
+    def test_batch_report(self, csv_file, tmp_path):
+        """Test every extractor, step and loader is reported."""
+        data, report = self._pipeline(csv_file, tmp_path).run_with_report()
+        
+        extract = report.stage('extract', 'CSVExtractor[0]')
+        assert extract.rows_out == 5
+        assert extract.bytes_read == csv_file.stat().st_size
+        assert report.stage('transform', 'DataFrameTransformer[0]').rows_out == 3
+        drop_na = report.stage('transform_step', 'DataFrameTransformer[0]/0:drop_na')
+        assert (drop_na.rows_in, drop_na.rows_out) == (5, 4)
+        assert report.stage('transform_step', 'DataFrameTransformer[0]/1:drop_duplicates').rows_out == 3
+        load = report.stage('load', 'CSVLoader[0]')
+        assert load.rows_in == 3
+        assert load.bytes_written == (tmp_path / 'output.csv').stat().st_size
+        assert report.process_peak_rss_bytes > 0
+        assert report.status == 'success'
+        assert len(data) == 3
+    
+    def test_streaming_report_counts_batches(self, csv_file, tmp_path):
+        """Test streaming metrics accumulate over batches."""
+        config = {'pipeline': {'execution': 'streaming'}, 'extract': {'batch_size': 2}}
+        pipeline = self._pipeline(csv_file, tmp_path, config)
+        pipeline.run()
+        
+        report = pipeline.last_report
+        extract = report.stage('extract', 'CSVExtractor[0]')
+        assert (extract.batches, extract.rows_out) == (3, 5)
+        assert report.stage('load', 'CSVLoader[0]').batches == 3
+    
+    def test_failed_run_is_exported(self, tmp_path):
+        """Test a failing run still writes its report."""
+        config = {'metrics': {
+            'json_path': str(tmp_path / 'report.json'),
+            'prometheus_path': str(tmp_path / 'metrics.prom'),
+        }}
+        pipeline = ETLPipeline('failing', config=config)
+        pipeline.add_extractor(StaticExtractor('a', error=ValueError("boom")))
+        
+        with pytest.raises(ValueError):
+            pipeline.run()
+        
+        assert pipeline.last_report.status == 'failed'
+        assert '"error": "boom"' in (tmp_path / 'report.json').read_text()
+        assert 'etl_run_success{pipeline="failing"} 0' in (tmp_path / 'metrics.prom').read_text()
+
+
+class TestDAG:
+    """Tests for DAG execution of named steps."""
+    
+    def test_branches_run_concurrently(self):
+        """Test independent branches overlap and sink results are returned."""
+        def slow(suffix):
+            def run(value):
+                time.sleep(0.2)
+                return value + suffix
+            return run
+        
+        pipeline = ETLPipeline(config={'pipeline': {'max_workers': 2}})
+        pipeline \
+            .add_step(PipelineStep('source', lambda: 'x')) \
+            .add_step(PipelineStep('left', slow('l'), depends_on=['source'])) \
+            .add_step(PipelineStep('right', slow('r'), depends_on=['source']))
+        
+        start = time.perf_counter()
+        result = pipeline.run()
+        elapsed = time.perf_counter() - start
+        
+        assert result == {'left': 'xl', 'right': 'xr'}
+        assert elapsed < 0.35
+        assert pipeline.last_report.stage('step', 'left').duration_seconds >= 0.2
+    
+    def test_skip_drops_downstream_steps(self):
+        """Test a skipped step skips its descendants but not other branches."""
+        def broken(value):
+            raise ValueError("bad branch")
+        
+        scheduler = DAGScheduler()
+        result = scheduler.run([
+            PipelineStep('source', lambda: 1),
+            PipelineStep('broken', broken, on_error='skip', depends_on=['source']),
+            PipelineStep('after', lambda value: value, depends_on=['broken']),
+            PipelineStep('ok', lambda value: value + 1, depends_on=['source']),
+        ])
+        
+        assert result == {'ok': 2}
+        assert scheduler.skipped == {'broken', 'after'}
+        assert [step.name for step in scheduler.committable()] == ['ok']
+    
+    def test_retry_until_success(self):
+        """Test a retrying step is called again after failures."""
+        calls = []
+        
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise IOError("temporarily unavailable")
+            return 'done'
+        
+        result = DAGScheduler().run([PipelineStep('flaky', flaky, on_error='retry', retries=2)])
+        
+        assert result == {'flaky': 'done'}
+        assert len(calls) == 3
+    
+    def test_fail_aborts_run(self):
+        """Test a failing step raises and downstream steps never run."""
+        ran = []
+        
+        def broken():
+            raise ValueError("boom")
+        
+        pipeline = ETLPipeline()
+        pipeline \
+            .add_step(PipelineStep('broken', broken, on_error='retry', retries=1)) \
+            .add_step(PipelineStep('after', ran.append, depends_on=['broken']))
+        
+        with pytest.raises(ValueError, match="boom"):
+            pipeline.run()
+        assert ran == []
+        assert pipeline.last_report.status == 'failed'
+    
+    @pytest.mark.parametrize('steps, message', [
+        ([PipelineStep('a', print, depends_on=['b']), PipelineStep('b', print, depends_on=['a'])], 'cycle'),
+        ([PipelineStep('a', print, depends_on=['missing'])], 'unknown step'),
+        ([PipelineStep('a', print), PipelineStep('a', print)], 'Duplicate'),
+        ([PipelineStep('a', print, on_error='ignore')], 'Unknown on_error'),
+    ])
+    def test_invalid_graph(self, steps, message):
+        """Test malformed graphs are rejected before anything runs."""
+        with pytest.raises(ValueError, match=message):
+            DAGScheduler().run(steps)
+    
+    def test_intermediate_results_released(self):
+        """Test a result is dropped once all of its consumers have finished."""
+        scheduler = DAGScheduler(max_workers=1)
+        held = []
+        
+        def check(value):
+            held.append(sorted(scheduler._results))
+            return value
+        
+        scheduler.run([
+            PipelineStep('source', lambda: 1),
+            PipelineStep('middle', check, depends_on=['source']),
+            PipelineStep('sink', check, depends_on=['middle']),
+        ])
+        
+        assert held == [['source'], ['middle']]
+
+
+class FlakyLoader(CSVLoader):
+    """CSVLoader failing on the given batch, or on load() when ``fail_batch`` is -1."""
+    
+    def __init__(self, output_path, fail_batch=None):
+        super().__init__(output_path)
+        self.fail_batch = fail_batch
+        self.batches = []
+    
+    def load(self, data, **kwargs):
+        if self.fail_batch == -1:
+            raise IOError("destination unavailable")
+        super().load(data, **kwargs)
+    
+    def load_batch(self, data, first=False, **kwargs):
+        if len(self.batches) == self.fail_batch:
+            self.batches.append(None)
+            raise IOError("destination unavailable")
+        self.batches.append(data['id'].tolist())
+        super().load_batch(data, first=first, **kwargs)
+
+
+class FlakyDatabaseLoader(DatabaseLoader):
+    """DatabaseLoader failing on batch ``fail_batch``, before or after committing it."""
+    
+    def __init__(self, *args, committed: bool = False, fail_batch: int = 2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.committed = committed
+        self.fail_batch = fail_batch
+    
+    def load_batch(self, data, first=False, **kwargs):
+        super().load_batch(data, first=first, **kwargs)
+        if self.committed and self._batches - 1 == self.fail_batch:
+            raise IOError("lost connection after commit")
+    
+    def _record_progress(self, conn, batches):
+        super()._record_progress(conn, batches)
+        if not self.committed and batches - 1 == self.fail_batch:
+            raise IOError("lost connection")
+
+
+class TestCheckpoints:
+    """Tests for resuming failed runs from checkpoints."""
+    
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        path = tmp_path / 'input.csv'
+        pd.DataFrame({'id': range(10), 'value': range(0, 100, 10)}).to_csv(path, index=False)
+        return path
+    
+    def _pipeline(self, csv_file, loaders, config=None):
+        config = {'checkpoint': {'directory': str(csv_file.parent / 'checkpoints')}, **(config or {})}
+        pipeline = ETLPipeline('resumable', config=config)
+        pipeline.add_extractor(CSVExtractor(csv_file))
+        pipeline.add_transformer(DataFrameTransformer().drop_na())
+        for loader in loaders:
+            pipeline.add_loader(loader)
+        return pipeline
+    
+    def test_batch_resume_skips_finished_stages(self, csv_file, tmp_path):
+        """Test a resumed batch run only repeats the loaders that failed."""
+        first, second = CSVLoader(tmp_path / 'a.csv'), FlakyLoader(tmp_path / 'b.csv', fail_batch=-1)
+        with pytest.raises(IOError):
+            self._pipeline(csv_file, [first, second]).run()
+        
+        second.fail_batch = None
+        pipeline = self._pipeline(csv_file, [first, second])
+        (tmp_path / 'a.csv').unlink()
+        data = pipeline.resume()
+        
+        assert len(data) == 10
+        assert pipeline.last_report.stages[0].stage == 'load'
+        assert not (tmp_path / 'a.csv').exists()
+        assert len(pd.read_csv(tmp_path / 'b.csv')) == 10
+        assert not (tmp_path / 'checkpoints' / 'resumable').exists()
+    
+    def test_concurrent_failure_checkpoints_other_loaders(self, csv_file, tmp_path):
+        """Test loaders running beside a failed one finish and are not repeated."""
+        config = {'load': {'max_workers': 2}}
+        first, second = FlakyLoader(tmp_path / 'a.csv', fail_batch=-1), CSVLoader(tmp_path / 'b.csv')
+        with pytest.raises(IOError):
+            self._pipeline(csv_file, [first, second], config).run()
+        assert len(pd.read_csv(tmp_path / 'b.csv')) == 10
+        
+        first.fail_batch = None
+        (tmp_path / 'b.csv').unlink()
+        self._pipeline(csv_file, [first, second], config).resume()
+        
+        assert len(pd.read_csv(tmp_path / 'a.csv')) == 10
+        assert not (tmp_path / 'b.csv').exists()
+    
+    def test_list_output_checkpointed_as_one_file(self, tmp_path):
+        """Test a single extractor's list of records is not split into one file per record."""
+        from src.transform.base import BaseTransformer
+        
+        class RecordsToFrame(BaseTransformer):
+            def transform(self, data):
+                return pd.DataFrame(data)
+        
+        records = [{'id': i} for i in range(50)]
+        loader = FlakyLoader(tmp_path / 'out.csv', fail_batch=-1)
+        config = {'checkpoint': {'directory': str(tmp_path / 'checkpoints')}}
+        
+        def pipeline():
+            return ETLPipeline('records', config=config) \
+                .add_extractor(StaticExtractor(records)) \
+                .add_transformer(RecordsToFrame()) \
+                .add_loader(loader)
+        
+        with pytest.raises(IOError):
+            pipeline().run()
+        files = sorted(path.name for path in (tmp_path / 'checkpoints' / 'records').iterdir())
+        assert files == ['extract-0.pkl', 'manifest.json', 'transform-0.parquet']
+        
+        loader.fail_batch = None
+        assert len(pipeline().resume()) == 50
+    
+    def test_changed_input_invalidates_checkpoint(self, csv_file, tmp_path):
+        """Test a checkpoint is not reused once the source file changes."""
+        loader = FlakyLoader(tmp_path / 'out.csv', fail_batch=-1)
+        with pytest.raises(IOError):
+            self._pipeline(csv_file, [loader]).run()
+        
+        pd.DataFrame({'id': [1], 'value': [1]}).to_csv(csv_file, index=False)
+        loader.fail_batch = None
+        pipeline = self._pipeline(csv_file, [loader])
+        assert len(pipeline.resume()) == 1
+        assert pipeline.last_report.stage('extract', 'CSVExtractor[0]').rows_out == 1
+    
+    @pytest.mark.parametrize('execution', ['streaming', 'pipelined'])
+    def test_stream_resumes_after_loaded_batches(self, csv_file, tmp_path, execution):
+        """Test batches written before a failure are not loaded again."""
+        config = {'pipeline': {'execution': execution}, 'extract': {'batch_size': 3}}
+        loader = FlakyLoader(tmp_path / 'out.csv', fail_batch=2)
+        with pytest.raises(IOError):
+            self._pipeline(csv_file, [loader], config).run()
+        
+        loader.fail_batch = None
+        loader.batches = []
+        rows = self._pipeline(csv_file, [loader], config).resume()
+        
+        assert rows == 4
+        assert loader.batches == [[6, 7, 8], [9]]
+        assert pd.read_csv(tmp_path / 'out.csv')['id'].tolist() == list(range(10))
+    
+    @pytest.mark.parametrize('committed', [False, True])
+    def test_stream_resumes_into_database(self, csv_file, tmp_path, committed):
+        """Test a resumed stream writes each batch to the database exactly once."""
+        config = {'pipeline': {'execution': 'streaming'}, 'extract': {'batch_size': 3}}
+        loader = FlakyDatabaseLoader(f"sqlite:///{tmp_path / 'out.db'}", 'items', committed=committed)
+        with pytest.raises(IOError):
+            self._pipeline(csv_file, [loader], config).run()
+        
+        loader.fail_batch = None
+        assert self._pipeline(csv_file, [loader], config).resume() == 4
+        
+        with loader:
+            ids = pd.read_sql('SELECT id FROM items', loader.engine)['id'].tolist()
+        assert ids == list(range(10))
+    
+    def test_stream_resume_rebuilds_dedup_state(self, csv_file, tmp_path):
+        """Test a deduplicator reused for the resume only remembers replayed batches."""
+        from src.transform.dedup import StreamingDeduplicator
+        
+        config = {
+            'checkpoint': {'directory': str(tmp_path / 'checkpoints')},
+            'pipeline': {'execution': 'streaming'},
+            'extract': {'batch_size': 3},
+        }
+        dedup = StreamingDeduplicator(subset=['id'])
+        loader = FlakyLoader(tmp_path / 'out.csv', fail_batch=2)
+        
+        def pipeline():
+            return ETLPipeline('dedup', config=config) \
+                .add_extractor(CSVExtractor(csv_file)) \
+                .add_transformer(dedup) \
+                .add_loader(loader)
+        
+        with pytest.raises(IOError):
+            pipeline().run()
+        
+        loader.fail_batch = None
+        loader.batches = []
+        assert pipeline().resume() == 4
+        assert loader.batches == [[6, 7, 8], [9]]
+        assert pd.read_csv(tmp_path / 'out.csv')['id'].tolist() == list(range(10))
+        assert len(dedup.keys) == 10
@@ -3,6 +3,7 @@ import pytest
 import pandas as pd
 
 from src.transform.base import DataFrameTransformer
+from src.transform.expressions import col, evaluate, parse
 
 
 class TestDataFrameTransformer:
@@ -58,3 +59,307 @@ class TestDataFrameTransformer:
         
         assert len(result) == 2
         assert 'user_id' in result.columns
+
+
+class TestQueryPlan:
+    """Tests for lazy plan optimization."""
+    
+    def test_projection_tracks_renames(self):
+        """Test selected columns are mapped back to source names."""
+        transformer = DataFrameTransformer(lazy=True)
+        transformer \
+            .filter_rows(lambda df: df['value'] > 100, columns=['value']) \
+            .rename_columns({'id': 'user_id'}) \
+            .select_columns(['user_id', 'name'])
+        
+        plan = transformer.optimize()
+        
+        assert plan.usecols == ['id', 'name', 'value']
+        assert [step.op for step in plan.chunk_steps] == [
+            'filter_rows', 'rename_columns', 'select_columns'
+        ]
+        assert plan.final_steps == []
+    
+    def test_opaque_steps_block_pushdown(self):
+        """Test undeclared filters stop projection and chunking."""
+        transformer = DataFrameTransformer(lazy=True)
+        transformer \
+            .drop_na(subset=['name']) \
+            .filter_rows(lambda df: df['value'] > df['value'].mean()) \
+            .select_columns(['id'])
+        
+        plan = transformer.optimize()
+        
+        assert plan.usecols is None
+        assert [step.op for step in plan.chunk_steps] == ['drop_na']
+        assert [step.op for step in plan.final_steps] == ['filter_rows', 'select_columns']
+    
+    def test_lazy_matches_eager(self):
+        """Test lazy execution returns the same frame as eager execution."""
+        sample_df = pd.DataFrame({
+            'id': [1, 2, 2, 3],
+            'name': ['alice', 'bob', 'bob', None],
+            'value': [100, 200, 200, 300]
+        })
+        
+        def build(lazy):
+            return DataFrameTransformer(lazy=lazy) \
+                .drop_na(subset=['name']) \
+                .filter_rows(lambda df: df['value'] >= 200, columns=['value']) \
+                .drop_duplicates() \
+                .select_columns(['name', 'value'])
+        
+        pd.testing.assert_frame_equal(
+            build(True).transform(sample_df), build(False).transform(sample_df)
+        )
+
+
+class TestExpressions:
+    """Tests for expression filters and derived columns."""
+    
+    @pytest.fixture
+    def orders(self):
+        return pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'price': [10.0, 20.0, None, 5.0, 50.0],
+            'qty': [3, 1, 2, 10, 2],
+            'country': ['DE', 'FR', 'DE', None, 'US'],
+            'unit cost': [4.0, 15.0, 1.0, 1.0, 60.0],
+        })
+    
+    @pytest.mark.parametrize('text, expected', [
+        ("price * qty >= 30 and country == 'DE'", [True, False, False, False, False]),
+        ("1 < qty <= 3", [True, False, True, False, True]),
+        ("country not in ('DE', 'FR')", [False, False, False, True, True]),
+        ("isna(price) or not (qty < 10)", [False, False, True, True, False]),
+        ("price > col('unit cost')", [True, True, False, True, False]),
+        ("startswith(lower(country), 'd')", [True, False, True, False, False]),
+    ])
+    def test_evaluate(self, orders, text, expected):
+        """Test expressions evaluate column-wise, with NA comparisons false."""
+        result = evaluate(parse(text), orders)
+        assert result.fillna(False).astype(bool).tolist() == expected
+    
+    def test_builder_matches_text(self, orders):
+        """Test col() expressions render as, and evaluate like, their text form."""
+        expr = (col('price') * col('qty') > 25) & ~col('country').isin(['FR'])
+        assert str(expr) == "(((price * qty) > 25) & (~(country in ['FR'])))"
+        pd.testing.assert_series_equal(evaluate(expr, orders), evaluate(parse(str(expr)), orders))
+    
+    def test_logical_operators_on_numbers(self):
+        """Test not / and / or (and ~ & |) treat numbers as truth values, not bits."""
+        data = pd.DataFrame({'x': [0, 1, 2], 'y': [3, 0, None], 'name': ['a', 'b', 'c']})
+        
+        assert DataFrameTransformer().filter_rows('not x').transform(data)['x'].tolist() == [0]
+        assert DataFrameTransformer().filter_rows(~col('x')).transform(data)['x'].tolist() == [0]
+        assert DataFrameTransformer().filter_rows('x and y').transform(data)['x'].tolist() == []
+        assert DataFrameTransformer().filter_rows(col('y') | (col('x') > 5)).transform(data)['x'].tolist() == [0]
+        with pytest.raises(TypeError, match="name"):
+            DataFrameTransformer().filter_rows('not name').transform(data)
+    
+    def test_numexpr_rendering(self):
+        """Test only operations numexpr has kernels for are rendered for it."""
+        from src.transform.expressions import Expr
+        
+        kinds = {'x': 'i', 'y': 'f', 'flag': 'b'}
+        assert parse('x * 2 + y').numexpr({}, kinds) == ('((_c0 * 2) + _c1)', 'f')
+        assert parse('not (x > 1) and flag').numexpr({}, kinds) == ('((~(_c0 > 1)) & _c1)', 'b')
+        assert parse('not x').numexpr({}, kinds) is None
+        assert parse('x & 3').numexpr({}, kinds) is None
+        assert parse('flag + 1').numexpr({}, kinds) is None
+        with pytest.raises(TypeError):
+            Expr()
+    
+    @pytest.mark.parametrize('text', ["price.sum()", "open('x')", "x if y else z", "qty in other"])
+    def test_unsupported_syntax(self, text):
+        """Test anything beyond column expressions is rejected."""
+        with pytest.raises(ValueError):
+            parse(text)
+    
+    def test_fused_steps(self, orders):
+        """Test consecutive expression steps run as one step and match pandas."""
+        labels = []
+        transformer = DataFrameTransformer() \
+            .with_column('total', 'price * qty') \
+            .filter_rows('total > 20') \
+            .filter_rows("country != 'US'") \
+            .with_column('margin', "total - col('unit cost') * qty") \
+            .drop_duplicates()
+        transformer.step_observer = lambda label, func, data: labels.append(label) or func(data)
+        
+        result = transformer.transform(orders)
+        
+        assert labels == ['0:with_column+1:filter_rows+2:filter_rows+3:with_column', '4:drop_duplicates']
+        expected = orders.assign(total=orders['price'] * orders['qty'])
+        expected = expected[(expected['total'] > 20) & (expected['country'] != 'US')]
+        expected = expected.assign(margin=expected['total'] - expected['unit cost'] * expected['qty'])
+        pd.testing.assert_frame_equal(result, expected)
+        assert list(orders.columns) == ['id', 'price', 'qty', 'country', 'unit cost']
+    
+    def test_expressions_push_down(self):
+        """Test expression steps declare their columns and derived ones are not read."""
+        transformer = DataFrameTransformer(lazy=True) \
+            .with_column('total', 'price * qty') \
+            .filter_rows('total > 20') \
+            .select_columns(['id', 'total'])
+        
+        plan = transformer.optimize()
+        
+        assert plan.usecols == ['id', 'price', 'qty']
+        assert [step.op for step in plan.chunk_steps] == ['with_column', 'filter_rows', 'select_columns']
+        assert transformer.checkpoint_signature()[1] == ['filter_rows', ['total'], {'expression': '(total > 20)'}]
+    
+    def test_numexpr_matches_numpy(self, monkeypatch):
+        """Test large numeric frames evaluated by numexpr give the NumPy result."""
+        pytest.importorskip('numexpr')
+        import numpy as np
+        from src.transform import expressions
+        
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({'a': rng.normal(size=20_000), 'b': rng.integers(0, 10, 20_000)})
+        expr = parse("where(a > 0, sqrt(a) * b, -a) + (b % 3 == 1)")
+        fast = evaluate(expr, data)
+        monkeypatch.setattr(expressions, 'NUMEXPR_MIN_ROWS', len(data) + 1)
+        pd.testing.assert_series_equal(fast, evaluate(expr, data), check_names=False)
+
+
+class TestPartitionedTransform:
+    """Tests for multi-process partitioned execution."""
+    
+    @pytest.fixture
+    def large_df(self):
+        """Create a frame with duplicates spread across partitions."""
+        return pd.DataFrame({
+            'id': [i % 50 for i in range(400)],
+            'name': [None if i % 7 == 0 else f'n{i % 50}' for i in range(400)],
+            'value': list(range(400))
+        })
+    
+    def test_matches_single_process(self, large_df):
+        """Test partitioned output equals sequential output, in order."""
+        def build(n_workers):
+            return DataFrameTransformer(n_workers=n_workers, n_partitions=4) \
+                .drop_na(subset=['name']) \
+                .filter_rows(lambda df: df['value'] % 3 != 0, columns=['value']) \
+                .drop_duplicates(subset=['id', 'name']) \
+                .filter_rows(lambda df: df['value'] > df['value'].median()) \
+                .rename_columns({'id': 'key'})
+        
+        expected = build(1).transform(large_df)
+        result = build(2).transform(large_df)
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_no_fork_while_threads_run(self, large_df, monkeypatch):
+        """Test transforms started from a worker thread use non-forking workers."""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.transform import parallel
+        
+        start_methods = []
+        
+        class RecordingPool(parallel.ProcessPoolExecutor):
+            def __init__(self, *args, mp_context, **kwargs):
+                start_methods.append(mp_context.get_start_method())
+                super().__init__(*args, mp_context=mp_context, **kwargs)
+        
+        monkeypatch.setattr(parallel, 'ProcessPoolExecutor', RecordingPool)
+        transformer = DataFrameTransformer(n_workers=2, n_partitions=4) \
+            .drop_na(subset=['name']) \
+            .filter_rows('value % 3 != 0') \
+            .rename_columns({'id': 'key'})
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(transformer.transform, large_df).result()
+        
+        expected = large_df.dropna(subset=['name'])
+        expected = expected[expected['value'] % 3 != 0].rename(columns={'id': 'key'})
+        pd.testing.assert_frame_equal(result, expected)
+        assert start_methods and 'fork' not in start_methods
+    
+    def test_unpicklable_steps_run_in_process_while_threads_run(self, large_df, monkeypatch, caplog):
+        """Test concurrent transforms with lambdas run in-process, warn and stay separate."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from src.transform import parallel
+        
+        def no_pool(*args, **kwargs):
+            raise AssertionError("started workers for steps that cannot be pickled")
+        
+        monkeypatch.setattr(parallel, 'ProcessPoolExecutor', no_pool)
+        frames = [large_df, large_df.assign(value=large_df['value'] * -1)]
+        barrier = threading.Barrier(len(frames))
+        
+        def run(frame):
+            barrier.wait()
+            return DataFrameTransformer(n_workers=2, n_partitions=4) \
+                .filter_rows(lambda df: df['value'] % 2 == 0, columns=['value']) \
+                .transform(frame)
+        
+        with caplog.at_level('WARNING', logger='src.transform.parallel'):
+            with ThreadPoolExecutor(max_workers=len(frames)) as pool:
+                results = list(pool.map(run, frames))
+        
+        for frame, result in zip(frames, results):
+            pd.testing.assert_frame_equal(result, frame[frame['value'] % 2 == 0])
+        assert "transforming in this process" in caplog.text
+    
+    def test_shared_memory_roundtrip(self, large_df):
+        """Test frames survive the shared memory hand-off intact."""
+        from src.transform.parallel import _from_shared, _to_shared
+        
+        pd.testing.assert_frame_equal(_from_shared(_to_shared(large_df)), large_df)
+
+
+class TestStreamingDeduplicator:
+    """Tests for StreamingDeduplicator."""
+    
+    @pytest.fixture
+    def stream(self):
+        import numpy as np
+        
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({
+            'key': rng.integers(0, 5_000, 20_000),
+            'flag': rng.integers(0, 2, 20_000),
+        })
+        return data, [data.iloc[start:start + 3_000] for start in range(0, len(data), 3_000)]
+    
+    def test_matches_drop_duplicates(self, stream):
+        """Test the first occurrence of each row is kept across chunks."""
+        from src.transform.dedup import StreamingDeduplicator
+        
+        data, chunks = stream
+        dedup = StreamingDeduplicator()
+        result = pd.concat([dedup.transform(chunk) for chunk in chunks])
+        
+        pd.testing.assert_frame_equal(result, data.drop_duplicates())
+        assert (dedup.rows_in, dedup.rows_out) == (len(data), len(result))
+    
+    def test_subset_and_spilling(self, stream, tmp_path):
+        """Test subset keys give the same result when keys spill to disk."""
+        from src.transform.dedup import StreamingDeduplicator
+        
+        data, chunks = stream
+        dedup = StreamingDeduplicator(subset=['key'], memory_budget=8 * 1_000, spill_dir=tmp_path)
+        result = pd.concat([dedup.transform(chunk) for chunk in chunks])
+        
+        pd.testing.assert_frame_equal(result, data.drop_duplicates(subset=['key']))
+        assert dedup.keys.spills > 0
+        assert dedup.keys.memory_bytes <= 8 * 1_000
+        
+        dedup.reset()
+        assert list(tmp_path.iterdir()) == []
+        assert len(dedup.transform(chunks[0])) == chunks[0]['key'].nunique()
+    
+    def test_fingerprints_ignore_dtype(self):
+        """Test equal values match across chunks with different dtypes."""
+        from src.transform.dedup import StreamingDeduplicator
+        
+        dedup = StreamingDeduplicator()
+        dedup.transform(pd.DataFrame({'id': [1, 2], 'name': ['a', None]}))
+        later = pd.DataFrame({
+            'id': pd.Series([2.0, 1.0, 3.0]),
+            'name': pd.Series([None, 'a', 'c'], dtype='category'),
+        })
+        
+        assert dedup.transform(later)['id'].tolist() == [3.0]
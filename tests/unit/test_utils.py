@@ -0,0 +1,194 @@
+"""Unit tests for utility modules."""
+import time
+
+import pandas as pd
+import pytest
+
+from src.utils.cache import ExtractCache
+
+
+class TestExtractCache:
+    """Tests for ExtractCache."""
+    
+    def test_roundtrip_and_stats(self, tmp_path):
+        """Test stored values are returned and hits/misses are counted."""
+        cache = ExtractCache(tmp_path)
+        key = cache.make_key('csv', 'input.csv', 1)
+        
+        assert cache.get(key) is None
+        cache.put(key, pd.DataFrame({'a': [1, 2]}))
+        
+        assert cache.get(key)['a'].tolist() == [1, 2]
+        assert cache.stats['hits'] == 1
+        assert cache.stats['misses'] == 1
+    
+    def test_ttl_expiry(self, tmp_path):
+        """Test entries older than the TTL are misses."""
+        cache = ExtractCache(tmp_path, ttl=0.05)
+        cache.put('k', [1, 2, 3])
+        time.sleep(0.1)
+        
+        assert cache.get('k') is None
+        assert cache.stats['expired'] == 1
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted over the size budget."""
+        payload = b'x' * 1000
+        cache = ExtractCache(tmp_path, max_bytes=2500)
+        cache.put('a', payload)
+        cache.put('b', payload)
+        cache.get('a')
+        cache.put('c', payload)
+        
+        assert cache.get('a') == payload
+        assert cache.get('b') is None
+        assert cache.get('c') == payload
+        assert cache.stats['evictions'] == 1
+
+
+class TestFiles:
+    """Tests for the shared state file helpers."""
+    
+    def test_stable_hash(self):
+        """Test digests ignore dict key order and accept values JSON cannot encode."""
+        from src.utils.files import stable_hash
+        
+        assert stable_hash('csv', {'a': 1, 'b': 2}) == stable_hash('csv', {'b': 2, 'a': 1})
+        assert stable_hash('csv', {'a': 1}) != stable_hash('csv', {'a': 2})
+        assert len(stable_hash(object)) == 64
+    
+    def test_atomic_write_keeps_old_file_on_failure(self, tmp_path, monkeypatch):
+        """Test a failed write leaves the previous contents and no temporary file."""
+        import os
+        from src.utils.files import atomic_write
+        
+        path = tmp_path / 'state' / 'store.json'
+        atomic_write(path, b'old')
+        
+        def fail(*args):
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(os, 'replace', fail)
+        with pytest.raises(OSError):
+            atomic_write(path, b'new')
+        
+        assert path.read_bytes() == b'old'
+        assert os.listdir(path.parent) == ['store.json']
+
+
+class TestWatermarkStore:
+    """Tests for WatermarkStore."""
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test committed watermarks survive reopening the store."""
+        from src.utils.state_store import WatermarkStore
+        
+        path = tmp_path / 'state' / 'watermarks.json'
+        WatermarkStore(path).set('csv:a', 120)
+        store = WatermarkStore(path)
+        
+        assert store.get('csv:a') == 120
+        assert store.get('csv:b', 0) == 0
+        store.delete('csv:a')
+        assert store.get('csv:a') is None
+
+
+class TestMetricsCollector:
+    """Tests for MetricsCollector and RunReport."""
+    
+    def test_measure_accumulates_batches(self):
+        """Test repeated measurements of a component add up."""
+        from src.utils.metrics import MetricsCollector
+        
+        collector = MetricsCollector('test', trace_memory=True)
+        for rows in (10, 20):
+            with collector.measure('load', 'CSVLoader[0]', rows_in=rows):
+                [0] * 100_000
+        report = collector.finish()
+        
+        metrics = report.stage('load', 'CSVLoader[0]')
+        assert metrics.batches == 2
+        assert metrics.rows_in == 30
+        assert metrics.rows_out is None
+        assert metrics.rows_per_second > 0
+        assert metrics.tracemalloc_peak_bytes > 0
+        assert report.status == 'success'
+    
+    def test_exports(self, tmp_path):
+        """Test JSON and Prometheus text-file exports."""
+        import json
+        from src.utils.metrics import MetricsCollector
+        
+        collector = MetricsCollector('daily "sales"')
+        collector.record('extract', 'CSVExtractor[0]', 0.5, rows_out=100).bytes_read = 2048
+        report = collector.finish(ValueError("boom"))
+        
+        report.to_json(tmp_path / 'report.json')
+        report.to_prometheus(tmp_path / 'metrics.prom')
+        
+        payload = json.loads((tmp_path / 'report.json').read_text())
+        assert payload['status'] == 'failed'
+        assert payload['stages'][0]['rows_per_second'] == 200
+        assert payload['process_peak_rss_bytes'] == report.process_peak_rss_bytes
+        assert 'peak_rss_bytes' not in payload['stages'][0]
+        text = (tmp_path / 'metrics.prom').read_text()
+        assert 'etl_run_success{pipeline="daily \\"sales\\""} 0' in text
+        assert '# TYPE etl_stage_bytes_read gauge' in text
+        assert 'stage="extract",name="CSVExtractor[0]"} 2048' in text
+        assert 'etl_stage_bytes_written' not in text
+        if report.process_peak_rss_bytes is not None:
+            assert f'etl_run_process_peak_rss_bytes{{pipeline="daily \\"sales\\""}} ' in text
+
+
+class TestCheckpointStore:
+    """Tests for CheckpointStore."""
+    
+    def test_roundtrip_and_resume(self, tmp_path):
+        """Test outputs and progress survive reopening with the same fingerprint."""
+        from src.utils.checkpoint import CheckpointStore
+        
+        frame = pd.DataFrame({'id': [3, 1], 'name': ['a', None]}, index=[5, 7])
+        store = CheckpointStore(tmp_path, 'abc')
+        store.save('extract', [frame, {'raw': 1}], per_item=True)
+        store.save('transform', [{'id': 1}, {'id': 2}])
+        store.mark('load:0', True)
+        
+        reopened = CheckpointStore(tmp_path, 'abc')
+        assert reopened.open(resume=True)
+        restored = reopened.load('extract')
+        pd.testing.assert_frame_equal(restored[0], frame)
+        assert restored[1] == {'raw': 1}
+        assert reopened.load('transform') == [{'id': 1}, {'id': 2}]
+        assert reopened.get('load:0') is True
+        assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.json', '.parquet', '.pkl', '.pkl']
+    
+    def test_stale_and_corrupt_checkpoints_discarded(self, tmp_path):
+        """Test a changed fingerprint or file content invalidates checkpoints."""
+        from src.utils.checkpoint import CheckpointStore
+        
+        store = CheckpointStore(tmp_path / 'cp', 'abc')
+        store.save('transform', pd.DataFrame({'a': [1]}))
+        assert not CheckpointStore(tmp_path / 'cp', 'def').open(resume=True)
+        assert not (tmp_path / 'cp').exists()
+        
+        store.save('transform', pd.DataFrame({'a': [1]}))
+        (tmp_path / 'cp' / 'transform-0.parquet').write_bytes(b'garbage')
+        reopened = CheckpointStore(tmp_path / 'cp', 'abc')
+        assert reopened.open(resume=True)
+        assert reopened.load('transform') is None
+        assert not reopened.has('transform')
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter."""
+    
+    def test_spaces_calls(self):
+        """Test calls beyond the burst wait for new tokens."""
+        from src.utils.rate_limit import RateLimiter
+        
+        limiter = RateLimiter(rate=50, burst=2)
+        start = time.perf_counter()
+        waits = [limiter.acquire() for _ in range(6)]
+        
+        assert waits[:2] == [0.0, 0.0]
+        assert time.perf_counter() - start >= 0.07